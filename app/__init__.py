@@ -3,10 +3,24 @@
 import os
 
 from flask import Flask, redirect, render_template, send_from_directory, session, url_for
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 from config import Config
-from .api import api_bp
+from .api import api_bp, current_claims
+from .assets import ART_DIR, assets
+from .chat_cache import chat_cache
+from .chat_writer import chat_writer
+from .database import init_app as init_database
+from .db_routing import read_only, replica_router
+from .events import event_bus
+from .matchmaking import matchmaker
+from .metrics import metrics
+from .migrations import check_schema
 from .models import User, db
+from .passwords import password_hasher
+from .ratelimit import rate_limiter
+from .profiler import profiler
+from .serialization import FastJSONProvider
 
 
 def create_app(test_config=None):
@@ -20,14 +34,30 @@ def create_app(test_config=None):
     app.config.from_object(Config)
     if test_config:
         app.config.update(test_config)
-
-    # Initialise SQLAlchemy and create tables on startup.
-    db.init_app(app)
+    app.json = FastJSONProvider(app, app.config["JSON_ENCODER"])
+    if app.config["PROXY_HOPS"]:
+        # Client IP (per-IP rate limits) from X-Forwarded-For set by our proxies.
+        hops = app.config["PROXY_HOPS"]
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops, x_host=hops)
+
+    # Initialise SQLAlchemy (engine options from the DB profile, see
+    # app/database.py). Tables come from migrations (python -m app.migrations);
+    # startup only checks the schema version.
+    init_database(app)
+    replica_router.init_app(app)
+    metrics.init_app(app)
+    profiler.init_app(app)
     with app.app_context():
-        db.create_all()
+        check_schema(app, db.engine)
 
     # Register JSON API (auth, rooms, chat) on the same app instance.
     app.register_blueprint(api_bp)
+    matchmaker.init_app(app)
+    password_hasher.init_app(app)
+    chat_writer.init_app(app)
+    chat_cache.init_app(app)
+    event_bus.init_app(app)
+    rate_limiter.init_app(app)
 
     # ---------- Public pages ----------
     @app.route("/")
@@ -61,19 +91,18 @@ def create_app(test_config=None):
 
         Requires an authenticated user; otherwise redirects to /auth.
         """
-        user_id = session.get("user_id")
-        user = User.query.get(user_id) if user_id else None
-        if not user:
+        claims = current_claims()
+        if claims is None:
             return redirect(url_for("auth_choice"))
-        return render_template("player-setting.html", user=user)
+        return render_template("player-setting.html", user=claims)
 
     @app.route("/profile")
+    @read_only
     def profile():
         """Profile / lobby page bound to current logged-in user."""
-        user = None
-        user_id = session.get("user_id")
-        if user_id:
-            user = User.query.get(user_id)
+        # The page shows email and stats, so this one needs the row itself.
+        claims = current_claims()
+        user = db.session.get(User, claims.user_id) if claims else None
         if not user:
             # If there's no valid session, send user to auth choice.
             return redirect(url_for("auth_choice"))
@@ -83,6 +112,7 @@ def create_app(test_config=None):
     def auth_logout_page():
         """Log out current user and redirect to auth choice screen."""
         session.pop("user_id", None)
+        session.pop("nickname", None)
         return redirect(url_for("auth_choice"))
 
     @app.route("/faq")
@@ -111,12 +141,14 @@ def create_app(test_config=None):
     @app.route("/assets/art/<path:filename>")
     def art_assets(filename: str):
         """Serve design art assets (e.g., Agree_Mark_ART.png) for UI prototypes."""
-        base_dir = os.path.join(app.root_path, "..", "design", "screenshots_photos", "art_assets")
-        return send_from_directory(base_dir, filename)
+        return send_from_directory(ART_DIR, filename)
     
     @app.route("/faq-about-cards")
     def faq_about_cards():
         """Page with FAQ about cards (opens in new tab)."""
         return render_template("faq-about-cards.html")
-    
+
+    # Hashed URLs for static and art assets once they are built (app/assets).
+    assets.init_app(app)
+
     return app
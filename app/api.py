@@ -2,16 +2,52 @@
 
 from __future__ import annotations
 
+import json
+import math
+import time
 from uuid import uuid4
 
-from flask import Blueprint, jsonify, request, session
-from werkzeug.security import check_password_hash, generate_password_hash
-
-from .models import ChatMessage, Room, User, chat_message_to_dict, db, room_to_dict, user_to_dict
+from flask import Blueprint, Response, current_app, jsonify, request, session
+from sqlalchemy import select, tuple_, update
+
+from .chat_cache import chat_cache
+from .chat_hub import chat_hub
+from .chat_writer import WriterBusy, chat_writer
+from .db_routing import read_only, replica_router
+from .events import event_bus
+from .lobby_cache import lobby_cache
+from .matchmaking import CANCELLED, EXPIRED, QUEUED, Ticket, matchmaker
+from .models import (
+    CHAT_MESSAGE_COLUMNS,
+    ROOM_LIST_COLUMNS,
+    ChatMessage,
+    Room,
+    User,
+    db,
+    room_to_dict,
+    user_to_dict,
+)
+from .pagination import decode_cursor, encode_cursor, position_key
+from .passwords import HasherBusy, password_hasher
+from .ratelimit import rate_limiter
+from .serialization import ChatItem, chat_item, json_object
+from .tokens import (
+    Claims,
+    issue_access_token,
+    issue_match_token,
+    issue_refresh_token,
+    verify_access_token,
+    verify_refresh_token,
+)
+from .seats import maybe_sweep_all, reserve_seat
 
 
 api_bp = Blueprint("api", __name__)
 
+# Chat history page size (GET /api/chat/<room_id>?limit=...).
+CHAT_PAGE_DEFAULT = 50
+CHAT_PAGE_MAX = 200
+
 
 def error_response(code: str, message: str, http_status: int = 400, details: dict | None = None):
     payload: dict[str, object] = {
@@ -24,6 +60,79 @@ def error_response(code: str, message: str, http_status: int = 400, details: dic
     return jsonify(payload), http_status
 
 
+def busy_response():
+    """503 for a saturated password-hashing pool; clients retry shortly."""
+
+    response, status = error_response(
+        code="server_busy",
+        message="Сервер перевантажений. Спробуйте ще раз за кілька секунд.",
+        http_status=503,
+    )
+    response.headers["Retry-After"] = "2"
+    return response, status
+
+
+def rate_limited(**keys):
+    """429 response if any ``rule=key`` bucket (app/ratelimit.py) is empty, else None."""
+
+    denied = rate_limiter.hit(**keys)
+    if denied is None:
+        return None
+    retry_after = max(1, math.ceil(denied.retry_after))
+    response, status = error_response(
+        code="rate_limited",
+        message="Забагато запитів. Спробуйте ще раз трохи пізніше.",
+        http_status=429,
+        details={"limit": denied.rule, "retryAfter": retry_after},
+    )
+    response.headers["Retry-After"] = str(retry_after)
+    return response, status
+
+
+def current_claims() -> Claims | None:
+    """Who is calling, without a DB round trip.
+
+    A ``Authorization: Bearer <access token>`` header wins; browser pages fall
+    back to the identity stored in the signed session cookie at login.
+    """
+
+    header = request.headers.get("Authorization", "")
+    if header.startswith("Bearer "):
+        return verify_access_token(
+            current_app.config["SECRET_KEY"],
+            header[len("Bearer "):].strip(),
+            current_app.config["ACCESS_TOKEN_TTL_SEC"],
+        )
+    user_id = session.get("user_id")
+    if not user_id:
+        return None
+    return Claims(user_id, session.get("nickname", ""))
+
+
+def _presence_member() -> str:
+    """Presence / rate-limit identity: the user id, or a per-browser id kept in the session."""
+
+    claims = current_claims()
+    if claims is not None:
+        return claims.user_id
+    if "presence_id" not in session:
+        session["presence_id"] = f"anon-{uuid4().hex}"
+    return session["presence_id"]
+
+
+def _start_session(user: User) -> dict:
+    """Remember the user in the session cookie and issue a token pair."""
+
+    session["user_id"] = user.id
+    session["nickname"] = user.nickname
+    secret = current_app.config["SECRET_KEY"]
+    return {
+        "token": issue_access_token(secret, user.id, user.nickname),
+        "refreshToken": issue_refresh_token(secret, user.id),
+        "expiresIn": current_app.config["ACCESS_TOKEN_TTL_SEC"],
+    }
+
+
 # ---------------------- Auth endpoints ----------------------
 
 
@@ -38,6 +147,11 @@ def auth_login():
     email = (data.get("email") or "").strip().lower()
     password = (data.get("password") or "").strip()
 
+    # Before any DB or password-hashing work.
+    limited = rate_limited(login_ip=request.remote_addr, login_account=email or None)
+    if limited:
+        return limited
+
     if not email or not password:
         return error_response(
             code="validation_error",
@@ -47,35 +161,40 @@ def auth_login():
         )
 
     user: User | None = User.query.filter_by(email=email).first()
-    if user is None or not check_password_hash(user.password_hash, password):
+    try:
+        valid = user is not None and password_hasher.verify(user.password_hash, password)
+    except HasherBusy:
+        return busy_response()
+    if not valid:
         return error_response(
             code="invalid_credentials",
             message="Невірні дані входу.",
             http_status=401,
         )
 
+    # Upgrade hashes made with older PASSWORD_HASH_METHOD parameters.
+    if password_hasher.needs_rehash(user.password_hash):
+        try:
+            user.password_hash = password_hasher.hash(password)
+            db.session.commit()
+        except HasherBusy:
+            pass  # next login will retry
+
     # Persist logged-in user in session for profile / settings pages.
-    session["user_id"] = user.id
+    tokens = _start_session(user)
 
     return jsonify(
         {
             "ok": True,
             "message": "Успішний вхід. Welcome back!",
-            # NOTE: real JWT is out of scope for this prototype; keep dev token.
-            "token": "dev-token",
+            **tokens,
             "user": user_to_dict(user),
         }
     )
 
 
-@api_bp.post("/auth/register")
-def auth_register():
-    """Create a new account in the DB.
-
-    Mirrors validation logic from mocks/api/server.py + adds uniqueness checks.
-    """
-
-    data = request.get_json(silent=True) or {}
+def _registration_fields(data: dict) -> tuple[str, str, str, dict[str, str]]:
+    """Normalised ``(nickname, email, password, errors)`` of a sign-up body (format checks only)."""
 
     nickname = (data.get("nickname") or "").strip()
     email = (data.get("email") or "").strip().lower()
@@ -93,6 +212,23 @@ def auth_register():
     if not password:
         errors["password"] = "required"
 
+    return nickname, email, password, errors
+
+
+@api_bp.post("/auth/register")
+def auth_register():
+    """Create a new account in the DB.
+
+    Mirrors validation logic from mocks/api/server.py + adds uniqueness checks.
+    """
+
+    limited = rate_limited(register_ip=request.remote_addr)
+    if limited:
+        return limited
+
+    data = request.get_json(silent=True) or {}
+    nickname, email, password, errors = _registration_fields(data)
+
     # Uniqueness checks
     if email and User.query.filter_by(email=email).first() is not None:
         errors["email"] = errors.get("email") or "already_in_use"
@@ -107,27 +243,57 @@ def auth_register():
             details=errors,
         )
 
+    try:
+        password_hash = password_hasher.hash(password)
+    except HasherBusy:
+        return busy_response()
+
     user = User(
         nickname=nickname,
         email=email,
-        password_hash=generate_password_hash(password),
+        password_hash=password_hash,
     )
     db.session.add(user)
     db.session.commit()
 
     # Автоматично логінимо новий акаунт.
-    session["user_id"] = user.id
+    tokens = _start_session(user)
 
     return jsonify(
         {
             "ok": True,
             "message": "Акаунт створено. Лист підтвердження успішно надіслано.",
-            "token": "dev-token",
+            **tokens,
             "user": user_to_dict(user),
         }
     ), 201
 
 
+@api_bp.post("/auth/refresh")
+def auth_refresh():
+    """Exchange a refresh token for a new access + refresh token pair.
+
+    The only auth call that reads the user row: a deleted account cannot
+    refresh, and the new access token carries the current nickname.
+    """
+
+    data = request.get_json(silent=True) or {}
+    user_id = verify_refresh_token(
+        current_app.config["SECRET_KEY"],
+        data.get("refreshToken"),
+        current_app.config["REFRESH_TOKEN_TTL_SEC"],
+    )
+    user: User | None = db.session.get(User, user_id) if user_id else None
+    if user is None:
+        return error_response(
+            code="unauthorized",
+            message="Сесія завершилась. Увійдіть знову.",
+            http_status=401,
+        )
+
+    return jsonify({"ok": True, **_start_session(user), "user": user_to_dict(user)})
+
+
 @api_bp.post("/auth/reset")
 def auth_reset():
     """Password reset stub.
@@ -159,10 +325,12 @@ def auth_reset():
 def update_nickname():
     """Update current user's nickname in the database.
 
-    Requires active session (user_id in Flask session).
+    Requires an access token or an active session; the nickname is changed
+    with a single ``UPDATE ... RETURNING``.
     """
 
-    user_id = session.get("user_id")
+    claims = current_claims()
+    user_id = claims.user_id if claims else None
     if not user_id:
         return error_response(
             code="unauthorized",
@@ -196,22 +364,29 @@ def update_nickname():
             details=errors,
         )
 
-    user = User.query.get(user_id)
+    user = db.session.scalars(
+        update(User).where(User.id == user_id).values(nickname=nickname).returning(User)
+    ).first()
     if user is None:
+        db.session.rollback()
         session.pop("user_id", None)
+        session.pop("nickname", None)
         return error_response(
             code="unauthorized",
             message="Потрібно увійти в акаунт.",
             http_status=401,
         )
-
-    user.nickname = nickname
     db.session.commit()
 
+    if session.get("user_id") == user.id:
+        session["nickname"] = user.nickname
+
     return jsonify(
         {
             "ok": True,
             "message": "Зміни збережено.",
+            # The old access token still carries the previous nickname.
+            "token": issue_access_token(current_app.config["SECRET_KEY"], user.id, user.nickname),
             "user": user_to_dict(user),
         }
     )
@@ -221,11 +396,19 @@ def update_nickname():
 
 
 @api_bp.get("/rooms")
+@read_only
 def list_rooms():
-    """Return a list of rooms with simple filters (mode, access, pagination)."""
+    """Return a page of rooms, newest first, with simple filters (mode, access).
+
+    Paged by ``cursor`` (the previous page's ``nextCursor``), a range seek on
+    ``ix_rooms_mode_access_created_id``; legacy ``offset`` is still honoured
+    when no cursor is given. Serialized pages are served from ``lobby_cache``
+    with an ETag, so unchanged lobbies are answered with 304.
+    """
 
     mode = request.args.get("mode")  # quick | classic | None
     access = request.args.get("access")  # public | private | None
+    cursor = request.args.get("cursor")
 
     try:
         limit = int(request.args.get("limit", "20"))
@@ -237,32 +420,56 @@ def list_rooms():
         offset = int(request.args.get("offset", "0"))
     except ValueError:
         offset = 0
-    offset = max(0, offset)
-
-    query = Room.query
-    if mode:
-        query = query.filter_by(mode=mode)
-    if access:
-        query = query.filter_by(access=access)
-
-    rooms = (
-        query.order_by(Room.created_at.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
+    offset = 0 if cursor else max(0, offset)
 
-    return jsonify({"rooms": [room_to_dict(r) for r in rooms]})
-
-
-@api_bp.post("/rooms")
-def create_room():
-    """Create a new room.
-
-    Mirrors validation from mocks/api/server.py and returns inviteCode.
-    """
-
-    data = request.get_json(silent=True) or {}
+    anchor = None
+    if cursor:
+        decoded = decode_cursor(cursor)
+        if decoded is None or not decoded[1].isdigit():
+            return error_response(
+                code="validation_error",
+                message="Невірний курсор.",
+                http_status=400,
+                details={"cursor": "invalid"},
+            )
+        anchor = (decoded[0], int(decoded[1]))
+
+    # Keep currentPlayers honest for rooms nobody joined lately.
+    maybe_sweep_all()
+
+    key = (mode, access, limit, cursor, offset)
+    page = lobby_cache.get(key)
+    if page is None:
+        generation = lobby_cache.generation
+        if lobby_cache.changed_within(current_app.config["REPLICA_STICKY_SEC"]):
+            # The page is shared by everyone: build it from the primary while
+            # a replica may not have the latest room change yet.
+            replica_router.use_primary()
+        # Plain rows of the public columns, no ORM objects.
+        query = select(*ROOM_LIST_COLUMNS)
+        if mode:
+            query = query.where(Room.mode == mode)
+        if access:
+            query = query.where(Room.access == access)
+        if anchor is not None:
+            query = query.where(tuple_(Room.created_at, Room.id) < tuple_(*anchor))
+
+        rooms = db.session.execute(
+            query.order_by(Room.created_at.desc(), Room.id.desc()).offset(offset).limit(limit + 1)
+        ).all()
+        next_cursor = encode_cursor(rooms[limit - 1].created_at, rooms[limit - 1].id) if len(rooms) > limit else None
+        body = current_app.json.dumpb({"rooms": [room_to_dict(r) for r in rooms[:limit]], "nextCursor": next_cursor})
+        page = lobby_cache.put(key, body, current_app.config["LOBBY_CACHE_TTL_SEC"], generation)
+
+    response = Response(page.body, mimetype="application/json")
+    response.set_etag(page.etag)
+    # Always revalidate; an unchanged page costs a 304 without a body.
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
+
+def _room_fields(data: dict) -> tuple[str, str, int, str, str, dict[str, str]]:
+    """Normalised ``(name, mode, max_players, access, password, errors)`` of a create-room body."""
 
     name = (data.get("name") or "").strip()
     mode = (data.get("mode") or "quick").strip()
@@ -282,6 +489,19 @@ def create_room():
     if access == "private" and len(password) < 4:
         errors["password"] = "too_short"
 
+    return name, mode, max_players, access, password, errors
+
+
+@api_bp.post("/rooms")
+def create_room():
+    """Create a new room.
+
+    Mirrors validation from mocks/api/server.py and returns inviteCode.
+    """
+
+    data = request.get_json(silent=True) or {}
+    name, mode, max_players, access, password, errors = _room_fields(data)
+
     if errors:
         return error_response(
             code="validation_error",
@@ -304,7 +524,10 @@ def create_room():
         turn_duration_sec=turn_duration,
     )
     if password:
-        room.password_hash = generate_password_hash(password)
+        try:
+            room.password_hash = password_hasher.hash(password)
+        except HasherBusy:
+            return busy_response()
 
     db.session.add(room)
     db.session.flush()  # ensure room.id is populated
@@ -312,6 +535,8 @@ def create_room():
     # Simple predictable invite code compatible with DETAILED_STRUCTURE.md
     room.invite_code = f"CL-{room.id}"
     db.session.commit()
+    lobby_cache.invalidate()
+    event_bus.publish("rooms", {"room": room.id, "reason": "created"})
 
     public_room = room_to_dict(room)
     invite_code = room.invite_code
@@ -328,9 +553,23 @@ def create_room():
     )
 
 
+def _match_ws_url(room_pk: int, player_id: str) -> str:
+    """Match gateway URL (python -m app.realtime), see docs/dev/api/ws-events.md.
+
+    Carries a match token signed for this player, which the gateway verifies
+    offline; logged-in players play under their nickname.
+    """
+
+    claims = current_claims()
+    nickname = claims.nickname if claims and claims.nickname else player_id
+    token = issue_match_token(current_app.config["SECRET_KEY"], str(room_pk), player_id, nickname)
+    ws_base = current_app.config["MATCH_WS_URL"].rstrip("/")
+    return f"{ws_base}/ws/match/{room_pk}?token={token}&playerId={player_id}"
+
+
 @api_bp.post("/rooms/<room_id>/join")
 def join_room(room_id: str):
-    """Join a room and get wsUrl for WS mock.
+    """Join a room and get wsUrl for the match gateway.
 
     Password-protected rooms require correct password.
     """
@@ -357,30 +596,32 @@ def join_room(room_id: str):
         )
 
     if room.access == "private" and room.has_password:
-        expected_hash = room.password_hash or ""
-        if not expected_hash or not check_password_hash(expected_hash, password):
+        try:
+            valid = password_hasher.verify(room.password_hash or "", password)
+        except HasherBusy:
+            return busy_response()
+        if not valid:
             return error_response(
                 code="forbidden",
                 message="Невірний пароль кімнати.",
                 http_status=403,
             )
 
-    # Simple capacity check; in real backend we would enforce this strictly.
-    if room.current_players >= room.max_players:
+    player_id = f"p_{uuid4().hex[:8]}"
+    seat = reserve_seat(room_pk, player_id, current_app.config["ROOM_SEAT_TTL_SEC"])
+    if seat is None:
         return error_response(
             code="room_full",
             message="Кімната заповнена.",
             http_status=403,
         )
+    event_bus.publish("rooms", {"room": room_pk, "reason": "joined"})
+    event_bus.heartbeat(_presence_member(), room_pk)
 
-    player_id = f"p_{uuid4().hex[:8]}"
-
-    # Hard-coded WS mock URL aligned with mocks/ws-mock.js and docs/dev/api/ws-events.md
-    ws_url = f"ws://localhost:8081/ws/match/{room_id}?token=dev-token&playerId={player_id}"
-
-    room.current_players += 1
-    db.session.commit()
+    ws_url = _match_ws_url(room_pk, player_id)
 
+    # ``room`` was loaded before the reservation; report the seat just taken.
+    db.session.refresh(room)
     public_room = room_to_dict(room)
 
     return jsonify(
@@ -388,19 +629,309 @@ def join_room(room_id: str):
             "ok": True,
             "room": public_room,
             "playerId": player_id,
+            "seat": seat,
             "wsUrl": ws_url,
         }
     )
 
 
+# ---------------------- Matchmaking endpoints ----------------------
+
+
+def _wait_arg(data: dict | None = None) -> float:
+    raw = request.args.get("wait") or (data or {}).get("wait") or 0
+    try:
+        wait = float(raw)
+    except (TypeError, ValueError):
+        wait = 0.0
+    return max(0.0, min(wait, current_app.config["MATCHMAKING_WAIT_MAX_SEC"]))
+
+
+def _ticket_response(ticket: Ticket):
+    if ticket.status in (CANCELLED, EXPIRED):
+        return error_response(
+            code="ticket_expired",
+            message="Пошук гри скасовано або заявка застаріла.",
+            http_status=410,
+        )
+
+    payload: dict[str, object] = {
+        "ok": True,
+        "ticketId": ticket.id,
+        "status": ticket.status,
+        "mode": ticket.mode,
+        "maxPlayers": ticket.max_players,
+    }
+    if ticket.status == QUEUED:
+        payload["queued"] = matchmaker.queued_count(ticket.mode, ticket.max_players)
+        return jsonify(payload), 202
+
+    room: Room | None = db.session.get(Room, ticket.room_id)
+    payload.update(
+        {
+            "room": room_to_dict(room) if room is not None else None,
+            "inviteCode": room.invite_code if room is not None else None,
+            "playerId": ticket.player_id,
+            "seat": ticket.seat,
+            "wsUrl": _match_ws_url(ticket.room_id, ticket.player_id),
+        }
+    )
+    return jsonify(payload), 200
+
+
+@api_bp.post("/matchmaking/queue")
+def matchmaking_enqueue():
+    """Queue for an automatic match (mode + maxPlayers).
+
+    With ``wait`` (seconds, query or body) the request long-polls and usually
+    returns the matched room directly; otherwise poll
+    ``GET /matchmaking/queue/<ticketId>``.
+    """
+
+    data = request.get_json(silent=True) or {}
+    mode = (data.get("mode") or "quick").strip()
+    max_players = data.get("maxPlayers") or 2
+
+    errors: dict[str, str] = {}
+    if mode not in {"quick", "classic"}:
+        errors["mode"] = "invalid"
+    if max_players not in {2, 4}:
+        errors["maxPlayers"] = "invalid"
+    if errors:
+        return error_response(
+            code="validation_error",
+            message="Помилка валідації параметрів пошуку гри.",
+            http_status=400,
+            details=errors,
+        )
+
+    ticket = matchmaker.enqueue(mode, max_players)
+    wait = _wait_arg(data)
+    if wait:
+        ticket.wait(wait)
+    return _ticket_response(ticket)
+
+
+@api_bp.get("/matchmaking/queue/<ticket_id>")
+def matchmaking_status(ticket_id: str):
+    """Ticket status; ``?wait=N`` long-polls until matched or N seconds pass."""
+
+    ticket = matchmaker.get(ticket_id)
+    if ticket is None:
+        return error_response(code="not_found", message="Заявку не знайдено.", http_status=404)
+    wait = _wait_arg()
+    if wait and ticket.status == QUEUED:
+        ticket.wait(wait)
+    return _ticket_response(ticket)
+
+
+@api_bp.delete("/matchmaking/queue/<ticket_id>")
+def matchmaking_cancel(ticket_id: str):
+    """Leave the queue; 409 if the ticket was matched meanwhile."""
+
+    ticket = matchmaker.get(ticket_id)
+    if ticket is None:
+        return error_response(code="not_found", message="Заявку не знайдено.", http_status=404)
+    if not matchmaker.cancel(ticket):
+        return error_response(code="conflict", message="Гру вже знайдено.", http_status=409)
+    return jsonify({"ok": True, "ticketId": ticket.id, "status": ticket.status})
+
+
+# ---------------------- Presence endpoints ----------------------
+
+# Rooms per GET /presence?rooms=... request.
+PRESENCE_ROOMS_MAX = 100
+
+
+@api_bp.post("/presence")
+def presence_heartbeat():
+    """Keep the caller online (globally, and in ``roomId`` if given) for
+    ``PRESENCE_TTL_SEC``; returns the current counts. No database access."""
+
+    data = request.get_json(silent=True) or {}
+    room_id = data.get("roomId")
+    if room_id is not None and (isinstance(room_id, bool) or not isinstance(room_id, int)):
+        return error_response(
+            code="validation_error",
+            message="Невірний ідентифікатор кімнати.",
+            http_status=400,
+            details={"roomId": "invalid"},
+        )
+    event_bus.heartbeat(_presence_member(), room_id)
+    online, rooms = event_bus.online([room_id] if room_id is not None else [])
+    payload: dict[str, object] = {"ok": True, "online": online}
+    if room_id is not None:
+        payload["roomOnline"] = rooms[room_id]
+    return jsonify(payload)
+
+
+@api_bp.get("/presence")
+def presence_counts():
+    """Online counts: global, plus per room for ``?rooms=1,2,3``."""
+
+    raw = [r for r in (request.args.get("rooms") or "").split(",") if r.strip()]
+    try:
+        room_ids = [int(r) for r in raw[:PRESENCE_ROOMS_MAX]]
+    except ValueError:
+        return error_response(
+            code="validation_error",
+            message="Невірний список кімнат.",
+            http_status=400,
+            details={"rooms": "invalid"},
+        )
+    online, rooms = event_bus.online(room_ids)
+    response = jsonify({"ok": True, "online": online, "rooms": {str(r): n for r, n in rooms.items()}})
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+# ---------------------- Cross-worker events ----------------------
+
+
+@event_bus.on("chat")
+def _chat_posted_elsewhere(event) -> None:
+    if event.local:
+        return
+    data = event.data
+    item = ChatItem(data["cursor"], json.loads(data["json"]), data["json"])
+    anchor = decode_cursor(item.cursor)
+    if anchor is None:
+        return
+    chat_cache.append(data["room"], position_key(*anchor), item)
+    chat_hub.publish(data["room"], item)
+
+
+@event_bus.on("chat_seq")
+def _chat_stored(event) -> None:
+    # From every worker's writer, this one's included: its seq was null at ack.
+    chat_cache.set_seqs(event.data["room"], dict(event.data["seqs"]))
+
+
+@event_bus.on("rooms")
+def _rooms_changed_elsewhere(event) -> None:
+    if not event.local:
+        lobby_cache.invalidate()
+
+
+@event_bus.on("resync")
+def _events_missed(_event) -> None:
+    lobby_cache.invalidate()
+    chat_cache.clear()
+    chat_hub.lag_all()
+
+
 # ---------------------- Chat endpoints ----------------------
 
 
+def _chat_anchor(room_pk: int, cursor: str | None, since_id: str | None):
+    """Resolve a cursor / legacy ``sinceId`` to a (created_at, id) position.
+
+    Returns ``(anchor, ok)``; ``ok`` is False for a malformed cursor or an
+    unknown ``sinceId``.
+    """
+
+    if cursor:
+        anchor = decode_cursor(cursor)
+        return anchor, anchor is not None
+    if since_id:
+        # Legacy clients pass the last seen message id: usually one of the
+        # newest messages, so the ring buffer knows it; else a primary-key lookup.
+        anchor = chat_cache.position_of(room_pk, "id", since_id)
+        if anchor is not None:
+            return anchor, True
+        anchor_ts = (
+            db.session.query(ChatMessage.created_at)
+            .filter(ChatMessage.id == since_id, ChatMessage.room_id == room_pk)
+            .scalar()
+        )
+        if anchor_ts is None:
+            return None, False
+        return (anchor_ts, since_id), True
+    return None, True
+
+
+def _chat_page(room_pk: int, anchor, forward: bool, limit: int):
+    """Fetch one oldest-first page of chat history around ``anchor``.
+
+    Returns ``(items, has_more, has_older)`` where items are
+    :class:`~app.serialization.ChatItem` and ``has_more`` means newer
+    messages remain after a forward page. Served from ``chat_cache`` when the
+    page lies within the room's ring buffer; older pages go to the database,
+    selecting only the public columns.
+    """
+
+    cached = chat_cache.page(room_pk, anchor, forward, limit)
+    if cached is not None:
+        return cached
+
+    position = tuple_(ChatMessage.created_at, ChatMessage.id)
+    query = select(*CHAT_MESSAGE_COLUMNS).where(ChatMessage.room_id == room_pk)
+
+    if forward:
+        # Forward page: the anchor itself is always older than the page.
+        rows = db.session.execute(
+            query.where(position > tuple_(*anchor))
+            .order_by(ChatMessage.created_at.asc(), ChatMessage.id.asc())
+            .limit(limit + 1)
+        ).all()
+        return [chat_item(r) for r in rows[:limit]], len(rows) > limit, True
+
+    if anchor is not None:
+        query = query.where(position < tuple_(*anchor))
+    rows = db.session.execute(
+        query.order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc()).limit(limit + 1)
+    ).all()
+    has_older = len(rows) > limit
+    rows = rows[:limit]
+    rows.reverse()
+    return [chat_item(r) for r in rows], False, has_older
+
+
+def _parse_seq(value: str | None) -> tuple[int | None, bool]:
+    """``afterSeq`` -> ``(seq, ok)``; ``(None, True)`` when absent."""
+
+    if not value:
+        return None, True
+    try:
+        return int(value), True
+    except ValueError:
+        return None, False
+
+
+def _chat_seq_page(room_pk: int, after_seq: int, limit: int):
+    """Messages with ``seq > after_seq``, oldest first: ``(items, has_more, has_older)``.
+
+    A range seek on ``ix_chat_messages_room_seq``. It always reads the
+    database: ``seq`` follows commit order across workers (app/chat_seq.py),
+    so unlike a ``(created_at, id)`` range it cannot skip a message another
+    worker wrote later with an earlier timestamp.
+    """
+
+    rows = db.session.execute(
+        select(*CHAT_MESSAGE_COLUMNS)
+        .where(ChatMessage.room_id == room_pk, ChatMessage.seq > after_seq)
+        .order_by(ChatMessage.seq.asc())
+        .limit(limit + 1)
+    ).all()
+    return [chat_item(r) for r in rows[:limit]], len(rows) > limit, True
+
+
 @api_bp.get("/api/chat/<room_id>")
+@read_only
 def chat_list(room_id: str):
-    """Get chat history for a room.
+    """Get a page of chat history for a room.
+
+    Keyset-paginated over (created_at, id); recent pages come from the
+    room's ring buffer (app/chat_cache.py), older ones are a bounded range
+    seek on ``ix_chat_messages_room_created_id``:
 
-    Implements sinceId semantics similar to mocks/api/server.py.
+    - no cursor: the latest ``limit`` messages;
+    - ``after`` / ``sinceId``: up to ``limit`` messages newer than the anchor;
+    - ``afterSeq``: up to ``limit`` stored messages with a higher ``seq``,
+      paged by ``seq`` (see :func:`_chat_seq_page`);
+    - ``before``: up to ``limit`` messages older than the anchor.
+
+    Messages are always returned oldest-first.
     """
 
     try:
@@ -409,35 +940,149 @@ def chat_list(room_id: str):
         return jsonify({"messages": []})
 
     # Ensure room exists (optional but nice for early 404).
-    room: Room | None = Room.query.get(room_pk)
-    if room is None:
+    if not chat_writer.room_exists(room_pk):
         return jsonify({"messages": []})
 
-    since_id = request.args.get("sinceId")
-
-    query = (
-        ChatMessage.query.filter_by(room_id=room_pk)
-        .order_by(ChatMessage.created_at.asc())
+    try:
+        limit = int(request.args.get("limit", str(CHAT_PAGE_DEFAULT)))
+    except ValueError:
+        limit = CHAT_PAGE_DEFAULT
+    limit = max(1, min(limit, CHAT_PAGE_MAX))
+
+    before = request.args.get("before")
+    after = request.args.get("after")
+    after_seq, seq_ok = _parse_seq(None if before or after else request.args.get("afterSeq"))
+
+    if after_seq is not None:
+        anchor, ok = None, True
+    else:
+        anchor, ok = _chat_anchor(room_pk, before or after, request.args.get("sinceId"))
+    if not seq_ok or (not ok and (before or after)):
+        return error_response(
+            code="validation_error",
+            message="Невірний курсор.",
+            http_status=400,
+            details={"cursor": "invalid"},
+        )
+    if not ok:
+        return jsonify({"messages": [], "prevCursor": None, "nextCursor": None, "hasMore": False})
+
+    forward = anchor is not None and not before
+    if after_seq is not None:
+        items, has_more, has_older = _chat_seq_page(room_pk, after_seq, limit)
+    else:
+        items, has_more, has_older = _chat_page(room_pk, anchor, forward, limit)
+
+    if items:
+        next_cursor = items[-1].cursor
+        prev_cursor = items[0].cursor if has_older else None
+    else:
+        next_cursor = encode_cursor(*anchor) if forward else None
+        prev_cursor = None
+
+    # Messages are spliced in as their pre-encoded JSON fragments.
+    body = json_object(
+        {"prevCursor": prev_cursor, "nextCursor": next_cursor, "hasMore": has_more},
+        {"messages": "[" + ",".join(item.json for item in items) + "]"},
     )
+    return Response(body, mimetype="application/json")
 
-    msgs = list(query.all())
 
-    if since_id:
-        filtered: list[ChatMessage] = []
-        found = False
-        for msg in msgs:
-            if found:
-                filtered.append(msg)
-            if msg.id == since_id:
-                found = True
-        msgs = filtered
+def _sse_event(item: ChatItem) -> str:
+    return f"id: {item.cursor}\nevent: message\ndata: {item.json}\n\n"
+
+
+@api_bp.get("/api/chat/<room_id>/stream")
+def chat_stream(room_id: str):
+    """Server-Sent Events stream of a room's chat.
+
+    Sends the missed backlog first (after ``after`` / ``afterSeq`` / ``sinceId`` /
+    ``Last-Event-ID``, or the latest page when no anchor is given), then parks
+    on ``chat_hub`` and pushes every new message as it is posted. Each event
+    ``id`` is the message cursor, so EventSource reconnects resume exactly
+    where they stopped. The stream ends after ``CHAT_STREAM_MAX_SEC`` or when
+    the reader falls too far behind; clients simply reconnect.
+    """
+
+    try:
+        room_pk = int(room_id)
+    except ValueError:
+        return error_response(code="not_found", message="Кімнату не знайдено.", http_status=404)
+
+    if not chat_writer.room_exists(room_pk):
+        return error_response(code="not_found", message="Кімнату не знайдено.", http_status=404)
+
+    cursor = request.args.get("after") or request.headers.get("Last-Event-ID")
+    after_seq, seq_ok = _parse_seq(None if cursor else request.args.get("afterSeq"))
+    if after_seq is not None:
+        anchor, ok = None, True
+    else:
+        anchor, ok = _chat_anchor(room_pk, cursor, request.args.get("sinceId"))
+    if not seq_ok or (not ok and cursor):
+        return error_response(
+            code="validation_error",
+            message="Невірний курсор.",
+            http_status=400,
+            details={"cursor": "invalid"},
+        )
 
-    return jsonify({"messages": [chat_message_to_dict(m) for m in msgs]})
+    # Subscribe before reading the backlog so nothing posted in between is lost;
+    # overlap between the two is dropped by id below.
+    sub = chat_hub.subscribe(room_pk)
+    try:
+        if after_seq is not None:
+            backlog, backlog_truncated, _ = _chat_seq_page(room_pk, after_seq, CHAT_PAGE_MAX)
+        else:
+            limit = CHAT_PAGE_MAX if anchor is not None else CHAT_PAGE_DEFAULT
+            backlog, backlog_truncated, _ = _chat_page(room_pk, anchor, anchor is not None, limit)
+        backlog_events = [_sse_event(item) for item in backlog]
+        seen_ids = {item.payload["id"] for item in backlog}
+    except Exception:
+        chat_hub.unsubscribe(sub)
+        raise
+
+    keepalive = current_app.config.get("CHAT_STREAM_KEEPALIVE_SEC", 15)
+    max_duration = current_app.config.get("CHAT_STREAM_MAX_SEC", 300)
+    # An open stream keeps its reader online in the room; the keepalive
+    # interval must stay below PRESENCE_TTL_SEC.
+    member = _presence_member()
+    event_bus.heartbeat(member, room_pk)
+
+    def generate():
+        try:
+            # Tell EventSource how long to wait before reconnecting (ms).
+            yield "retry: 2000\n\n"
+            yield from backlog_events
+            if backlog_truncated:
+                # Too far behind for one page: let the client reconnect from
+                # the last cursor it got instead of skipping the gap.
+                return
+            deadline = time.monotonic() + max_duration
+            while not sub.lagged:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                item = sub.get(timeout=min(keepalive, remaining))
+                if item is None:
+                    event_bus.heartbeat(member, room_pk)
+                    yield ": keepalive\n\n"
+                    continue
+                if item.payload["id"] in seen_ids:
+                    continue
+                yield _sse_event(item)
+        finally:
+            chat_hub.unsubscribe(sub)
+
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @api_bp.post("/api/chat/<room_id>")
 def chat_post(room_id: str):
-    """Append a message to room chat and return it."""
+    """Append a message to room chat and return it (write-behind, see app/chat_writer.py)."""
 
     data = request.get_json(silent=True) or {}
     text = (data.get("text") or "").strip()
@@ -451,12 +1096,31 @@ def chat_post(room_id: str):
     except ValueError:
         return jsonify({"error": "Room not found"}), 404
 
-    room: Room | None = Room.query.get(room_pk)
-    if room is None:
+    # Before the room lookup, so a flood never reaches the database.
+    limited = rate_limited(
+        chat_user=_presence_member(),
+        chat_ip=request.remote_addr,
+        chat_room=room_pk,
+    )
+    if limited:
+        return limited
+
+    if not chat_writer.room_exists(room_pk):
         return jsonify({"error": "Room not found"}), 404
 
-    msg = ChatMessage(room_id=room_pk, author=author, text=text)
-    db.session.add(msg)
-    db.session.commit()
+    # id / createdAt are final at this point; the row (and its seq) is written by
+    # chat_writer according to CHAT_WRITE_DURABILITY.
+    msg = chat_writer.new_message(room_pk, author, text)
+    try:
+        chat_writer.submit(msg)
+    except WriterBusy:
+        return busy_response()
+    except LookupError:
+        return jsonify({"error": "Room not found"}), 404
+
+    item = chat_item(msg)
+    chat_cache.append(room_pk, position_key(msg.created_at, msg.id), item)
+    chat_hub.publish(room_pk, item)
+    event_bus.publish("chat", {"room": room_pk, "cursor": item.cursor, "json": item.json})
 
-    return jsonify({"message": chat_message_to_dict(msg)}), 201
+    return Response(json_object({}, {"message": item.json}), status=201, mimetype="application/json")
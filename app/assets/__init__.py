@@ -0,0 +1,126 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Fingerprinted, precompressed static assets.
+
+``python -m app.assets build`` copies ``app/static`` and the design art
+assets to ``ASSETS_DIR`` (default ``instance/assets``) under content-hashed
+names, with ``.br`` / ``.gz`` siblings for text files and a ``manifest.json``
+(see :mod:`app.assets.build`).
+
+When the manifest exists and ``ASSETS_ENABLED`` is on,
+``url_for("static", filename=...)`` and ``url_for("art_assets", ...)`` return
+the hashed URLs, and those URLs are served from the build with
+``Cache-Control: public, max-age=ASSETS_MAX_AGE_SEC, immutable`` and the best
+precompressed variant the client accepts. Any other file falls through to the
+normal views, so nothing breaks before the first build; after editing an
+asset, build again (or set ``ASSETS_ENABLED=0`` while working on the UI).
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import mimetypes
+import os
+
+from flask import request, send_file
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+STATIC_DIR = os.path.join(ROOT, "app", "static")
+ART_DIR = os.path.join(ROOT, "design", "screenshots_photos", "art_assets")
+
+# source -> (directory, URL prefix); endpoint -> source
+SOURCES = {
+    "static": (STATIC_DIR, "/static"),
+    "art": (ART_DIR, "/assets/art"),
+}
+ENDPOINTS = {"static": "static", "art_assets": "art"}
+
+MANIFEST = "manifest.json"
+ENCODING_SUFFIX = {"br": ".br", "gzip": ".gz"}
+
+
+def default_dir(instance_path: str) -> str:
+    return os.path.join(instance_path, "assets")
+
+
+class Assets:
+    def __init__(self):
+        self.directory = ""
+        self.max_age = 31536000
+        # source -> {original path: hashed path}
+        self.urls: dict[str, dict[str, str]] = {source: {} for source in SOURCES}
+        # source -> {hashed path: available encodings, best first}
+        self.files: dict[str, dict[str, tuple[str, ...]]] = {source: {} for source in SOURCES}
+
+    def init_app(self, app) -> None:
+        """Call after the ``art_assets`` route is registered."""
+
+        cfg = app.config
+        self.directory = cfg["ASSETS_DIR"] or default_dir(app.instance_path)
+        self.max_age = cfg["ASSETS_MAX_AGE_SEC"]
+        app.extensions["assets"] = self
+        if not cfg["ASSETS_ENABLED"] or not self.load():
+            return
+        app.url_defaults(self._url_defaults)
+        for endpoint, source in ENDPOINTS.items():
+            app.view_functions[endpoint] = self._serving(source, app.view_functions[endpoint])
+
+    def load(self) -> bool:
+        """Read the manifest; False if there is no build yet."""
+
+        try:
+            with open(os.path.join(self.directory, MANIFEST), encoding="utf-8") as fh:
+                manifest = json.load(fh)
+        except FileNotFoundError:
+            return False
+        for source in SOURCES:
+            urls, files = {}, {}
+            for path, entry in manifest["files"].get(source, {}).items():
+                name = entry["file"]
+                # A partly deleted build must not turn into 500s.
+                if os.path.isfile(os.path.join(self.directory, source, *name.split("/"))):
+                    urls[path] = name
+                    files[name] = tuple(entry["encodings"])
+            self.urls[source], self.files[source] = urls, files
+        return True
+
+    def _url_defaults(self, endpoint: str, values: dict) -> None:
+        source = ENDPOINTS.get(endpoint)
+        if source is not None:
+            name = self.urls[source].get(values.get("filename"))
+            if name is not None:
+                values["filename"] = name
+
+    def _serving(self, source: str, view):
+        files = self.files[source]
+
+        @functools.wraps(view)
+        def serve(filename: str, **kwargs):
+            encodings = files.get(filename)
+            if encodings is None:
+                return view(filename=filename, **kwargs)
+            return self._send(source, filename, encodings)
+
+        return serve
+
+    def _send(self, source: str, name: str, encodings: tuple[str, ...]):
+        path = os.path.join(self.directory, source, *name.split("/"))
+        accept = request.accept_encodings
+        encoding = max(encodings, key=accept.quality, default=None)
+        if encoding is not None and not accept.quality(encoding):
+            encoding = None
+        mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        if encoding is not None:
+            path += ENCODING_SUFFIX[encoding]
+        resp = send_file(path, mimetype=mimetype, max_age=self.max_age)
+        if encoding is not None:
+            resp.headers["Content-Encoding"] = encoding
+        if encodings:
+            resp.vary.add("Accept-Encoding")
+        resp.cache_control.immutable = True
+        return resp
+
+
+assets = Assets()
@@ -0,0 +1,33 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""CLI entrypoint: ``python -m app.assets build [--out DIR]``."""
+
+from __future__ import annotations
+
+import argparse
+import os
+
+from config import Config
+
+from . import ROOT, default_dir
+from .build import brotli, build
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.assets", description="Static asset pipeline.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    cmd = sub.add_parser("build", help="fingerprint and precompress app/static and the art assets")
+    cmd.add_argument("--out", default=Config.ASSETS_DIR or default_dir(os.path.join(ROOT, "instance")),
+                     help="output directory (default: ASSETS_DIR or instance/assets)")
+    args = parser.parse_args(argv)
+
+    stats = build(args.out)
+    print(
+        f"{stats['files']} files ({stats['bytes'] / 1024:.0f} KiB) -> {args.out}; "
+        f"{stats['compressed']} precompressed variants ({stats['compressed_bytes'] / 1024:.0f} KiB)"
+        + ("" if brotli is not None else "; brotli not installed, gzip only")
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Asset build: fingerprint, rewrite CSS references, precompress.
+
+Every file of every source is copied to ``<out>/<source>/`` under a name with
+a content hash (``css/style.css`` -> ``css/style.3f9a0c12be.css``). CSS is
+hashed after its ``url(...)`` references to other built files are rewritten to
+their hashed names, so a changed image also changes the stylesheet's URL.
+Text files get ``.br`` (when the ``brotli`` package is installed) and ``.gz``
+siblings if compression saves enough. ``manifest.json`` is written last.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import posixpath
+import re
+import shutil
+
+try:  # optional: without it only gzip variants are built
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+from . import ENCODING_SUFFIX, MANIFEST, SOURCES
+
+
+TEXT_TYPES = {".css", ".js", ".mjs", ".svg", ".json", ".html", ".txt", ".map", ".xml"}
+SKIP_SUFFIXES = (".license",)
+
+# Files smaller than this, or variants saving less than 5%, are not worth it.
+MIN_COMPRESS_BYTES = 256
+MIN_SAVING = 0.05
+
+_CSS_URL = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+
+def hashed_name(path: str, digest: str) -> str:
+    """``css/style.css`` -> ``css/style.<digest>.css``."""
+
+    head, base = posixpath.split(path)
+    stem, dot, ext = base.rpartition(".")
+    name = f"{stem}.{digest}.{ext}" if dot else f"{base}.{digest}"
+    return posixpath.join(head, name)
+
+
+def _walk(root: str) -> list[str]:
+    paths = []
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.endswith(SKIP_SUFFIXES):
+                continue
+            full = os.path.join(dirpath, filename)
+            paths.append(os.path.relpath(full, root).replace(os.sep, "/"))
+    return sorted(paths)
+
+
+def _rewrite_css(css: str, source: str, path: str, hashed: dict[str, dict[str, str]]) -> str:
+    prefixes = {prefix.rstrip("/") + "/": name for name, (_, prefix) in SOURCES.items()}
+    base = posixpath.dirname(path)
+
+    def replace(match: re.Match) -> str:
+        quote, url = match.group(1), match.group(2).strip()
+        cut = min((i for i in (url.find("?"), url.find("#")) if i >= 0), default=len(url))
+        target, suffix = url[:cut], url[cut:]
+        if not target or "${" in target or re.match(r"^[a-z][a-z0-9+.-]*:|^//", target, re.I):
+            return match.group(0)
+        if target.startswith("/"):
+            for prefix, name in prefixes.items():
+                if target.startswith(prefix):
+                    new = hashed[name].get(target[len(prefix):])
+                    if new is not None:
+                        return f"url({quote}{prefix}{new}{suffix}{quote})"
+            return match.group(0)
+        new = hashed[source].get(posixpath.normpath(posixpath.join(base, target)))
+        if new is None:
+            return match.group(0)
+        return f"url({quote}{posixpath.relpath(new, base or '.')}{suffix}{quote})"
+
+    return _CSS_URL.sub(replace, css)
+
+
+def _variants(data: bytes) -> dict[str, bytes]:
+    if len(data) < MIN_COMPRESS_BYTES:
+        return {}
+    packed = {}
+    if brotli is not None:
+        packed["br"] = brotli.compress(data, quality=11)
+    packed["gzip"] = gzip.compress(data, compresslevel=9, mtime=0)
+    limit = len(data) * (1 - MIN_SAVING)
+    return {encoding: body for encoding, body in packed.items() if len(body) <= limit}
+
+
+def build(out_dir: str) -> dict[str, int]:
+    """Build every source into ``out_dir``; returns file and byte counts."""
+
+    files: dict[str, dict[str, dict]] = {}
+    hashed: dict[str, dict[str, str]] = {}
+    stats = {"files": 0, "bytes": 0, "compressed": 0, "compressed_bytes": 0}
+
+    for source in SOURCES:
+        shutil.rmtree(os.path.join(out_dir, source), ignore_errors=True)
+        files[source] = {}
+        hashed[source] = {}
+
+    # Everything else first, so stylesheets can point at the hashed names.
+    plan = [(source, path) for source, (root, _) in SOURCES.items() for path in _walk(root)]
+    plan.sort(key=lambda item: posixpath.splitext(item[1])[1] == ".css")
+
+    for source, path in plan:
+        root = SOURCES[source][0]
+        with open(os.path.join(root, path), "rb") as fh:
+            data = fh.read()
+        if path.endswith(".css"):
+            data = _rewrite_css(data.decode("utf-8"), source, path, hashed).encode("utf-8")
+        name = hashed_name(path, hashlib.sha256(data).hexdigest()[:10])
+        target = os.path.join(out_dir, source, *name.split("/"))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as fh:
+            fh.write(data)
+
+        encodings = []
+        if posixpath.splitext(path)[1].lower() in TEXT_TYPES:
+            for encoding, body in _variants(data).items():
+                with open(target + ENCODING_SUFFIX[encoding], "wb") as fh:
+                    fh.write(body)
+                encodings.append(encoding)
+                stats["compressed"] += 1
+                stats["compressed_bytes"] += len(body)
+        hashed[source][path] = name
+        files[source][path] = {"file": name, "encodings": encodings}
+        stats["files"] += 1
+        stats["bytes"] += len(data)
+
+    tmp = os.path.join(out_dir, MANIFEST + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump({"version": 1, "files": files}, fh, indent=1, sort_keys=True)
+    os.replace(tmp, os.path.join(out_dir, MANIFEST))
+    return stats
@@ -0,0 +1,219 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Per-room ring buffers of recent chat messages.
+
+Most history requests want the latest page or a short ``after`` / ``sinceId``
+delta, so every room keeps its newest ``CHAT_CACHE_ROOM_SIZE`` messages in
+memory, already encoded (:class:`~app.serialization.ChatItem`), and those
+requests never reach the database. Rooms are evicted least-recently-used once the estimated
+size of all buffers exceeds ``CHAT_CACHE_MAX_BYTES``.
+
+A ring is always a contiguous, newest-first suffix of the room's history:
+``chat_post`` appends every message as it is acknowledged (before the
+write-behind flush, so the ring is never behind the stream), and the first
+read of a room merges in the newest rows from the database. Pages the ring
+cannot answer in full (older history) return None and the caller queries the
+database. With several workers, messages posted elsewhere arrive through
+:mod:`app.events` and are appended the same way; that needs a cross-process
+bus, so with ``WEB_CONCURRENCY`` > 1 and ``EVENT_BUS=memory`` the cache turns
+itself off and every read goes to the database.
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import datetime
+
+from sqlalchemy import select
+
+from .models import CHAT_MESSAGE_COLUMNS, ChatMessage, db
+from .pagination import decode_cursor, position_key
+from .serialization import ChatItem, chat_item
+
+
+# Rough per-message overhead of the key, cursor, payload dict and JSON (bytes).
+_ENTRY_OVERHEAD = 400
+
+
+class _Ring:
+    __slots__ = ("keys", "items", "sizes", "bytes", "warm", "has_all")
+
+    def __init__(self):
+        self.keys: list[tuple[int, str]] = []  # position_key, ascending
+        self.items: list[ChatItem] = []  # same order
+        self.sizes: list[int] = []
+        self.bytes = 0
+        # warm: merged with the newest DB rows; has_all: nothing older exists.
+        self.warm = False
+        self.has_all = False
+
+    def add(self, key: tuple[int, str], item: ChatItem) -> int:
+        i = bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return 0
+        size = _ENTRY_OVERHEAD + 3 * len(item.json)
+        self.keys.insert(i, key)
+        self.items.insert(i, item)
+        self.sizes.insert(i, size)
+        self.bytes += size
+        return size
+
+    def trim(self, capacity: int) -> int:
+        excess = len(self.keys) - capacity
+        if excess <= 0:
+            return 0
+        freed = sum(self.sizes[:excess])
+        del self.keys[:excess], self.items[:excess], self.sizes[:excess]
+        self.bytes -= freed
+        self.has_all = False
+        return freed
+
+
+class ChatRingCache:
+    def __init__(self, room_size: int = 200, max_bytes: int = 32 * 1024 * 1024):
+        self.app = None
+        self.room_size = room_size
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._rooms: OrderedDict[int, _Ring] = OrderedDict()
+        self._bytes = 0
+
+    def init_app(self, app) -> None:
+        cfg = app.config
+        self.room_size = cfg["CHAT_CACHE_ROOM_SIZE"]
+        self.max_bytes = cfg["CHAT_CACHE_MAX_BYTES"]
+        self.app = app
+        if self.enabled and cfg["WEB_CONCURRENCY"] > 1 and cfg["EVENT_BUS"] == "memory":
+            # Other workers' messages would never reach this process's rings.
+            app.logger.warning(
+                "chat cache disabled: %d workers share no event bus (set EVENT_BUS=redis)", cfg["WEB_CONCURRENCY"]
+            )
+            self.room_size = 0
+        self.clear()
+        app.extensions["chat_cache"] = self
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rooms.clear()
+            self._bytes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.room_size > 0 and self.max_bytes > 0
+
+    # ---------- writes ----------
+
+    def append(self, room_id: int, key: tuple[int, str], item: ChatItem) -> None:
+        """Record an acknowledged message at its ``position_key`` (called by
+        ``chat_post`` and for messages posted on other workers)."""
+
+        if not self.enabled:
+            return
+        with self._lock:
+            ring = self._rooms.get(room_id)
+            if ring is None:
+                ring = self._rooms[room_id] = _Ring()
+            self._rooms.move_to_end(room_id)
+            self._bytes += ring.add(key, item)
+            self._bytes -= ring.trim(self.room_size)
+            self._evict()
+
+    def set_seqs(self, room_id: int, seqs: dict[str, int]) -> None:
+        """Fill in ``seq`` for cached messages once they are written (id -> seq)."""
+
+        with self._lock:
+            ring = self._rooms.get(room_id)
+            if ring is None:
+                return
+            # Just-written messages are among the newest: scan from the end.
+            for i in range(len(ring.items) - 1, -1, -1):
+                if not seqs:
+                    break
+                item = ring.items[i]
+                seq = seqs.pop(item.payload["id"], None)
+                if seq is not None and item.payload.get("seq") != seq:
+                    payload = {**item.payload, "seq": seq}
+                    ring.items[i] = ChatItem(item.cursor, payload, self.app.json.dumps(payload))
+
+    def _warm(self, room_id: int) -> _Ring:
+        """Ring for a read; merges the newest DB rows into a cold ring."""
+
+        with self._lock:
+            ring = self._rooms.get(room_id)
+            if ring is not None and ring.warm:
+                self._rooms.move_to_end(room_id)
+                return ring
+
+        msgs = db.session.execute(
+            select(*CHAT_MESSAGE_COLUMNS)
+            .where(ChatMessage.room_id == room_id)
+            .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+            .limit(self.room_size + 1)
+        ).all()
+        items = [chat_item(m) for m in msgs[: self.room_size]]
+        with self._lock:
+            ring = self._rooms.get(room_id)
+            if ring is None:
+                ring = self._rooms[room_id] = _Ring()
+            self._rooms.move_to_end(room_id)
+            if not ring.warm:
+                for m, item in zip(msgs, items):
+                    self._bytes += ring.add(position_key(m.created_at, m.id), item)
+                ring.has_all = len(msgs) <= self.room_size
+                ring.warm = True
+                self._bytes -= ring.trim(self.room_size)
+                self._evict()
+            return ring
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and len(self._rooms) > 1:
+            _, ring = self._rooms.popitem(last=False)
+            self._bytes -= ring.bytes
+
+    # ---------- reads ----------
+
+    def position_of(self, room_id: int, field: str, value) -> tuple[datetime, str] | None:
+        """``(created_at, id)`` of a cached message whose payload ``field``
+        (e.g. ``"id"``) equals ``value``; resolves ``sinceId``."""
+
+        with self._lock:
+            ring = self._rooms.get(room_id)
+            if ring is None:
+                return None
+            for item in reversed(ring.items):
+                if item.payload[field] == value:
+                    return decode_cursor(item.cursor)
+        return None
+
+    def page(self, room_id: int, anchor: tuple[datetime, str] | None, forward: bool, limit: int):
+        """Serve a ``_chat_page`` request from memory.
+
+        Returns ``(items, has_more, has_older)`` with :class:`ChatItem` items,
+        like the DB path, or None when the ring does not hold the whole
+        answer (the anchor or the page reaches past its oldest message).
+        """
+
+        if not self.enabled:
+            return None
+        ring = self._warm(room_id)
+        key = position_key(*anchor) if anchor is not None else None
+        with self._lock:
+            keys = ring.keys
+            if forward:
+                if not ring.has_all and (not keys or key < keys[0]):
+                    return None
+                start = bisect_right(keys, key)
+                items = ring.items[start : start + limit + 1]
+                return items[:limit], len(items) > limit, True
+
+            end = len(keys) if key is None else bisect_left(keys, key)
+            start = max(0, end - limit)
+            if start == 0 and end < limit and not ring.has_all:
+                return None
+            # A trimmed ring means older rows exist in the database.
+            return ring.items[start:end], False, start > 0 or not ring.has_all
+
+
+chat_cache = ChatRingCache()
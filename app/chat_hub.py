@@ -0,0 +1,93 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""In-process fan-out of new chat messages to parked stream readers.
+
+``chat_post`` publishes each committed message; every open
+``/api/chat/<room_id>/stream`` holds a :class:`Subscription` and blocks on it.
+Rooms nobody is listening to cost a single dict lookup per publish. Messages
+posted on other workers are published here by the :mod:`app.events` handler.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+
+
+class Subscription:
+    """One reader's bounded inbox for a single room."""
+
+    __slots__ = ("room_id", "lagged", "_queue")
+
+    def __init__(self, room_id: int, maxsize: int):
+        self.room_id = room_id
+        # Set when the reader fell behind and dropped messages; the stream
+        # must end so the client reconnects and resyncs from its cursor.
+        self.lagged = False
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+
+    def offer(self, item) -> None:
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.lagged = True
+
+    def get(self, timeout: float):
+        """Block until the next item arrives; ``None`` on timeout."""
+
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class ChatHub:
+    """Registry of per-room subscriptions."""
+
+    def __init__(self, queue_size: int = 256):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._rooms: dict[int, set[Subscription]] = {}
+
+    def subscribe(self, room_id: int) -> Subscription:
+        sub = Subscription(room_id, self.queue_size)
+        with self._lock:
+            self._rooms.setdefault(room_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._rooms.get(sub.room_id)
+            if subs is None:
+                return
+            subs.discard(sub)
+            if not subs:
+                del self._rooms[sub.room_id]
+
+    def publish(self, room_id: int, item) -> int:
+        """Hand ``item`` to every reader of the room; returns how many got it."""
+
+        with self._lock:
+            subs = self._rooms.get(room_id)
+            if not subs:
+                return 0
+            subs = tuple(subs)
+        for sub in subs:
+            sub.offer(item)
+        return len(subs)
+
+    def lag_all(self) -> None:
+        """End every stream (events may have been missed); clients resync from their cursor."""
+
+        with self._lock:
+            subs = [sub for room in self._rooms.values() for sub in room]
+        for sub in subs:
+            sub.lagged = True
+            sub.offer(None)  # wake the reader; get() then looks like a timeout
+
+    def subscriber_count(self, room_id: int) -> int:
+        with self._lock:
+            return len(self._rooms.get(room_id, ()))
+
+
+chat_hub = ChatHub()
@@ -0,0 +1,74 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Per-room chat sequence numbers.
+
+Every stored message gets ``seq``: 1, 2, 3, ... within its room, in the order
+the rows were committed. Clients resume with ``afterSeq=<n>``, a range seek on
+the unique ``(room_id, seq)`` index (``WHERE seq > n ORDER BY seq``). Legacy
+string ids keep working through ``sinceId`` (primary-key lookup).
+
+Numbers are taken when the row is written, not when the message is
+acknowledged: :func:`assign_seqs` bumps the room's ``rooms.chat_seq``
+counter by the size of the batch with one ``UPDATE ... RETURNING`` inside the
+batch's own transaction. The room row stays locked until that transaction
+commits, so every API process shares one sequence, and a reader that sees
+``seq`` n has already been able to see every smaller one: paging by ``seq``
+never skips a message written by another worker. A message still waiting in
+the write-behind buffer has ``seq`` null.
+
+The column and its backfill are migration 0003, the counter migration 0004
+(``python -m app.migrations``).
+"""
+
+from __future__ import annotations
+
+from sqlalchemy import text, update
+
+from .models import Room
+
+
+def assign_seqs(conn, rows: list[dict]) -> list[dict]:
+    """Give ``rows`` (``chat_messages`` values) their ``seq`` within ``conn``'s transaction.
+
+    Rows are numbered per room in list order, with one counter update per
+    room. Returns the rows whose room still exists; the others are left out.
+    """
+
+    by_room: dict[int, list[dict]] = {}
+    for row in rows:
+        by_room.setdefault(row["room_id"], []).append(row)
+    kept = []
+    for room_id, room_rows in by_room.items():
+        last = conn.execute(
+            update(Room)
+            .where(Room.id == room_id)
+            # Explicit updated_at: a chat line is not a change to the room.
+            .values(chat_seq=Room.chat_seq + len(room_rows), updated_at=Room.updated_at)
+            .returning(Room.chat_seq)
+        ).scalar_one_or_none()
+        if last is None:
+            continue
+        for seq, row in enumerate(room_rows, start=last - len(room_rows) + 1):
+            row["seq"] = seq
+        kept += room_rows
+    return kept
+
+
+def backfill(conn) -> int:
+    """Number every message per room in ``(created_at, id)`` order; returns rows updated.
+
+    Renumbers from scratch inside the caller's transaction (clearing first so
+    the unique index never sees a transient duplicate). Used by migration 0003,
+    which runs while the API is stopped.
+    """
+
+    conn.execute(text("UPDATE chat_messages SET seq = NULL"))
+    result = conn.execute(
+        text(
+            "UPDATE chat_messages SET seq = n.rn FROM ("
+            " SELECT id, row_number() OVER (PARTITION BY room_id ORDER BY created_at, id) AS rn"
+            " FROM chat_messages) AS n"
+            " WHERE chat_messages.id = n.id"
+        )
+    )
+    return result.rowcount
@@ -0,0 +1,349 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Write-behind chat ingestion.
+
+``chat_post`` no longer commits one transaction per line. The message gets its
+``created_at`` and a time-ordered id right away, is published to live readers
+and acknowledged, and a background thread writes the buffered rows with one
+multi-row ``INSERT`` per batch. A batch is flushed once ``CHAT_WRITE_BATCH_SIZE``
+rows are waiting or ``CHAT_WRITE_FLUSH_MS`` after its first row arrived.
+
+``CHAT_WRITE_DURABILITY``:
+
+- ``async``: acknowledge before the write (fastest; a crash loses at most
+  one flush interval of messages);
+- ``batch``: group commit, the request waits for the batch containing its
+  message to commit. Batches are written as soon as the writer is idle (no
+  flush timer), so they grow naturally while the previous write runs;
+- ``sync``: commit every message on the request thread (old behaviour).
+
+Recent history reads are served from ``app.chat_cache``, which sees every
+message at acknowledgement; only older pages read the database, so in ``async``
+mode they can trail the stream by up to one flush interval.
+Pending rows are flushed at interpreter exit.
+
+``seq`` is numbered in the same transaction that writes the rows
+(:func:`~app.chat_seq.assign_seqs`, one counter update per room and batch), so
+the request path never waits on the database for it. ``sync`` and ``batch``
+responses carry it; in ``async`` mode it is null until the batch is written,
+and the ``chat_seq`` event then fills it in for the ring buffers.
+
+A batch that fails for any reason other than an integrity error (database
+down, lock timeout) is kept and retried with exponential backoff, capped at
+``CHAT_WRITE_RETRY_MAX_MS``; newer rows queue behind it and count against
+``CHAT_WRITE_MAX_PENDING``. In ``async`` mode it is retried until it is stored,
+since its messages were already acknowledged. In ``batch`` mode the requests
+are still waiting, so after ``BATCH_ATTEMPTS`` tries they get the error
+instead. Failed attempts are counted in ``write_failures``
+(``chat_write_failures_total`` in app/metrics.py).
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from .chat_seq import assign_seqs
+from .events import event_bus
+from .models import ChatMessage, Room, db
+
+
+ASYNC = "async"
+BATCH = "batch"
+SYNC = "sync"
+
+# Writes tried per batch in ``batch`` mode before the waiting requests fail.
+BATCH_ATTEMPTS = 3
+RETRY_MIN_SEC = 0.1
+
+_ROW_COLUMNS = ("id", "room_id", "seq", "author", "text", "created_at", "updated_at")
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class WriterBusy(RuntimeError):
+    """Too many unwritten messages (the database is not keeping up)."""
+
+
+class MonotonicIds:
+    """Strictly increasing ``(created_at, id)`` pairs for this process.
+
+    ``created_at`` has microsecond resolution and never repeats or goes
+    backwards; the id is a UUIDv7-shaped string built from that timestamp,
+    so ids sort in the same order as ``(created_at, id)`` keyset cursors.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_us = 0
+
+    def next(self) -> tuple[datetime, str]:
+        with self._lock:
+            now_us = time.time_ns() // 1000
+            us = now_us if now_us > self._last_us else self._last_us + 1
+            self._last_us = us
+        ms, sub_ms = divmod(us, 1000)
+        rand = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+        value = (ms << 80) | (0x7 << 76) | (sub_ms << 64) | (0b10 << 62) | rand
+        h = f"{value:032x}"
+        return _EPOCH + timedelta(microseconds=us), f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+class _Batch:
+    __slots__ = ("rows", "started", "done", "error", "attempts")
+
+    def __init__(self):
+        self.rows: list[dict] = []
+        self.started = time.monotonic()
+        self.done = threading.Event()
+        self.error: Exception | None = None
+        self.attempts = 0
+
+
+class ChatWriter:
+    def __init__(self):
+        self.ids = MonotonicIds()
+        self.durability = ASYNC
+        self.batch_size = 100
+        self.flush_interval = 0.05
+        self.max_pending = 10_000
+        self.retry_max = 5.0
+        self.write_failures = 0
+        self.app = None
+        self._cond = threading.Condition()
+        self._batch = _Batch()
+        self._pending = 0
+        # Failed batches, oldest first; retried before anything newer.
+        self._retry: deque[_Batch] = deque()
+        self._retry_at = 0.0
+        self._retry_delay = RETRY_MIN_SEC
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        self._known_rooms: set[int] = set()
+
+    def init_app(self, app) -> None:
+        cfg = app.config
+        self.app = app
+        self.durability = cfg["CHAT_WRITE_DURABILITY"]
+        if self.durability not in (ASYNC, BATCH, SYNC):
+            raise ValueError(f"CHAT_WRITE_DURABILITY must be async, batch or sync, not {self.durability!r}")
+        self.batch_size = max(1, cfg["CHAT_WRITE_BATCH_SIZE"])
+        self.flush_interval = cfg["CHAT_WRITE_FLUSH_MS"] / 1000.0
+        self.max_pending = cfg["CHAT_WRITE_MAX_PENDING"]
+        self.retry_max = max(RETRY_MIN_SEC, cfg["CHAT_WRITE_RETRY_MAX_MS"] / 1000.0)
+        app.extensions["chat_writer"] = self
+
+    @property
+    def pending(self) -> int:
+        """Messages accepted but not yet written (including failed batches)."""
+
+        return self._pending
+
+    # ---------- request side ----------
+
+    def room_exists(self, room_id: int) -> bool:
+        """Existence check with a positive cache: rooms are never deleted via
+        the API, and a row for a vanished room is dropped at flush time."""
+
+        if room_id in self._known_rooms:
+            return True
+        if db.session.get(Room, room_id) is None:
+            return False
+        if len(self._known_rooms) >= 100_000:
+            self._known_rooms.clear()
+        self._known_rooms.add(room_id)
+        return True
+
+    def new_message(self, room_id: int, author: str, text: str) -> ChatMessage:
+        """A transient message with its final ``id`` / ``created_at`` assigned
+        (``seq`` comes with the write, see :meth:`submit`)."""
+
+        created_at, msg_id = self.ids.next()
+        return ChatMessage(
+            id=msg_id,
+            room_id=room_id,
+            author=author,
+            text=text,
+            created_at=created_at,
+            updated_at=created_at,
+        )
+
+    def submit(self, msg: ChatMessage) -> None:
+        """Persist ``msg`` according to the durability mode.
+
+        Sets ``msg.seq`` once the row is written (``sync`` and ``batch``).
+        Raises :class:`WriterBusy` when ``max_pending`` rows are unwritten,
+        :class:`LookupError` in ``sync`` mode if the room is gone, and
+        re-raises the flush error in ``batch`` mode.
+        """
+
+        row = {c: getattr(msg, c) for c in _ROW_COLUMNS}
+        if self.durability == SYNC:
+            if not assign_seqs(db.session.connection(), [row]):
+                db.session.rollback()
+                raise LookupError(f"room {msg.room_id} does not exist")
+            msg.seq = row["seq"]
+            db.session.add(msg)
+            db.session.commit()
+            return
+
+        with self._cond:
+            if self._pending >= self.max_pending:
+                raise WriterBusy()
+            batch = self._batch
+            if not batch.rows:
+                # The first row of a batch starts its flush timer.
+                batch.started = time.monotonic()
+            batch.rows.append(row)
+            self._pending += 1
+            if len(batch.rows) >= self.batch_size or len(batch.rows) == 1:
+                self._cond.notify()
+        self._ensure_thread()
+
+        if self.durability == BATCH:
+            batch.done.wait()
+            if batch.error is not None:
+                raise batch.error
+            msg.seq = row["seq"]
+
+    # ---------- flushing ----------
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="chat-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _take_batch(self, block: bool) -> _Batch | None:
+        with self._cond:
+            while True:
+                if self._retry:
+                    now = time.monotonic()
+                    if now >= self._retry_at or not block:
+                        return self._retry.popleft()
+                    self._cond.wait(self._retry_at - now)
+                    continue
+                batch = self._batch
+                if batch.rows:
+                    due = batch.started + (0 if self.durability == BATCH else self.flush_interval)
+                    now = time.monotonic()
+                    if len(batch.rows) >= self.batch_size or now >= due or not block:
+                        self._batch = _Batch()
+                        return batch
+                    self._cond.wait(due - now)
+                elif not block:
+                    return None
+                else:
+                    self._cond.wait()
+
+    def _loop(self) -> None:
+        while True:
+            batch = self._take_batch(block=True)
+            self._write(batch)
+
+    def _write(self, batch: _Batch) -> bool:
+        """Store ``batch``; False if it failed and was queued for a retry."""
+
+        batch.attempts += 1
+        try:
+            with self.app.app_context():
+                try:
+                    rows = assign_seqs(db.session.connection(), batch.rows)
+                    if rows:
+                        db.session.execute(insert(ChatMessage), rows)
+                    db.session.commit()
+                    self._stored(batch.rows, rows)
+                except IntegrityError:
+                    # One bad row (e.g. its room was deleted) must not sink the
+                    # rest of the batch: retry row by row and drop the offenders.
+                    db.session.rollback()
+                    self._write_rows_individually(batch.rows)
+                except Exception:
+                    db.session.rollback()
+                    raise
+        except Exception as exc:
+            with self._cond:
+                self.write_failures += 1
+                if self.durability == ASYNC or batch.attempts < BATCH_ATTEMPTS:
+                    self._retry.append(batch)
+                    self._retry_at = time.monotonic() + self._retry_delay
+                    # Failed on flush(): the writer thread may be idle-waiting.
+                    self._cond.notify()
+                    self.app.logger.exception(
+                        "chat writer: failed to store %d messages (attempt %d), retrying in %.1fs",
+                        len(batch.rows),
+                        batch.attempts,
+                        self._retry_delay,
+                    )
+                    self._retry_delay = min(self._retry_delay * 2, self.retry_max)
+                    return False
+            batch.error = exc
+            self.app.logger.exception("chat writer: gave up on %d messages", len(batch.rows))
+        else:
+            with self._cond:
+                self._retry_delay = RETRY_MIN_SEC
+        with self._cond:
+            self._pending -= len(batch.rows)
+        batch.done.set()
+        return True
+
+    def _write_rows_individually(self, rows: list[dict]) -> None:
+        for row in rows:
+            try:
+                stored = assign_seqs(db.session.connection(), [row])
+                if stored:
+                    db.session.execute(insert(ChatMessage), stored)
+                db.session.commit()
+                self._stored([row], stored)
+            except IntegrityError:
+                db.session.rollback()
+                row["seq"] = None
+                self.app.logger.warning("chat writer: dropped message %s for room %s", row["id"], row["room_id"])
+
+    def _stored(self, rows: list[dict], stored: list[dict]) -> None:
+        """After a commit: report rooms that vanished, publish the new ``seq`` numbers."""
+
+        if len(stored) < len(rows):
+            kept = {id(row) for row in stored}
+            for row in rows:
+                if id(row) not in kept:
+                    row["seq"] = None
+                    self.app.logger.warning(
+                        "chat writer: dropped message %s for deleted room %s", row["id"], row["room_id"]
+                    )
+        by_room: dict[int, list] = {}
+        for row in stored:
+            by_room.setdefault(row["room_id"], []).append([row["id"], row["seq"]])
+        for room_id, seqs in by_room.items():
+            event_bus.publish("chat_seq", {"room": room_id, "seqs": seqs})
+
+    def flush(self) -> None:
+        """Write everything buffered so far on the calling thread.
+
+        Stops at the first failed write; the rows stay pending for the
+        writer thread's retries.
+        """
+
+        while True:
+            batch = self._take_batch(block=False)
+            if batch is None or not self._write(batch):
+                return
+
+    def close(self) -> None:
+        if self._closed or self.app is None:
+            return
+        self._closed = True
+        self.flush()
+
+
+chat_writer = ChatWriter()
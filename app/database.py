@@ -0,0 +1,192 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Database engine setup: deployment profiles, startup checks, pool metrics.
+
+``Config.DB_PROFILES`` holds named engine settings ("dev" for SQLite, "prod"
+for PostgreSQL behind gunicorn); ``DB_*`` variables override single values.
+:func:`init_app` turns the chosen profile into ``SQLALCHEMY_ENGINE_OPTIONS``
+(and ``replica``, ``replica2``, ... binds), refuses to start on settings that cannot
+work, initialises ``db`` and attaches :class:`PoolMetrics` to every engine.
+Explicit ``SQLALCHEMY_ENGINE_OPTIONS`` from config or tests win over the
+profile.
+"""
+
+from __future__ import annotations
+
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+
+from .models import db
+
+
+# (profile key, config override, parser)
+_OVERRIDES = (
+    ("pool_size", "DB_POOL_SIZE", int),
+    ("max_overflow", "DB_MAX_OVERFLOW", int),
+    ("pool_timeout_sec", "DB_POOL_TIMEOUT_SEC", float),
+    ("pool_recycle_sec", "DB_POOL_RECYCLE_SEC", int),
+    ("pool_pre_ping", "DB_POOL_PRE_PING", lambda v: str(v).lower() in ("1", "true", "yes", "on")),
+    ("statement_timeout_ms", "DB_STATEMENT_TIMEOUT_MS", int),
+)
+
+
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _is_postgres(url: str) -> bool:
+    return make_url(url).get_backend_name() == "postgresql"
+
+
+def replica_urls(cfg) -> list[str]:
+    """``DATABASE_REPLICA_URL`` split on commas (one URL per replica)."""
+
+    return [u.strip() for u in (cfg.get("DATABASE_REPLICA_URL") or "").split(",") if u.strip()]
+
+
+def resolve_profile(cfg) -> tuple[str, dict]:
+    """``(name, settings)`` of the active profile with ``DB_*`` overrides applied."""
+
+    name = cfg["DB_PROFILE"] or ("prod" if _is_postgres(cfg["SQLALCHEMY_DATABASE_URI"]) else "dev")
+    profiles = cfg["DB_PROFILES"]
+    if name not in profiles:
+        raise ValueError(f"DB_PROFILE must be one of {', '.join(profiles)}, not {name!r}")
+    settings = dict(profiles[name])
+    for key, cfg_key, parse in _OVERRIDES:
+        value = cfg.get(cfg_key)
+        if value is not None and value != "":
+            try:
+                settings[key] = parse(value)
+            except ValueError:
+                raise ValueError(f"{cfg_key} must be a number, not {value!r}") from None
+    return name, settings
+
+
+def engine_options(url: str, settings: dict) -> dict:
+    """SQLAlchemy ``create_engine`` keyword arguments for ``url``."""
+
+    if _is_sqlite(url):
+        # SQLite gets Flask-SQLAlchemy's defaults (StaticPool for in-memory
+        # databases, which takes no sizing); the file lock serialises writers anyway.
+        return {}
+    opts: dict = {}
+    for key, arg in (
+        ("pool_size", "pool_size"),
+        ("max_overflow", "max_overflow"),
+        ("pool_timeout_sec", "pool_timeout"),
+        ("pool_recycle_sec", "pool_recycle"),
+        ("pool_pre_ping", "pool_pre_ping"),
+    ):
+        if key in settings:
+            opts[arg] = settings[key]
+    timeout_ms = settings.get("statement_timeout_ms") or 0
+    if timeout_ms and _is_postgres(url):
+        opts["connect_args"] = {"options": f"-c statement_timeout={int(timeout_ms)}"}
+    return opts
+
+
+def validate(cfg, name: str, settings: dict) -> list[str]:
+    """Problems that should stop the app from starting (empty list = fine)."""
+
+    problems = []
+    url = cfg["SQLALCHEMY_DATABASE_URI"]
+    if settings.get("pool_size", 1) < 1:
+        problems.append("pool_size must be at least 1")
+    for key in ("max_overflow", "pool_timeout_sec", "statement_timeout_ms"):
+        if settings.get(key, 0) < 0:
+            problems.append(f"{key} must not be negative")
+    if settings.get("pool_recycle_sec", -1) == 0:
+        problems.append("pool_recycle_sec must be positive (or -1 to disable)")
+
+    if name == "prod" and _is_sqlite(url):
+        problems.append("the prod profile needs a server database, DATABASE_URL points to SQLite")
+    if any(_is_sqlite(replica) != _is_sqlite(url) for replica in replica_urls(cfg)):
+        problems.append("DATABASE_REPLICA_URL must use the same database backend as DATABASE_URL")
+
+    budget = cfg.get("DB_MAX_CONNECTIONS") or 0
+    if budget and not _is_sqlite(url):
+        per_process = settings.get("pool_size", 5) + settings.get("max_overflow", 10)
+        needed = per_process * max(1, cfg.get("WEB_CONCURRENCY") or 1)
+        if needed > budget:
+            problems.append(
+                f"{cfg.get('WEB_CONCURRENCY')} workers x (pool_size + max_overflow = {per_process}) "
+                f"= {needed} connections exceeds DB_MAX_CONNECTIONS={budget}"
+            )
+    return problems
+
+
+class PoolMetrics:
+    """Connection pool counters of one engine, from SQLAlchemy pool events."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.invalidations = 0
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, *_):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, *_):
+        with self._lock:
+            self.checkouts += 1
+
+    def _on_invalidate(self, *_):
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self) -> dict:
+        pool = self.engine.pool
+        stats = {
+            "pool": type(pool).__name__,
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "invalidations": self.invalidations,
+        }
+        # QueuePool reports its occupancy; SQLite's Static/SingletonThread pools do not.
+        for attr in ("size", "checkedin", "checkedout", "overflow"):
+            fn = getattr(pool, attr, None)
+            if callable(fn):
+                stats[attr] = fn()
+        return stats
+
+
+def init_app(app) -> None:
+    """Configure engines from the DB profile, validate, and init ``db``."""
+
+    cfg = app.config
+    name, settings = resolve_profile(cfg)
+    problems = validate(cfg, name, settings)
+    if problems:
+        raise ValueError(f"invalid database settings (profile {name!r}): " + "; ".join(problems))
+
+    url = cfg["SQLALCHEMY_DATABASE_URI"]
+    cfg["SQLALCHEMY_ENGINE_OPTIONS"] = {**engine_options(url, settings), **cfg.get("SQLALCHEMY_ENGINE_OPTIONS", {})}
+    replica_keys = []
+    binds = dict(cfg.get("SQLALCHEMY_BINDS") or {})
+    for i, replica in enumerate(replica_urls(cfg)):
+        key = "replica" if i == 0 else f"replica{i + 1}"
+        binds.setdefault(key, {"url": replica, **engine_options(replica, settings)})
+        replica_keys.append(key)
+    if binds:
+        cfg["SQLALCHEMY_BINDS"] = binds
+
+    db.init_app(app)
+    with app.app_context():
+        metrics = {key or "primary": PoolMetrics(engine) for key, engine in db.engines.items()}
+    app.extensions["db_profile"] = name
+    app.extensions["db_replicas"] = replica_keys
+    app.extensions["db_pool_metrics"] = metrics
+
+
+def pool_stats(app) -> dict[str, dict]:
+    """Pool counters per engine (``primary``, ``replica``, ...), for metrics / health output."""
+
+    return {key: m.snapshot() for key, m in app.extensions["db_pool_metrics"].items()}
@@ -0,0 +1,174 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Read-replica routing for ``db.session``.
+
+Views marked :func:`read_only` (lobby list, chat history, profile page) run
+their SELECTs on a replica from ``DATABASE_REPLICA_URL``; everything else,
+and every INSERT / UPDATE / DELETE or flush even inside those views, uses the
+primary. One replica is picked per request, so a page reads one snapshot.
+
+- Read-your-writes: after a request that wrote, the client's Flask session
+  carries ``db_primary_until`` and its reads stay on the primary for
+  ``REPLICA_STICKY_SEC``, longer than normal replica lag.
+- Health: a replica is probed (``SELECT 1``, plus replay lag on PostgreSQL) at
+  most every ``REPLICA_HEALTH_INTERVAL_SEC`` and skipped while down or behind
+  by more than ``REPLICA_MAX_LAG_SEC``. A read-only view that fails with a
+  connection error on a replica marks it down and is re-run on the primary.
+
+Without replicas configured the routing is a no-op.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, g, has_request_context, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.sql.dml import UpdateBase
+
+
+_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class _Replica:
+    __slots__ = ("key", "healthy", "next_check", "checking")
+
+    def __init__(self, key: str):
+        self.key = key
+        self.healthy = True
+        self.next_check = 0.0
+        self.checking = False
+
+
+class ReplicaRouter:
+    def __init__(self):
+        self.app = None
+        self.replicas: list[_Replica] = []
+        self.sticky_sec = 5.0
+        self.health_interval = 10.0
+        self.max_lag = 10.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        cfg = app.config
+        self.app = app
+        self.replicas = [_Replica(key) for key in app.extensions.get("db_replicas", [])]
+        self.sticky_sec = cfg["REPLICA_STICKY_SEC"]
+        self.health_interval = cfg["REPLICA_HEALTH_INTERVAL_SEC"]
+        self.max_lag = cfg["REPLICA_MAX_LAG_SEC"]
+        app.after_request(self._remember_write)
+        app.extensions["replica_router"] = self
+
+    # ---------- routing ----------
+
+    def replica_for_request(self, engines) -> str | None:
+        """Bind key of the replica serving this request's reads, or None (primary)."""
+
+        if not self.replicas or not has_request_context() or not g.get("db_read_only"):
+            return None
+        if "db_replica" in g:
+            return g.db_replica
+        key = None
+        if session.get("db_primary_until", 0) <= time.time():
+            healthy = [r for r in self.replicas if self._is_healthy(r, engines)]
+            key = random.choice(healthy).key if healthy else None
+        g.db_replica = key
+        return key
+
+    def use_primary(self) -> None:
+        """Send the rest of this request's reads to the primary."""
+
+        g.db_replica = None
+
+    def note_write(self) -> None:
+        if has_request_context() and not g.get("db_read_only"):
+            g.db_wrote = True
+
+    def _remember_write(self, response):
+        if self.replicas and g.get("db_wrote"):
+            session["db_primary_until"] = int(time.time() + self.sticky_sec + 1)
+        return response
+
+    # ---------- health ----------
+
+    def mark_down(self, key: str) -> None:
+        for r in self.replicas:
+            if r.key == key:
+                r.healthy = False
+                r.next_check = time.monotonic() + self.health_interval
+
+    def _is_healthy(self, replica: _Replica, engines) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            due = now >= replica.next_check and not replica.checking
+            if due:
+                replica.checking = True
+        if due:
+            # One request pays for the probe; the rest use the last verdict.
+            try:
+                replica.healthy = self._probe(engines[replica.key])
+            finally:
+                replica.next_check = time.monotonic() + self.health_interval
+                replica.checking = False
+        return replica.healthy
+
+    def _probe(self, engine) -> bool:
+        try:
+            with engine.connect() as conn:
+                if engine.dialect.name == "postgresql":
+                    lag = conn.execute(_LAG_SQL).scalar() or 0
+                    if lag > self.max_lag:
+                        self.app.logger.warning("replica %s lags %.1fs, reading from primary", engine.url, lag)
+                        return False
+                else:
+                    conn.execute(text("SELECT 1"))
+        except DBAPIError:
+            self.app.logger.warning("replica %s is unreachable, reading from primary", engine.url)
+            return False
+        return True
+
+
+replica_router = ReplicaRouter()
+
+
+class RoutingSession(Session):
+    """``db.session`` class: replica for reads in :func:`read_only` views."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if self._flushing or isinstance(clause, UpdateBase):
+                replica_router.note_write()
+            else:
+                key = replica_router.replica_for_request(self._db.engines)
+                if key is not None:
+                    return self._db.engines[key]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def read_only(view):
+    """Serve a view's reads from a replica (see module docstring)."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.db_read_only = True
+        try:
+            return view(*args, **kwargs)
+        except OperationalError:
+            key = g.pop("db_replica", None)
+            if key is None:
+                raise
+            current_app.logger.warning("replica %s failed mid-request, retrying on primary", key)
+            replica_router.mark_down(key)
+            current_app.extensions["sqlalchemy"].session.rollback()
+            g.db_replica = None
+            return view(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,266 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Cross-worker event bus and online presence.
+
+Request handlers apply their effects to this worker's in-process state
+(``chat_hub``, ``chat_cache``, ``lobby_cache``) directly and then
+:meth:`EventBus.publish` an event so the other workers can do the same.
+Handlers are registered per topic with :meth:`EventBus.on` and run in the
+bus's listener thread without an app context; events published by this
+worker are marked :attr:`Event.local`.
+
+Topics:
+
+- ``chat``: ``{"room", "cursor", "json"}``, a posted message (its encoded
+  :class:`~app.serialization.ChatItem`);
+- ``chat_seq``: ``{"room", "seqs": [[id, seq], ...]}``, messages written by
+  a chat writer and the ``seq`` they got;
+- ``rooms``: ``{"room", "reason"}``, the lobby list or a room's capacity changed;
+- ``resync``: delivered locally after a lost connection to Redis; events may
+  have been missed, so handlers drop what they cache.
+
+Presence counts members (user id or anonymous session id) seen within
+``PRESENCE_TTL_SEC`` per scope (``"global"``, ``"room:<id>"``); clients keep
+themselves online with heartbeats, and reading a count never touches the
+database.
+
+Backends (``EVENT_BUS``): ``memory`` keeps everything in this process (tests,
+local runs, one worker); ``redis`` uses Redis pub/sub and sorted sets at
+``REDIS_URL`` and needs the ``redis`` package.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from typing import Callable, NamedTuple
+from uuid import uuid4
+
+try:  # optional: only the redis backend needs it
+    import redis
+except ImportError:  # pragma: no cover - depends on the environment
+    redis = None
+
+
+MEMORY = "memory"
+REDIS = "redis"
+
+GLOBAL = "global"
+
+log = logging.getLogger(__name__)
+
+
+def room_scope(room_id: int) -> str:
+    return f"room:{room_id}"
+
+
+class Event(NamedTuple):
+    topic: str
+    data: dict
+    local: bool
+
+
+Handler = Callable[[Event], None]
+
+
+class MemoryBackend:
+    """Single-process backend: delivery is a direct call, presence a dict.
+
+    Expired members are dropped from a scope when it is read, and from every
+    scope by a sweep that :meth:`touch` runs at most once per TTL, so scopes
+    nobody reads do not grow without bound.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._scopes: dict[str, dict[str, float]] = {}
+        self._sweep_at = 0.0
+
+    def start(self, deliver: Callable[[str, str, dict], None]) -> None:
+        self._deliver = deliver
+
+    def close(self) -> None:
+        pass
+
+    def publish(self, topic: str, origin: str, data: dict) -> None:
+        self._deliver(topic, origin, data)
+
+    def _prune(self, scope: str, now: float) -> int:
+        members = self._scopes.get(scope)
+        if not members:
+            self._scopes.pop(scope, None)
+            return 0
+        for member in [m for m, exp in members.items() if exp <= now]:
+            del members[member]
+        if not members:
+            del self._scopes[scope]
+        return len(members)
+
+    def touch(self, scopes: list[str], member: str, ttl: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._sweep_at:
+                for scope in list(self._scopes):
+                    self._prune(scope, now)
+                self._sweep_at = now + ttl
+            for scope in scopes:
+                self._scopes.setdefault(scope, {})[member] = now + ttl
+
+    def counts(self, scopes: list[str]) -> list[int]:
+        now = time.monotonic()
+        with self._lock:
+            return [self._prune(scope, now) for scope in scopes]
+
+
+class RedisBackend:
+    """Redis pub/sub for events; one sorted set per presence scope
+    (member -> expiry timestamp), trimmed on read."""
+
+    def __init__(self, url: str, prefix: str):
+        if redis is None:
+            raise ValueError("EVENT_BUS=redis but the redis package is not installed")
+        self.client = redis.Redis.from_url(url, socket_timeout=2, socket_connect_timeout=2)
+        self.prefix = prefix
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self, deliver: Callable[[str, str, dict], None]) -> None:
+        self._deliver = deliver
+        self._thread = threading.Thread(target=self._listen, name="event-bus", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self._stopped.set()
+
+    def publish(self, topic: str, origin: str, data: dict) -> None:
+        body = json.dumps({"o": origin, "d": data}, separators=(",", ":"))
+        self.client.publish(f"{self.prefix}events:{topic}", body)
+
+    def _listen(self) -> None:
+        channel_prefix = f"{self.prefix}events:"
+        backoff = 0.5
+        connected_before = False
+        while not self._stopped.is_set():
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.psubscribe(f"{channel_prefix}*")
+                if connected_before:
+                    self._deliver("resync", "", {})
+                connected_before = True
+                backoff = 0.5
+                while not self._stopped.is_set():
+                    msg = pubsub.get_message(timeout=1.0)
+                    if msg is None:
+                        continue
+                    try:
+                        topic = msg["channel"].decode()[len(channel_prefix):]
+                        body = json.loads(msg["data"])
+                        origin, data = body["o"], body["d"]
+                    except (ValueError, KeyError, TypeError):
+                        log.warning("event bus: dropping malformed message on %r", msg["channel"])
+                        continue
+                    self._deliver(topic, origin, data)
+            except redis.RedisError:
+                log.warning("event bus: lost connection to Redis, retrying in %.1fs", backoff)
+                self._stopped.wait(backoff)
+                backoff = min(backoff * 2, 10.0)
+            finally:
+                pubsub.close()
+
+    def _key(self, scope: str) -> str:
+        return f"{self.prefix}presence:{scope}"
+
+    def touch(self, scopes: list[str], member: str, ttl: float) -> None:
+        expires = time.time() + ttl
+        pipe = self.client.pipeline(transaction=False)
+        for scope in scopes:
+            pipe.zadd(self._key(scope), {member: expires})
+            pipe.expire(self._key(scope), int(ttl) + 1)
+        pipe.execute()
+
+    def counts(self, scopes: list[str]) -> list[int]:
+        now = time.time()
+        pipe = self.client.pipeline(transaction=False)
+        for scope in scopes:
+            pipe.zremrangebyscore(self._key(scope), "-inf", now)
+            pipe.zcard(self._key(scope))
+        return pipe.execute()[1::2]
+
+
+class EventBus:
+    def __init__(self):
+        self.origin = uuid4().hex
+        self.presence_ttl = 60.0
+        self._handlers: dict[str, list[Handler]] = {}
+        self._backend = MemoryBackend()
+        self._backend.start(self._deliver)
+
+    def init_app(self, app) -> None:
+        cfg = app.config
+        kind = cfg["EVENT_BUS"]
+        if kind == MEMORY:
+            backend = MemoryBackend()
+        elif kind == REDIS:
+            backend = RedisBackend(cfg["REDIS_URL"], cfg["EVENT_BUS_PREFIX"])
+        else:
+            raise ValueError(f"EVENT_BUS must be memory or redis, not {kind!r}")
+        self._backend.close()
+        self._backend = backend
+        backend.start(self._deliver)
+        self.presence_ttl = cfg["PRESENCE_TTL_SEC"]
+        app.extensions["event_bus"] = self
+
+    # ---------- events ----------
+
+    def on(self, topic: str) -> Callable[[Handler], Handler]:
+        """Decorator registering a handler for ``topic``."""
+
+        def register(fn: Handler) -> Handler:
+            self._handlers.setdefault(topic, []).append(fn)
+            return fn
+
+        return register
+
+    def publish(self, topic: str, data: dict) -> None:
+        """Tell every worker (this one included). The caller has already
+        applied the change locally, so a failure is logged, not raised."""
+
+        try:
+            self._backend.publish(topic, self.origin, data)
+        except Exception:
+            log.exception("event bus: could not publish %s", topic)
+
+    def _deliver(self, topic: str, origin: str, data: dict) -> None:
+        event = Event(topic, data, origin == self.origin)
+        for handler in self._handlers.get(topic, ()):
+            try:
+                handler(event)
+            except Exception:
+                log.exception("event bus: %s handler failed", topic)
+
+    # ---------- presence ----------
+
+    def heartbeat(self, member: str, room_id: int | None = None) -> None:
+        """Mark ``member`` online (globally, and in ``room_id``) for ``PRESENCE_TTL_SEC``."""
+
+        scopes = [GLOBAL] if room_id is None else [GLOBAL, room_scope(room_id)]
+        try:
+            self._backend.touch(scopes, member, self.presence_ttl)
+        except Exception:
+            log.exception("event bus: presence heartbeat failed")
+
+    def online(self, room_ids: list[int] = ()) -> tuple[int, dict[int, int]]:
+        """Global online count and per-room counts; zeros if the backend is down."""
+
+        scopes = [GLOBAL, *(room_scope(r) for r in room_ids)]
+        try:
+            counts = self._backend.counts(scopes)
+        except Exception:
+            log.exception("event bus: presence read failed")
+            counts = [0] * len(scopes)
+        return counts[0], dict(zip(room_ids, counts[1:]))
+
+
+event_bus = EventBus()
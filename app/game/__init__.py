@@ -0,0 +1,29 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Authoritative City Legends rules engine (docs/description/CONCEPT.md).
+
+Typical use::
+
+    state = new_match("quick", ["p_1", "p_2"], seed=42)
+    move = apply_action(state, "p_1", {"kind": "play_card", "card": 0})
+    move.diff  # -> move_committed.diff
+"""
+
+from .engine import Diff, IllegalAction, Move, apply_action, forfeit, legal_actions, perform
+from .rules import RULES, ModeRules
+from .state import MatchState, PlayerState, new_match
+
+__all__ = [
+    "Diff",
+    "IllegalAction",
+    "MatchState",
+    "ModeRules",
+    "Move",
+    "PlayerState",
+    "RULES",
+    "apply_action",
+    "forfeit",
+    "legal_actions",
+    "new_match",
+    "perform",
+]
@@ -0,0 +1,139 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Card and district catalog.
+
+Cards are referenced by their index in :data:`CARDS` everywhere in the
+engine (hands, decks and boards are ``array('B')`` of these indices); the
+string ``code`` is only used on the wire (``move_committed.diff``).
+
+Counts follow CONCEPT.md. The classic People table there adds up to 34 while
+the deck is specified as 45 cards with 30 People, so Школяр / Студент /
+Журналіст / Продавець keep their quick-deck counts in the classic deck.
+"""
+
+from __future__ import annotations
+
+from typing import NamedTuple
+
+
+PEOPLE = 0
+LEGEND = 1
+RUMOR = 2
+
+KIND_NAMES = ("people", "legend", "rumor")
+
+
+class CardType(NamedTuple):
+    code: str
+    name: str
+    kind: int
+    vp: int
+    hp: int
+    atk: int
+
+
+CARDS: tuple[CardType, ...] = (
+    # People: stable VP, 0-1 ATK, 1-2 HP.
+    CardType("card_people_001", "Школяр", PEOPLE, 1, 1, 0),
+    CardType("card_people_002", "Студент", PEOPLE, 2, 1, 0),
+    CardType("card_people_003", "Журналіст", PEOPLE, 2, 1, 0),
+    CardType("card_people_004", "Пожежник", PEOPLE, 1, 2, 1),
+    CardType("card_people_005", "Лікар", PEOPLE, 2, 2, 0),
+    CardType("card_people_006", "Поліцейський", PEOPLE, 1, 2, 1),
+    CardType("card_people_007", "Вчитель", PEOPLE, 2, 2, 0),
+    CardType("card_people_008", "Таксист", PEOPLE, 1, 2, 1),
+    CardType("card_people_009", "Продавець", PEOPLE, 2, 1, 0),
+    CardType("card_people_010", "Міський Божевільний", PEOPLE, 2, 2, 0),
+    CardType("card_people_011", "Охоронець", PEOPLE, 1, 2, 1),
+    CardType("card_people_012", "Священник", PEOPLE, 2, 2, 1),
+    CardType("card_people_013", "Ментор", PEOPLE, 2, 2, 0),
+    # Legends: 2-3 ATK, 2-4 HP; their VP only counts on "Старе кладовище".
+    CardType("card_legend_001", "Привид метро", LEGEND, 1, 3, 2),
+    CardType("card_legend_002", "Чорний автобус", LEGEND, 1, 4, 2),
+    CardType("card_legend_003", "Нічниця", LEGEND, 2, 3, 2),
+    CardType("card_legend_004", "Жінка в білому", LEGEND, 2, 2, 3),
+    CardType("card_legend_005", "Чупакабра", LEGEND, 1, 3, 3),
+    CardType("card_legend_006", "Безликий перехожий", LEGEND, 2, 3, 2),
+    CardType("card_legend_007", "Янгол Смерті", LEGEND, 1, 2, 3),
+    CardType("card_legend_008", "Мертва наречена", LEGEND, 1, 4, 2),
+    # Rumors: lasting ones stay on the board, instant ones go straight to discard.
+    CardType("card_rumor_001", "Епідемія паніки", RUMOR, 0, 0, 0),
+    CardType("card_rumor_002", "Хороші новини", RUMOR, 3, 0, 0),
+    CardType("card_rumor_003", "Таємна змова", RUMOR, 0, 0, 0),
+    CardType("card_rumor_004", "Місто тоне у хаосі", RUMOR, 0, 0, 0),
+)
+
+# Card indices with rules attached to them.
+SCHOOLBOY = 0
+JOURNALIST = 2
+PANIC = 21
+GOOD_NEWS = 22
+CONSPIRACY = 23
+CITY_CHAOS = 24
+
+INSTANT_RUMORS = frozenset({CONSPIRACY, CITY_CHAOS})
+
+# Deck composition: card index -> copies.
+QUICK_DECK: dict[int, int] = {
+    0: 5, 1: 4, 2: 3, 3: 2, 4: 2, 5: 2, 6: 1, 7: 1, 8: 1,  # 21 People
+    13: 2, 14: 1, 15: 1, 16: 1, 17: 1,  # 6 Legends
+    21: 1, 22: 1, 23: 1,  # 3 Rumors
+}
+
+CLASSIC_DECK: dict[int, int] = {
+    0: 5, 1: 4, 2: 3, 3: 3, 4: 3, 5: 3, 6: 2, 7: 1, 8: 1, 9: 1, 10: 2, 11: 1, 12: 1,  # 30 People
+    13: 2, 14: 2, 15: 2, 16: 1, 17: 1, 18: 1, 19: 1, 20: 1,  # 11 Legends
+    21: 1, 22: 1, 23: 1, 24: 1,  # 4 Rumors
+}
+
+DECKS: dict[str, dict[int, int]] = {"quick": QUICK_DECK, "classic": CLASSIC_DECK}
+
+
+class District(NamedTuple):
+    code: str
+    name: str
+
+
+DISTRICTS: tuple[District, ...] = (
+    District("district_school", "Шкільний квартал"),
+    District("district_metro", "Метро"),
+    District("district_park", "Міський парк"),
+    District("district_center", "Центр міста"),
+    District("district_outskirts", "Околиця"),
+    District("district_hospital", "Лікарня"),
+    District("district_tv_tower", "Телевежа"),
+    District("district_construction", "Недобудова"),
+    District("district_cathedral", "Кафедральний собор"),
+    District("district_cemetery", "Старе кладовище"),
+    District("district_amusement", "Парк атракціонів"),
+)
+
+D_SCHOOL = 0
+D_METRO = 1
+D_PARK = 2
+D_CENTER = 3
+D_OUTSKIRTS = 4
+D_HOSPITAL = 5
+D_TV_TOWER = 6
+D_CONSTRUCTION = 7
+D_CATHEDRAL = 8
+D_CEMETERY = 9
+D_AMUSEMENT = 10
+
+# District decks per mode (7 quick / 10 classic).
+DISTRICT_POOLS: dict[str, tuple[int, ...]] = {
+    "quick": (D_SCHOOL, D_METRO, D_PARK, D_CENTER, D_OUTSKIRTS, D_HOSPITAL, D_TV_TOWER),
+    "classic": (
+        D_SCHOOL, D_METRO, D_PARK, D_CENTER, D_OUTSKIRTS, D_HOSPITAL, D_TV_TOWER,
+        D_CONSTRUCTION, D_CEMETERY, D_AMUSEMENT,
+    ),
+}
+
+
+def build_deck(mode: str) -> list[int]:
+    """Unshuffled deck for ``mode`` as a list of card indices."""
+
+    deck: list[int] = []
+    for card, copies in DECKS[mode].items():
+        deck.extend([card] * copies)
+    return deck
@@ -0,0 +1,545 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Action validation and in-place application.
+
+Every action validates first and only then mutates the :class:`MatchState`,
+so an :class:`IllegalAction` never leaves a half-applied move behind. The
+changes are recorded into a :class:`Diff` shaped like the ``diff`` of the
+``move_committed`` WS event; pass ``diff=None`` to the low-level functions to
+skip recording (the simulator does).
+
+Implemented subset of CONCEPT.md: playing People / Legends / Rumors, card
+attacks, direct hits from "Околиця", opposed 2d6 district fights, district
+swaps, hand limit, end-of-turn district income and the VP / round / HP end
+conditions. Card activations and Weather are not modeled yet.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import NamedTuple
+
+from .cards import (
+    CARDS,
+    CITY_CHAOS,
+    CONSPIRACY,
+    D_AMUSEMENT,
+    D_CENTER,
+    D_METRO,
+    D_OUTSKIRTS,
+    D_PARK,
+    D_TV_TOWER,
+    DISTRICTS,
+    INSTANT_RUMORS,
+    LEGEND,
+    RUMOR,
+)
+from .state import MatchState, PlayerState
+
+
+class IllegalAction(ValueError):
+    """Rejected action; ``code`` goes to the client as ``error.payload.code``."""
+
+    def __init__(self, code: str):
+        super().__init__(code)
+        self.code = code
+
+
+class Diff:
+    """Accumulates one move's state patch for ``move_committed.diff``."""
+
+    __slots__ = ("vp", "hp", "hand", "board", "board_hp", "districts", "rolls")
+
+    def __init__(self):
+        self.vp: dict[str, int] = {}
+        self.hp: dict[str, int] = {}
+        self.hand: dict[str, int] = {}
+        self.board: dict[str, dict[str, list[str]]] = {}
+        self.board_hp: dict[str, dict[str, int]] = {}
+        self.districts: dict[str, dict] = {}
+        self.rolls: dict[str, int] = {}
+
+    def hand_delta(self, pid: str, n: int) -> None:
+        self.hand[pid] = self.hand.get(pid, 0) + n
+
+    def board_change(self, pid: str, key: str, card: int) -> None:
+        self.board.setdefault(pid, {}).setdefault(key, []).append(CARDS[card].code)
+
+    def to_dict(self) -> dict:
+        out: dict[str, object] = {}
+        if self.vp:
+            out["vp"] = self.vp
+        if self.hp:
+            out["hp"] = self.hp
+        if self.hand:
+            out["hand"] = {pid: {"delta": n} for pid, n in self.hand.items() if n}
+        if self.board:
+            out["board"] = self.board
+        if self.board_hp:
+            out["boardHp"] = self.board_hp
+        if self.districts:
+            out["districts"] = self.districts
+        if self.rolls:
+            out["rolls"] = self.rolls
+        return out
+
+
+class Move(NamedTuple):
+    kind: str
+    summary: str
+    diff: dict
+
+
+# ---------------------- helpers ----------------------
+
+
+def _require_turn(state: MatchState, seat: int, cost: int = 1) -> PlayerState:
+    if state.end_reason is not None:
+        raise IllegalAction("game_over")
+    if seat != state.current:
+        raise IllegalAction("not_your_turn")
+    player = state.players[seat]
+    if player.actions < cost:
+        raise IllegalAction("no_actions_left")
+    return player
+
+
+def _opponent(state: MatchState, seat: int, target_seat: int) -> PlayerState:
+    if not 0 <= target_seat < len(state.players) or target_seat == seat:
+        raise IllegalAction("invalid_target")
+    target = state.players[target_seat]
+    if not target.alive:
+        raise IllegalAction("invalid_target")
+    return target
+
+
+def _draw(player: PlayerState, n: int) -> int:
+    n = min(n, len(player.deck))
+    for _ in range(n):
+        player.hand.append(player.deck.pop())
+    return n
+
+
+def _roll(state: MatchState, player: PlayerState) -> int:
+    rng = state.rng
+    bonus = min(state.rules.legend_roll_bonus_cap, player.n_legends)
+    return rng.randint(1, 6) + rng.randint(1, 6) + bonus
+
+
+def _check_end(state: MatchState) -> None:
+    if state.end_reason is not None:
+        return
+    alive = [i for i, p in enumerate(state.players) if p.alive]
+    if len(alive) <= 1:
+        state.end_reason = "hp"
+        state.winner = alive[0] if alive else -1
+        return
+    target = state.rules.vp_target
+    scores = [(state.vp(i), i) for i in alive]
+    best = max(scores)
+    if best[0] >= target:
+        state.end_reason = "vp"
+        state.winner = best[1]
+
+
+def _finish_on_rounds(state: MatchState) -> None:
+    scores = sorted(((state.vp(i), i) for i, p in enumerate(state.players) if p.alive), reverse=True)
+    state.end_reason = "rounds"
+    tie = len(scores) > 1 and scores[0][0] == scores[1][0]
+    state.winner = -1 if tie else scores[0][1]
+
+
+def _eliminate(state: MatchState, seat: int) -> None:
+    state.players[seat].alive = False
+    owner = state.district_owner
+    for slot in range(len(owner)):
+        if owner[slot] == seat:
+            owner[slot] = -1
+
+
+# ---------------------- actions ----------------------
+
+
+def play_card(state: MatchState, seat: int, hand_index: int, diff: Diff | None = None) -> int:
+    """Put a card from hand onto the board (or resolve an instant Rumor)."""
+
+    player = _require_turn(state, seat)
+    if not 0 <= hand_index < len(player.hand):
+        raise IllegalAction("invalid_card")
+
+    card = player.hand.pop(hand_index)
+    player.actions -= 1
+    pid = state.player_ids[seat]
+    if diff is not None:
+        diff.hand_delta(pid, -1)
+
+    if card in INSTANT_RUMORS:
+        player.discard.append(card)
+        for other_seat, other in enumerate(state.players):
+            if other_seat == seat or not other.alive:
+                continue
+            if card == CONSPIRACY:
+                other.action_penalty = 1
+            elif card == CITY_CHAOS:
+                lost = 0
+                for _ in range(min(2, len(other.hand))):
+                    other.discard.append(other.hand.pop(state.rng.randrange(len(other.hand))))
+                    lost += 1
+                if diff is not None and lost:
+                    diff.hand_delta(state.player_ids[other_seat], -lost)
+        if card == CITY_CHAOS:
+            drawn = _draw(player, 1)
+            if diff is not None:
+                diff.hand_delta(pid, drawn)
+    else:
+        player.board_add(card)
+        if diff is not None:
+            diff.board_change(pid, "added", card)
+
+    _check_end(state)
+    return card
+
+
+def attack(
+    state: MatchState,
+    seat: int,
+    attacker: int,
+    target_seat: int,
+    target: int,
+    diff: Diff | None = None,
+) -> bool:
+    """Hit an opponent's board card; returns True if it was destroyed."""
+
+    player = _require_turn(state, seat)
+    if not 0 <= attacker < len(player.board):
+        raise IllegalAction("invalid_card")
+    info = CARDS[player.board[attacker]]
+    if info.kind == RUMOR or info.atk <= 0:
+        raise IllegalAction("cannot_attack")
+    if player.board_used[attacker]:
+        raise IllegalAction("already_used")
+    victim = _opponent(state, seat, target_seat)
+    if not 0 <= target < len(victim.board) or CARDS[victim.board[target]].kind == RUMOR:
+        raise IllegalAction("invalid_target")
+
+    player.actions -= 1
+    player.board_used[attacker] = 1
+    hp = victim.board_hp[target] - info.atk
+    victim_pid = state.player_ids[target_seat]
+    destroyed = hp <= 0
+    if destroyed:
+        card = victim.board_remove(target)
+        if diff is not None:
+            diff.board_change(victim_pid, "removed", card)
+    else:
+        victim.board_hp[target] = hp
+        if diff is not None:
+            diff.board_hp.setdefault(victim_pid, {})[str(target)] = hp
+
+    _check_end(state)
+    return destroyed
+
+
+def attack_player(state: MatchState, seat: int, attacker: int, target_seat: int, diff: Diff | None = None) -> None:
+    """Direct 1-HP hit by a Legend; only from a controlled "Околиця", once per turn."""
+
+    player = _require_turn(state, seat)
+    if not 0 <= attacker < len(player.board) or CARDS[player.board[attacker]].kind != LEGEND:
+        raise IllegalAction("invalid_card")
+    if player.board_used[attacker]:
+        raise IllegalAction("already_used")
+    if player.hit_player_this_turn:
+        raise IllegalAction("already_used")
+    if not state.controls(seat, D_OUTSKIRTS) or state.district_bonus_blocked(seat):
+        raise IllegalAction("district_required")
+    victim = _opponent(state, seat, target_seat)
+
+    player.actions -= 1
+    player.board_used[attacker] = 1
+    player.hit_player_this_turn = True
+    victim.hp -= 1
+    if diff is not None:
+        diff.hp[state.player_ids[target_seat]] = -1
+    if victim.hp <= 0:
+        _eliminate(state, target_seat)
+
+    _check_end(state)
+
+
+def contest_district(state: MatchState, seat: int, slot: int, diff: Diff | None = None) -> bool:
+    """Claim a free district or fight its owner (opposed 2d6); True if won."""
+
+    player = _require_turn(state, seat)
+    if not 0 <= slot < len(state.districts):
+        raise IllegalAction("invalid_district")
+    owner = state.district_owner[slot]
+    if owner == seat:
+        raise IllegalAction("already_controlled")
+
+    player.actions -= 1
+    district = state.districts[slot]
+    if owner < 0:
+        won = True
+    else:
+        defender = state.players[owner]
+        mine, theirs = _roll(state, player), _roll(state, defender)
+        won = mine > theirs
+        if diff is not None:
+            diff.rolls[state.player_ids[seat]] = mine
+            diff.rolls[state.player_ids[owner]] = theirs
+        if district == D_METRO:
+            loser_seat = owner if won else seat
+            loser = state.players[loser_seat]
+            if loser.hand:
+                loser.discard.append(loser.hand.pop())
+                if diff is not None:
+                    diff.hand_delta(state.player_ids[loser_seat], -1)
+    if won:
+        state.district_owner[slot] = seat
+        if district == D_AMUSEMENT and owner >= 0:
+            player.vp_bank += 1
+        if diff is not None:
+            diff.districts[str(slot)] = {"code": DISTRICTS[district].code, "ownerId": state.player_ids[seat]}
+
+    _check_end(state)
+    return won
+
+
+def swap_district(state: MatchState, seat: int, slot: int, diff: Diff | None = None) -> None:
+    """Replace a table district with the next one from the reserve."""
+
+    player = _require_turn(state, seat)
+    if not 0 <= slot < len(state.districts):
+        raise IllegalAction("invalid_district")
+    if not state.district_reserve:
+        raise IllegalAction("no_reserve")
+
+    player.actions -= 1
+    old = state.districts[slot]
+    state.districts[slot] = state.district_reserve.pop(0)
+    state.district_reserve.append(old)
+    state.district_owner[slot] = -1
+    if diff is not None:
+        diff.districts[str(slot)] = {"code": DISTRICTS[state.districts[slot]].code, "ownerId": None}
+
+    _check_end(state)
+
+
+def discard(state: MatchState, seat: int, hand_indices: list[int], diff: Diff | None = None) -> None:
+    """Discard chosen cards (hand limit); does not cost an action."""
+
+    player = _require_turn(state, seat, cost=0)
+    indices = sorted(set(hand_indices), reverse=True)
+    if not indices or indices[0] >= len(player.hand) or indices[-1] < 0:
+        raise IllegalAction("invalid_card")
+    for i in indices:
+        player.discard.append(player.hand.pop(i))
+    if diff is not None:
+        diff.hand_delta(state.player_ids[seat], -len(indices))
+
+
+def end_turn(state: MatchState, seat: int, diff: Diff | None = None) -> None:
+    """Hand limit, end-of-turn district income, then start the next turn."""
+
+    player = _require_turn(state, seat, cost=0)
+    rules = state.rules
+
+    excess = len(player.hand) - rules.hand_limit
+    if excess > 0:
+        # The client had its chance to pick via "discard"; drop the newest cards.
+        for _ in range(excess):
+            player.discard.append(player.hand.pop())
+        if diff is not None:
+            diff.hand_delta(state.player_ids[seat], -excess)
+
+    if not state.district_bonus_blocked(seat):
+        income = 0
+        if state.controls(seat, D_CENTER):
+            income += min(2, player.n_rumors) + (1 if player.n_journalists else 0)
+        if state.controls(seat, D_TV_TOWER):
+            income += min(2, player.n_journalists)
+        player.vp_bank += income
+
+    player.actions = 0
+    player.hit_player_this_turn = False
+    player.board_used = array("B", bytes(len(player.board)))
+
+    _check_end(state)
+    if state.end_reason is not None:
+        return
+
+    n = len(state.players)
+    nxt = seat
+    new_round = False
+    while True:
+        nxt = (nxt + 1) % n
+        # Wrapping past the last seat starts a new round.
+        new_round = new_round or nxt == 0
+        if state.players[nxt].alive:
+            break
+    if new_round:
+        state.round += 1
+        if state.round > rules.round_limit:
+            _finish_on_rounds(state)
+            return
+
+    state.current = nxt
+    state.turn_number += 1
+    nxt_player = state.players[nxt]
+    nxt_player.turns_taken += 1
+    nxt_player.actions = max(0, rules.actions_per_turn - nxt_player.action_penalty)
+    nxt_player.action_penalty = 0
+
+    draws = 0
+    if nxt_player.turns_taken > 1:
+        draws = rules.draw_per_turn
+        if (
+            nxt_player.turns_taken % 2 == 0
+            and state.controls(nxt, D_PARK)
+            and not state.district_bonus_blocked(nxt)
+        ):
+            draws += 1
+    drawn = _draw(nxt_player, draws)
+    if diff is not None and drawn:
+        diff.hand_delta(state.player_ids[nxt], drawn)
+
+
+def forfeit(state: MatchState, seat: int, diff: Diff | None = None) -> None:
+    """Remove a player (technical loss); passes the turn on if it was theirs."""
+
+    if state.end_reason is not None or not state.players[seat].alive:
+        return
+    _eliminate(state, seat)
+    _check_end(state)
+    if state.end_reason == "hp":
+        state.end_reason = "forfeit"
+    if state.end_reason is None and state.current == seat:
+        end_turn(state, seat, diff)
+
+
+# ---------------------- dispatch ----------------------
+
+
+def legal_actions(state: MatchState, seat: int) -> list[tuple]:
+    """Enumerate actions for ``seat`` as ``(kind, *args)`` tuples."""
+
+    if state.end_reason is not None or seat != state.current:
+        return []
+    player = state.players[seat]
+    actions: list[tuple] = [("end_turn",)]
+    if player.actions <= 0:
+        return actions
+
+    seen: set[int] = set()
+    for i, card in enumerate(player.hand):
+        if card not in seen:
+            seen.add(card)
+            actions.append(("play_card", i))
+
+    for a, card in enumerate(player.board):
+        info = CARDS[card]
+        if player.board_used[a] or info.kind == RUMOR or info.atk <= 0:
+            continue
+        for t_seat, other in enumerate(state.players):
+            if t_seat == seat or not other.alive:
+                continue
+            for t, t_card in enumerate(other.board):
+                if CARDS[t_card].kind != RUMOR:
+                    actions.append(("attack", a, t_seat, t))
+            if (
+                info.kind == LEGEND
+                and not player.hit_player_this_turn
+                and state.controls(seat, D_OUTSKIRTS)
+                and not state.district_bonus_blocked(seat)
+            ):
+                actions.append(("attack_player", a, t_seat))
+
+    for slot, owner in enumerate(state.district_owner):
+        if owner != seat:
+            actions.append(("contest_district", slot))
+    if state.district_reserve:
+        for slot in range(len(state.districts)):
+            actions.append(("swap_district", slot))
+    return actions
+
+
+_HANDLERS = {
+    "play_card": (play_card, ("card",)),
+    "attack": (attack, ("attacker", "targetPlayerId", "target")),
+    "attack_player": (attack_player, ("attacker", "targetPlayerId")),
+    "contest_district": (contest_district, ("district",)),
+    "swap_district": (swap_district, ("district",)),
+    "discard": (discard, ("cards",)),
+    "end_turn": (end_turn, ()),
+}
+
+
+def perform(state: MatchState, seat: int, kind: str, *args, diff: Diff | None = None):
+    """Apply a ``legal_actions`` tuple (positional args, seat-indexed targets)."""
+
+    try:
+        handler = _HANDLERS[kind][0]
+    except KeyError:
+        raise IllegalAction("unknown_action") from None
+    return handler(state, seat, *args, diff=diff)
+
+
+def apply_action(state: MatchState, player_id: str, action: dict) -> Move:
+    """Validate and apply a client action payload, e.g.
+    ``{"kind": "attack", "attacker": 0, "targetPlayerId": "p_2", "target": 1}``.
+    """
+
+    kind = action.get("kind")
+    if kind not in _HANDLERS:
+        raise IllegalAction("unknown_action")
+    try:
+        seat = state.seat_of(player_id)
+    except ValueError:
+        raise IllegalAction("not_in_match") from None
+
+    handler, fields = _HANDLERS[kind]
+    args = []
+    for field in fields:
+        value = action.get(field)
+        if field == "targetPlayerId":
+            if value not in state.player_ids:
+                raise IllegalAction("invalid_target")
+            value = state.seat_of(value)
+        elif field == "cards":
+            if not isinstance(value, list) or not all(type(v) is int for v in value):
+                raise IllegalAction("invalid_payload")
+        elif type(value) is not int:
+            raise IllegalAction("invalid_payload")
+        args.append(value)
+
+    diff = Diff()
+    before = [state.vp(i) for i in range(len(state.players))]
+    result = handler(state, seat, *args, diff=diff)
+    for i, vp in enumerate(before):
+        delta = state.vp(i) - vp
+        if delta:
+            diff.vp[state.player_ids[i]] = delta
+
+    return Move(kind, _summary(state, seat, kind, action, result, diff), diff.to_dict())
+
+
+def _summary(state: MatchState, seat: int, kind: str, action: dict, result, diff: Diff) -> str:
+    name = state.names[seat]
+    vp = diff.vp.get(state.player_ids[seat], 0)
+    vp_note = f" та отримує {vp:+d} VP" if vp else ""
+    if kind == "play_card":
+        return f"{name} грає карту «{CARDS[result].name}»{vp_note}."
+    if kind == "attack":
+        outcome = "знищує" if result else "атакує"
+        return f"{name} {outcome} карту суперника."
+    if kind == "attack_player":
+        return f"{name} завдає прямої шкоди гравцю."
+    if kind == "contest_district":
+        district = DISTRICTS[state.districts[action["district"]]].name
+        verb = "захоплює" if result else "не зміг захопити"
+        return f"{name} {verb} район «{district}»{vp_note}."
+    if kind == "swap_district":
+        return f"{name} замінює район."
+    if kind == "discard":
+        return f"{name} скидає карти."
+    return f"{name} завершує хід{vp_note}."
@@ -0,0 +1,52 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Per-mode rule constants (docs/description/CONCEPT.md)."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ModeRules:
+    mode: str
+    deck_size: int
+    opening_hand: int
+    draw_per_turn: int
+    districts_on_table: int
+    districts_total: int
+    vp_target: int
+    round_limit: int
+    turn_duration_sec: int
+    hand_limit: int = 7
+    actions_per_turn: int = 2
+    start_hp: int = 5
+    # Opposed 2d6 district fights: +1 per own Legend on the board, capped.
+    legend_roll_bonus_cap: int = 3
+
+
+QUICK = ModeRules(
+    mode="quick",
+    deck_size=30,
+    opening_hand=4,
+    draw_per_turn=2,
+    districts_on_table=4,
+    districts_total=7,
+    vp_target=25,
+    round_limit=10,
+    turn_duration_sec=30,
+)
+
+CLASSIC = ModeRules(
+    mode="classic",
+    deck_size=45,
+    opening_hand=6,
+    draw_per_turn=3,
+    districts_on_table=6,
+    districts_total=10,
+    vp_target=35,
+    round_limit=14,
+    turn_duration_sec=45,
+)
+
+RULES: dict[str, ModeRules] = {QUICK.mode: QUICK, CLASSIC.mode: CLASSIC}
@@ -0,0 +1,268 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Headless Monte Carlo match simulator for balance checks.
+
+``python -m app.game.simulate --mode quick --games 200000 --players 2``
+
+Matches are played by bots straight on the engine (no diffs, no WS) in a
+process pool; each worker returns its batch as one ``int32`` NumPy array,
+one row per match, and the statistics are computed on the stacked array.
+
+The engine itself is plain Python, one state per match, so the pool is the
+only parallelism: a core plays roughly 600-1,000 random-bot two-player games
+per second (classic is the slower mode), and 200,000 games take minutes.
+:func:`summarize` also lists balance ``findings``, such as matches that keep
+running into the round limit instead of being won on VP.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .cards import CARDS
+from .engine import legal_actions, perform
+from .rules import RULES
+from .state import MatchState, new_match
+
+
+# Result row columns; VP per seat follows from COL_VP onwards.
+COL_WINNER = 0  # seat index, -1 on a draw
+COL_REASON = 1  # index in END_REASONS
+COL_ROUNDS = 2
+COL_TURNS = 3
+COL_MOVES = 4
+COL_VP = 5
+
+END_REASONS = ("vp", "rounds", "hp", "forfeit")
+
+# "Орієнтовна кількість ходів" from CONCEPT.md (counted in rounds there).
+TARGET_ROUNDS = {"quick": 10, "classic": 13}
+
+# Thresholds for summarize()'s findings.
+ROUND_LIMIT_FINDING = 0.5  # share of games ending on the round limit
+SEAT_SPREAD_FINDING = 0.05  # gap between the best and worst seat win rate
+
+
+# ---------------------- bots ----------------------
+
+
+def random_policy(state: MatchState, seat: int, actions: list[tuple], rng: random.Random) -> tuple:
+    """Uniformly random legal action, ``end_turn`` included."""
+
+    return actions[rng.randrange(len(actions))]
+
+
+def greedy_policy(state: MatchState, seat: int, actions: list[tuple], rng: random.Random) -> tuple:
+    """One-ply heuristic: best immediate VP / board swing, ties broken randomly."""
+
+    player = state.players[seat]
+    best, best_score = actions[0], 0.0
+    for action in actions[1:]:
+        kind = action[0]
+        if kind == "play_card":
+            info = CARDS[player.hand[action[1]]]
+            score = 1.0 + info.vp + 0.5 * info.atk
+        elif kind == "contest_district":
+            score = 3.0 if state.district_owner[action[1]] < 0 else 1.5
+        elif kind == "attack":
+            _, attacker, target_seat, target = action
+            atk = CARDS[player.board[attacker]].atk
+            victim = state.players[target_seat]
+            score = 2.0 + CARDS[victim.board[target]].vp if victim.board_hp[target] <= atk else 1.0
+        elif kind == "attack_player":
+            score = 2.5
+        else:  # swap_district: only worth it with nothing better to do
+            score = 0.2
+        score += rng.random() * 0.1
+        if score > best_score:
+            best, best_score = action, score
+    return best
+
+
+POLICIES = {"random": random_policy, "greedy": greedy_policy}
+
+
+def play_match(mode: str, n_players: int, seed: int, policy: str = "random") -> list[int]:
+    """Play one bot match to the end and return its result row."""
+
+    choose = POLICIES[policy]
+    rng = random.Random(seed ^ 0x5EED)
+    state = new_match(mode, [f"p{i}" for i in range(n_players)], seed=seed)
+    moves = 0
+    while state.end_reason is None:
+        seat = state.current
+        perform(state, seat, *choose(state, seat, legal_actions(state, seat), rng))
+        moves += 1
+    row = [state.winner, END_REASONS.index(state.end_reason), min(state.round, state.rules.round_limit),
+           state.turn_number, moves]
+    row.extend(state.vp(i) for i in range(n_players))
+    return row
+
+
+def _run_batch(job: tuple[str, int, str, int, int]) -> np.ndarray:
+    mode, n_players, policy, first_seed, count = job
+    rows = [play_match(mode, n_players, seed, policy) for seed in range(first_seed, first_seed + count)]
+    return np.asarray(rows, dtype=np.int32).reshape(count, COL_VP + n_players)
+
+
+def simulate(
+    mode: str,
+    games: int,
+    n_players: int = 2,
+    policy: str = "random",
+    workers: int | None = None,
+    seed: int = 0,
+    chunk: int = 2000,
+) -> np.ndarray:
+    """Play ``games`` matches across ``workers`` processes; one row per match.
+
+    Seeds are ``seed .. seed + games - 1``, so a run is reproducible whatever
+    the worker count.
+    """
+
+    if mode not in RULES:
+        raise ValueError(f"unknown mode: {mode}")
+    if policy not in POLICIES:
+        raise ValueError(f"unknown policy: {policy}")
+    jobs = [
+        (mode, n_players, policy, start, min(chunk, seed + games - start))
+        for start in range(seed, seed + games, chunk)
+    ]
+    if workers == 1 or len(jobs) == 1:
+        batches = [_run_batch(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            batches = list(pool.map(_run_batch, jobs))
+    if not batches:
+        return np.empty((0, COL_VP + n_players), dtype=np.int32)
+    return np.concatenate(batches)
+
+
+def summarize(results: np.ndarray, mode: str) -> dict:
+    """Balance statistics for a :func:`simulate` result array."""
+
+    rules = RULES[mode]
+    games = len(results)
+    n_players = results.shape[1] - COL_VP
+    if games == 0:
+        return {"mode": mode, "games": 0}
+    winner = results[:, COL_WINNER]
+    rounds = results[:, COL_ROUNDS]
+    turns = results[:, COL_TURNS]
+    vp = results[:, COL_VP:]
+    wins = np.bincount(winner[winner >= 0], minlength=n_players)
+    reasons = np.bincount(results[:, COL_REASON], minlength=len(END_REASONS))
+    decided = winner >= 0
+    winner_vp = vp[decided, winner[decided]]
+    # Upper bound: every turn runs to the timer.
+    minutes = turns * rules.turn_duration_sec / 60.0
+
+    def dist(values: np.ndarray) -> dict:
+        p50, p90 = np.percentile(values, (50, 90))
+        return {"mean": round(float(values.mean()), 2), "p50": float(p50), "p90": float(p90)}
+
+    stats = {
+        "mode": mode,
+        "players": n_players,
+        "games": games,
+        "seatWinRate": [round(float(w) / games, 4) for w in wins],
+        "drawRate": round(float((~decided).mean()), 4),
+        "endReasons": {name: round(float(n) / games, 4) for name, n in zip(END_REASONS, reasons)},
+        "rounds": dist(rounds),
+        "targetRounds": TARGET_ROUNDS[mode],
+        "roundLimitShare": round(float((rounds >= rules.round_limit).mean()), 4),
+        "turns": dist(turns),
+        "movesPerGame": round(float(results[:, COL_MOVES].mean()), 2),
+        "maxMinutesAtFullTimer": dist(minutes),
+        "winnerVp": dist(winner_vp) if winner_vp.size else None,
+        "vpSpread": round(float((vp.max(axis=1) - vp.min(axis=1)).mean()), 2),
+        "vpTarget": rules.vp_target,
+        "roundLimit": rules.round_limit,
+    }
+    stats["findings"] = _findings(stats)
+    return stats
+
+
+def _findings(stats: dict) -> list[str]:
+    """Balance problems visible in ``stats``, as one-line notes."""
+
+    found = []
+    by_rounds = stats["endReasons"]["rounds"]
+    if by_rounds >= ROUND_LIMIT_FINDING:
+        winner_vp = stats["winnerVp"]["mean"] if stats["winnerVp"] else 0
+        found.append(
+            f"{by_rounds:.1%} of games end on the {stats['roundLimit']}-round limit, "
+            f"only {stats['endReasons']['vp']:.1%} reach {stats['vpTarget']} VP "
+            f"(winners average {winner_vp}): the VP goal rarely decides a match"
+        )
+    rates = stats["seatWinRate"]
+    if max(rates) - min(rates) >= SEAT_SPREAD_FINDING:
+        best = rates.index(max(rates))
+        found.append(f"seat {best + 1} wins {max(rates) - min(rates):.1%} more often than the weakest seat")
+    return found
+
+
+def _print_report(stats: dict, elapsed: float) -> None:
+    games = stats["games"]
+    print(f"== {stats['mode']} · {stats.get('players', '?')} players · {games} games")
+    print(f"throughput      {games / elapsed:,.0f} games/s ({elapsed:.2f} s)")
+    if not games:
+        return
+    seats = "  ".join(f"seat{i + 1} {rate:.1%}" for i, rate in enumerate(stats["seatWinRate"]))
+    print(f"win rate        {seats}  draw {stats['drawRate']:.1%}")
+    reasons = "  ".join(f"{name} {share:.1%}" for name, share in stats["endReasons"].items())
+    print(f"ended by        {reasons}")
+    r = stats["rounds"]
+    print(
+        f"rounds          mean {r['mean']}  p50 {r['p50']:g}  p90 {r['p90']:g}"
+        f"  (target {stats['targetRounds']}, hit limit {stats['roundLimitShare']:.1%})"
+    )
+    t = stats["turns"]
+    print(f"turns           mean {t['mean']}  p50 {t['p50']:g}  p90 {t['p90']:g}  moves/game {stats['movesPerGame']}")
+    m = stats["maxMinutesAtFullTimer"]
+    print(f"minutes (max)   mean {m['mean']}  p90 {m['p90']:g}")
+    if stats["winnerVp"]:
+        w = stats["winnerVp"]
+        print(f"winner VP       mean {w['mean']}  p50 {w['p50']:g}  p90 {w['p90']:g}  avg spread {stats['vpSpread']}")
+    for finding in stats["findings"]:
+        print(f"finding         {finding}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="City Legends Monte Carlo balance simulator")
+    parser.add_argument("--mode", choices=[*RULES, "all"], default="all")
+    parser.add_argument("--games", type=int, default=20000)
+    parser.add_argument("--players", type=int, choices=(2, 3, 4), default=2)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="random")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="1 = no process pool")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk", type=int, default=2000, help="matches per worker task")
+    parser.add_argument("--json", action="store_true", help="print statistics as JSON")
+    args = parser.parse_args(argv)
+
+    report = []
+    for mode in RULES if args.mode == "all" else (args.mode,):
+        started = time.perf_counter()
+        results = simulate(mode, args.games, args.players, args.policy, args.workers, args.seed, args.chunk)
+        elapsed = time.perf_counter() - started
+        stats = summarize(results, mode)
+        stats["policy"] = args.policy
+        stats["gamesPerSec"] = round(args.games / elapsed, 1)
+        report.append(stats)
+        if not args.json:
+            _print_report(stats, elapsed)
+    if args.json:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
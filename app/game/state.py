@@ -0,0 +1,209 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Compact, mutable match state.
+
+Everything per card is a small integer in an ``array``: decks and hands hold
+card indices, the board keeps parallel arrays of card index / current HP /
+used-this-turn flag. VP inputs are kept as running counters so scoring is
+O(1) and moves never copy the state.
+"""
+
+from __future__ import annotations
+
+import random
+from array import array
+
+from .cards import (
+    CARDS,
+    D_CEMETERY,
+    D_SCHOOL,
+    DISTRICT_POOLS,
+    JOURNALIST,
+    LEGEND,
+    PANIC,
+    RUMOR,
+    SCHOOLBOY,
+    build_deck,
+)
+from .rules import RULES, ModeRules
+
+
+class PlayerState:
+    __slots__ = (
+        "deck",
+        "hand",
+        "discard",
+        "board",
+        "board_hp",
+        "board_used",
+        "hp",
+        "alive",
+        "actions",
+        "action_penalty",
+        "turns_taken",
+        "hit_player_this_turn",
+        "vp_cards",
+        "vp_legends",
+        "vp_bank",
+        "n_legends",
+        "n_rumors",
+        "n_schoolboys",
+        "n_journalists",
+        "n_panic",
+    )
+
+    def __init__(self, deck: array, start_hp: int):
+        self.deck = deck  # draw from the end
+        self.hand = array("B")
+        self.discard = array("B")
+        self.board = array("B")
+        self.board_hp = array("b")
+        self.board_used = array("B")
+        self.hp = start_hp
+        self.alive = True
+        self.actions = 0
+        self.action_penalty = 0
+        self.turns_taken = 0
+        self.hit_player_this_turn = False
+        # Running scoring inputs, maintained by board_add / board_remove.
+        self.vp_cards = 0  # People + lasting Rumors
+        self.vp_legends = 0  # only counted on "Старе кладовище"
+        self.vp_bank = 0  # end-of-turn district income, never lost
+        self.n_legends = 0
+        self.n_rumors = 0
+        self.n_schoolboys = 0
+        self.n_journalists = 0
+        self.n_panic = 0
+
+    def board_add(self, card: int) -> None:
+        info = CARDS[card]
+        self.board.append(card)
+        self.board_hp.append(info.hp)
+        self.board_used.append(0)
+        self._count(card, info, 1)
+
+    def board_remove(self, index: int) -> int:
+        card = self.board[index]
+        del self.board[index]
+        del self.board_hp[index]
+        del self.board_used[index]
+        self._count(card, CARDS[card], -1)
+        self.discard.append(card)
+        return card
+
+    def _count(self, card: int, info, sign: int) -> None:
+        if info.kind == LEGEND:
+            self.vp_legends += sign * info.vp
+            self.n_legends += sign
+        else:
+            self.vp_cards += sign * info.vp
+            if info.kind == RUMOR:
+                self.n_rumors += sign
+        if card == SCHOOLBOY:
+            self.n_schoolboys += sign
+        elif card == JOURNALIST:
+            self.n_journalists += sign
+        elif card == PANIC:
+            self.n_panic += sign
+
+
+class MatchState:
+    __slots__ = (
+        "rules",
+        "player_ids",
+        "names",
+        "players",
+        "current",
+        "round",
+        "turn_number",
+        "districts",
+        "district_owner",
+        "district_reserve",
+        "rng",
+        "winner",
+        "end_reason",
+    )
+
+    def __init__(self, rules: ModeRules, player_ids: tuple[str, ...], names: tuple[str, ...], rng: random.Random):
+        self.rules = rules
+        self.player_ids = player_ids
+        self.names = names
+        self.players: list[PlayerState] = []
+        self.current = 0
+        self.round = 1
+        self.turn_number = 1
+        self.districts = array("b")  # district index per table slot
+        self.district_owner = array("b")  # seat index or -1
+        self.district_reserve = array("b")
+        self.rng = rng
+        self.winner = -1
+        self.end_reason: str | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.end_reason is not None
+
+    def seat_of(self, player_id: str) -> int:
+        return self.player_ids.index(player_id)
+
+    def controls(self, seat: int, district: int) -> bool:
+        for slot, d in enumerate(self.districts):
+            if d == district and self.district_owner[slot] == seat:
+                return True
+        return False
+
+    def district_bonus_blocked(self, seat: int) -> bool:
+        """An opponent's "Епідемія паніки" switches off our district bonuses."""
+
+        return any(p.n_panic for i, p in enumerate(self.players) if i != seat and p.alive)
+
+    def vp(self, seat: int) -> int:
+        p = self.players[seat]
+        total = p.vp_cards + p.vp_bank
+        if self.district_bonus_blocked(seat):
+            return total
+        if p.n_legends and self.controls(seat, D_CEMETERY):
+            total += p.vp_legends
+        if p.n_schoolboys and self.controls(seat, D_SCHOOL):
+            total += min(3, p.n_schoolboys)
+        return total
+
+    def private_view(self, seat: int) -> dict:
+        """What only ``seat`` may see (its hand)."""
+
+        return {"hand": [CARDS[c].code for c in self.players[seat].hand]}
+
+
+def new_match(
+    mode: str,
+    player_ids: tuple[str, ...] | list[str],
+    names: tuple[str, ...] | list[str] | None = None,
+    seed: int | None = None,
+) -> MatchState:
+    """Shuffle decks and districts, deal opening hands, start seat 0's turn."""
+
+    rules = RULES[mode]
+    player_ids = tuple(player_ids)
+    rng = random.Random(seed)
+    state = MatchState(rules, player_ids, tuple(names or player_ids), rng)
+
+    base_deck = build_deck(mode)
+    for _ in player_ids:
+        cards = base_deck[:]
+        rng.shuffle(cards)
+        player = PlayerState(array("B", cards), rules.start_hp)
+        for _ in range(rules.opening_hand):
+            player.hand.append(player.deck.pop())
+        state.players.append(player)
+
+    pool = list(DISTRICT_POOLS[mode])
+    rng.shuffle(pool)
+    on_table = rules.districts_on_table
+    state.districts = array("b", pool[:on_table])
+    state.district_owner = array("b", [-1] * on_table)
+    state.district_reserve = array("b", pool[on_table:])
+
+    first = state.players[0]
+    first.actions = rules.actions_per_turn
+    first.turns_taken = 1
+    return state
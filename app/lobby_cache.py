@@ -0,0 +1,75 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Short-TTL in-process cache of serialized ``GET /rooms`` pages.
+
+Lobby refreshes are overwhelmingly identical, so a page is built once (query,
+``room_to_dict``, JSON encoding, ETag) and then served as ready bytes until it
+expires or a room changes. Writers in this process call :meth:`invalidate`;
+changes made elsewhere (e.g. the match gateway releasing seats) show up
+within the TTL.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from typing import NamedTuple
+
+
+class CachedPage(NamedTuple):
+    body: bytes
+    etag: str
+
+
+class LobbyCache:
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._pages: dict[tuple, tuple[float, int, CachedPage]] = {}
+        self._generation = 0
+        self._invalidated_at = float("-inf")
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: tuple) -> CachedPage | None:
+        with self._lock:
+            entry = self._pages.get(key)
+            if entry is None:
+                return None
+            expires, generation, page = entry
+            if expires < time.monotonic() or generation != self._generation:
+                del self._pages[key]
+                return None
+            return page
+
+    def put(self, key: tuple, body: bytes, ttl: float, generation: int) -> CachedPage:
+        """Store a page built while ``generation`` was current.
+
+        A page whose rooms changed while it was being built is returned but
+        not cached.
+        """
+
+        page = CachedPage(body, hashlib.blake2b(body, digest_size=12).hexdigest())
+        with self._lock:
+            if generation == self._generation and ttl > 0:
+                if len(self._pages) >= self.max_entries:
+                    del self._pages[next(iter(self._pages))]
+                self._pages[key] = (time.monotonic() + ttl, generation, page)
+        return page
+
+    def changed_within(self, seconds: float) -> bool:
+        """True if :meth:`invalidate` ran in the last ``seconds`` (replicas may lag)."""
+
+        return time.monotonic() - self._invalidated_at < seconds
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._invalidated_at = time.monotonic()
+            self._pages.clear()
+
+
+lobby_cache = LobbyCache()
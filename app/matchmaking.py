@@ -0,0 +1,209 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Automatic matchmaking queue.
+
+``POST /matchmaking/queue`` puts a ticket into the queue of its
+``(mode, maxPlayers)`` pool; a background scheduler thread wakes every
+``MATCHMAKING_TICK_SEC``, takes full batches in arrival order, creates one
+private :class:`Room` per batch (with the usual ``CL-<id>`` invite code) and,
+in the same transaction, a seat for every ticket
+(:func:`app.seats.seat_new_room`): the room is full the moment it exists, so
+no lobby join can take a seat. A ticket is only ``matched`` once that commit
+succeeded; a failed batch goes back to the front of its pool. Clients
+long-poll their ticket instead of polling ``GET /rooms`` and racing for joins.
+
+Queues live in process memory (like :mod:`app.chat_hub`), so run the API as a
+single process while matchmaking is in use.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from uuid import uuid4
+
+from .game import RULES
+from .lobby_cache import lobby_cache
+from .models import Room, db
+from .seats import seat_new_room
+
+
+QUEUED = "queued"
+MATCHED = "matched"
+CANCELLED = "cancelled"
+EXPIRED = "expired"
+
+
+class Ticket:
+    """One player waiting in a matchmaking pool."""
+
+    __slots__ = ("id", "mode", "max_players", "status", "room_id", "player_id", "seat", "last_seen", "_done")
+
+    def __init__(self, mode: str, max_players: int):
+        self.id = uuid4().hex
+        self.mode = mode
+        self.max_players = max_players
+        self.status = QUEUED
+        self.room_id: int | None = None
+        self.player_id: str | None = None
+        self.seat: int | None = None
+        self.last_seen = time.monotonic()
+        self._done = threading.Event()
+
+    def wait(self, timeout: float) -> bool:
+        """Block until the ticket leaves the queue; False on timeout."""
+
+        return self._done.wait(timeout)
+
+    def resolve(self, status: str) -> None:
+        self.status = status
+        self._done.set()
+
+
+class Matchmaker:
+    """Per-(mode, maxPlayers) FIFO pools plus the batching scheduler."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pools: dict[tuple[str, int], deque[Ticket]] = {}
+        self._tickets: dict[str, Ticket] = {}
+        self._thread: threading.Thread | None = None
+        self.app = None
+
+    def init_app(self, app) -> None:
+        self.app = app
+        app.extensions["matchmaker"] = self
+
+    # ---------- API side ----------
+
+    def enqueue(self, mode: str, max_players: int) -> Ticket:
+        ticket = Ticket(mode, max_players)
+        with self._lock:
+            self._tickets[ticket.id] = ticket
+            pool = self._pools.setdefault((mode, max_players), deque())
+            pool.append(ticket)
+            full = len(pool) >= max_players
+        self._ensure_scheduler()
+        if full:
+            # Don't make a complete batch wait for the next tick.
+            self._wakeup.set()
+        return ticket
+
+    def get(self, ticket_id: str) -> Ticket | None:
+        with self._lock:
+            ticket = self._tickets.get(ticket_id)
+        if ticket is not None:
+            ticket.last_seen = time.monotonic()
+        return ticket
+
+    def cancel(self, ticket: Ticket) -> bool:
+        """Leave the queue; False if the ticket was already matched."""
+
+        with self._lock:
+            if ticket.status != QUEUED:
+                return ticket.status == CANCELLED
+            try:
+                self._pools[(ticket.mode, ticket.max_players)].remove(ticket)
+            except ValueError:
+                # Already taken into a batch that is being seated right now.
+                return False
+            ticket.resolve(CANCELLED)
+            return True
+
+    def queued_count(self, mode: str, max_players: int) -> int:
+        with self._lock:
+            return len(self._pools.get((mode, max_players), ()))
+
+    # ---------- scheduler ----------
+
+    def _ensure_scheduler(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="matchmaker", daemon=True)
+                self._thread.start()
+
+    def _loop(self) -> None:
+        while True:
+            self._wakeup.wait(self.app.config["MATCHMAKING_TICK_SEC"])
+            self._wakeup.clear()
+            try:
+                self.tick()
+            except Exception:
+                self.app.logger.exception("matchmaking tick failed")
+
+    def tick(self) -> int:
+        """Drop abandoned tickets and form every full batch; returns rooms created."""
+
+        ttl = self.app.config["MATCHMAKING_TICKET_TTL_SEC"]
+        stale_before = time.monotonic() - ttl
+        batches: list[list[Ticket]] = []
+        with self._lock:
+            for (_, size), pool in self._pools.items():
+                # Nobody polled these for a while: the client is gone.
+                for ticket in [t for t in pool if t.last_seen < stale_before]:
+                    pool.remove(ticket)
+                    ticket.resolve(EXPIRED)
+                while len(pool) >= size:
+                    batches.append([pool.popleft() for _ in range(size)])
+            for ticket_id in [
+                tid for tid, t in self._tickets.items() if t.status != QUEUED and t.last_seen < stale_before
+            ]:
+                del self._tickets[ticket_id]
+
+        created = 0
+        if batches:
+            with self.app.app_context():
+                for batch in batches:
+                    try:
+                        self._start_match(batch)
+                        created += 1
+                    except Exception:
+                        # Back to the front of its pool for the next tick; the
+                        # other batches were popped too and still need seats.
+                        db.session.rollback()
+                        self._requeue(batch)
+                        self.app.logger.exception("matchmaking: could not start a %s match", batch[0].mode)
+        return created
+
+    def _requeue(self, batch: list[Ticket]) -> None:
+        with self._lock:
+            pool = self._pools[(batch[0].mode, batch[0].max_players)]
+            pool.extendleft(reversed([t for t in batch if t.status == QUEUED]))
+
+    def _start_match(self, batch: list[Ticket]) -> None:
+        mode, size = batch[0].mode, batch[0].max_players
+        rules = RULES[mode]
+        room = Room(
+            name=f"{'Швидка' if mode == 'quick' else 'Класична'} гра · {size} гравці",
+            mode=mode,
+            max_players=size,
+            current_players=0,
+            # Private without a password: reachable only through the seats below.
+            access="private",
+            has_password=False,
+            status="waiting",
+            ping_ms=42,
+            turn_duration_sec=rules.turn_duration_sec,
+        )
+        db.session.add(room)
+        db.session.flush()
+        room.invite_code = f"CL-{room.id}"
+        player_ids = [f"p_{uuid4().hex[:8]}" for _ in batch]
+        seats = seat_new_room(room, player_ids, self.app.config["ROOM_SEAT_TTL_SEC"])
+        room_id = room.id
+        db.session.commit()
+        lobby_cache.invalidate()
+
+        for ticket, player_id, seat in zip(batch, player_ids, seats):
+            ticket.seat = seat
+            ticket.room_id = room_id
+            ticket.player_id = player_id
+            ticket.last_seen = time.monotonic()
+            ticket.resolve(MATCHED)
+
+
+matchmaker = Matchmaker()
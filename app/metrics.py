@@ -0,0 +1,217 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Request / SQL instrumentation and a Prometheus-text ``GET /metrics``.
+
+With ``METRICS_ENABLED`` on, :meth:`Metrics.init_app` registers
+``before_request`` / ``after_request`` hooks and SQLAlchemy cursor events, and
+records per endpoint (Flask endpoint name, method, status):
+
+- ``http_request_duration_seconds``: time to build the response (for SSE
+  streams that is time to the first byte);
+- ``http_response_size_bytes``: body size, when known up front;
+- ``http_request_db_queries`` / ``http_request_db_seconds``: SQL statements
+  and SQL time spent by the request;
+
+plus ``db_query_duration_seconds`` per engine (all statements, including
+background threads), pool gauges from app/database.py and the chat writer's
+``chat_write_pending`` / ``chat_write_failures_total``. With
+``METRICS_ENABLED`` off nothing is registered, so there is no overhead.
+Counters are per process; scrape every worker (or aggregate in Prometheus).
+"""
+
+from __future__ import annotations
+
+import bisect
+import hmac
+import threading
+import time
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+
+from .database import pool_stats
+from .models import db
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+QUERY_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+def _labels(names: tuple[str, ...], values: tuple) -> str:
+    def esc(v) -> str:
+        return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return ",".join(f'{n}="{esc(v)}"' for n, v in zip(names, values))
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a label tuple."""
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...], buckets: tuple[float, ...]):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._series: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, *label_values) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            series[i] += 1
+            series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {k: list(v) for k, v in self._series.items()}
+        for values, series in sorted(snapshot.items()):
+            base = _labels(self.labels, values)
+            sep = "," if base else ""
+            total = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series):
+                total += count
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{bound}"}} {total}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-1]}")
+            lines.append(f"{self.name}_count{{{base}}} {total}")
+        return lines
+
+
+class Metrics:
+    def __init__(self):
+        self.enabled = False
+        self.token = ""
+        self.app = None
+        endpoint = ("endpoint", "method", "status")
+        self.request_seconds = Histogram(
+            "http_request_duration_seconds", "Time to build the response.", endpoint, LATENCY_BUCKETS
+        )
+        self.response_bytes = Histogram(
+            "http_response_size_bytes", "Response body size (when known).", endpoint, SIZE_BUCKETS
+        )
+        self.request_queries = Histogram(
+            "http_request_db_queries", "SQL statements per request.", endpoint, QUERY_COUNT_BUCKETS
+        )
+        self.request_db_seconds = Histogram(
+            "http_request_db_seconds", "SQL time per request.", endpoint, LATENCY_BUCKETS
+        )
+        self.query_seconds = Histogram(
+            "db_query_duration_seconds", "Duration of every SQL statement.", ("engine",), QUERY_LATENCY_BUCKETS
+        )
+
+    def init_app(self, app) -> None:
+        self.enabled = app.config["METRICS_ENABLED"]
+        self.token = app.config["METRICS_TOKEN"]
+        self.app = app
+        app.extensions["metrics"] = self
+        if not self.enabled:
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.add_url_rule("/metrics", "metrics", self._metrics_view)
+        with app.app_context():
+            for key, engine in db.engines.items():
+                self._instrument(engine, key or "primary")
+
+    # ---------- requests ----------
+
+    def _before_request(self) -> None:
+        g.metrics_start = time.perf_counter()
+        g.metrics_queries = 0
+        g.metrics_db_seconds = 0.0
+
+    def _after_request(self, response):
+        start = g.get("metrics_start")
+        if start is None or request.endpoint == "metrics":
+            return response
+        labels = (request.endpoint or "unmatched", request.method, response.status_code)
+        self.request_seconds.observe(time.perf_counter() - start, *labels)
+        self.request_queries.observe(g.metrics_queries, *labels)
+        self.request_db_seconds.observe(g.metrics_db_seconds, *labels)
+        # Never for streams: computing the length would buffer (and consume) them.
+        size = None if response.is_streamed else response.calculate_content_length()
+        if size is not None:
+            self.response_bytes.observe(size, *labels)
+        return response
+
+    # ---------- SQL ----------
+
+    def _instrument(self, engine, name: str) -> None:
+        def before(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("metrics_start", []).append(time.perf_counter())
+
+        def after(conn, cursor, statement, parameters, context, executemany):
+            starts = conn.info.get("metrics_start")
+            if not starts:
+                return
+            elapsed = time.perf_counter() - starts.pop()
+            self.query_seconds.observe(elapsed, name)
+            if has_request_context() and "metrics_queries" in g:
+                g.metrics_queries += 1
+                g.metrics_db_seconds += elapsed
+
+        def failed(ctx):
+            # after_cursor_execute never runs for a failed statement: drop its
+            # start time, or the next statement would be timed from it.
+            starts = ctx.connection.info.get("metrics_start") if ctx.connection is not None else None
+            if starts:
+                starts.pop()
+
+        event.listen(engine, "before_cursor_execute", before)
+        event.listen(engine, "after_cursor_execute", after)
+        event.listen(engine, "handle_error", failed)
+
+    # ---------- exposition ----------
+
+    def render(self) -> str:
+        lines = []
+        for hist in (
+            self.request_seconds,
+            self.response_bytes,
+            self.request_queries,
+            self.request_db_seconds,
+            self.query_seconds,
+        ):
+            lines += hist.render()
+        pools = pool_stats(self.app)
+        for field, help_text in (
+            ("size", "Configured pool size."),
+            ("checkedout", "Connections in use."),
+            ("checkedin", "Idle connections in the pool."),
+            ("overflow", "Connections beyond pool_size (negative: unused capacity)."),
+            ("connects", "New DBAPI connections opened."),
+            ("invalidations", "Connections invalidated (errors, failed pre-ping)."),
+        ):
+            kind = "counter" if field in ("connects", "invalidations") else "gauge"
+            name = f"db_pool_{field}_total" if kind == "counter" else f"db_pool_{field}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            for engine, stats in sorted(pools.items()):
+                if field in stats:
+                    lines.append(f'{name}{{engine="{engine}"}} {stats[field]}')
+        writer = self.app.extensions.get("chat_writer")
+        if writer is not None:
+            lines += [
+                "# HELP chat_write_pending Chat messages accepted but not yet written.",
+                "# TYPE chat_write_pending gauge",
+                f"chat_write_pending {writer.pending}",
+                "# HELP chat_write_failures_total Failed chat batch writes (each one is retried or reported).",
+                "# TYPE chat_write_failures_total counter",
+                f"chat_write_failures_total {writer.write_failures}",
+            ]
+        return "\n".join(lines) + "\n"
+
+    def _metrics_view(self):
+        if self.token:
+            supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+            if not hmac.compare_digest(supplied, self.token):
+                return Response("unauthorized\n", status=401, mimetype="text/plain")
+        return Response(self.render(), mimetype="text/plain; version=0.0.4; charset=utf-8")
+
+
+metrics = Metrics()
@@ -0,0 +1,140 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Versioned schema migrations.
+
+Each ``versions/vNNNN_<name>.py`` has ``upgrade(conn)`` and runs once, in its
+own transaction together with its row in ``schema_migrations``. They are
+applied by a separate step before deploying new code::
+
+    python -m app.migrations            # apply pending migrations
+    python -m app.migrations status     # current / head version
+
+so worker boot never introspects the catalog: :func:`check_schema` costs one
+``SELECT max(version)`` and refuses to start on an outdated schema.
+``DB_SCHEMA_ON_START=migrate`` (the default for SQLite dev databases and
+tests) applies pending migrations at startup instead.
+"""
+
+from __future__ import annotations
+
+import importlib
+import pkgutil
+from datetime import datetime, timezone
+from typing import Callable, NamedTuple
+
+import sqlalchemy as sa
+from sqlalchemy.exc import DBAPIError
+
+from . import versions
+
+
+CHECK = "check"
+MIGRATE = "migrate"
+OFF = "off"
+
+_meta = sa.MetaData()
+schema_migrations = sa.Table(
+    "schema_migrations",
+    _meta,
+    sa.Column("version", sa.Integer, primary_key=True),
+    sa.Column("name", sa.String(128), nullable=False),
+    sa.Column("applied_at", sa.DateTime(timezone=True), nullable=False),
+)
+
+
+class SchemaOutdated(RuntimeError):
+    """The database is behind the code; run ``python -m app.migrations``."""
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    upgrade: Callable
+
+
+def load() -> list[Migration]:
+    """All migrations in ``versions``, ordered by version."""
+
+    found = []
+    for info in pkgutil.iter_modules(versions.__path__):
+        prefix, _, name = info.name.partition("_")
+        if not (prefix.startswith("v") and prefix[1:].isdigit()):
+            continue
+        module = importlib.import_module(f"{versions.__name__}.{info.name}")
+        found.append(Migration(int(prefix[1:]), name, module.upgrade))
+    found.sort()
+    if len({m.version for m in found}) != len(found):
+        raise RuntimeError("duplicate migration version in app/migrations/versions")
+    return found
+
+
+def head() -> int:
+    migrations = load()
+    return migrations[-1].version if migrations else 0
+
+
+def current_version(engine: sa.Engine) -> int:
+    """Version recorded in ``schema_migrations``; 0 if migrations never ran.
+
+    Any other database error (unreachable server, bad credentials) is raised.
+    """
+
+    try:
+        with engine.connect() as conn:
+            return conn.execute(sa.select(sa.func.max(schema_migrations.c.version))).scalar() or 0
+    except DBAPIError:
+        # Only look at the catalog once the cheap query failed.
+        if sa.inspect(engine).has_table(schema_migrations.name):
+            raise
+        # No schema_migrations table yet: a new database or one from db.create_all().
+        return 0
+
+
+def upgrade(engine: sa.Engine, target: int | None = None, log: Callable[[str], None] = print) -> list[int]:
+    """Apply pending migrations up to ``target`` (default: all); returns their versions."""
+
+    with engine.begin() as conn:
+        _meta.create_all(conn, checkfirst=True)
+    applied = []
+    for migration in load():
+        if target is not None and migration.version > target:
+            break
+        with engine.begin() as conn:
+            if engine.dialect.name == "postgresql":
+                # Two deploy jobs running at once: the second waits, then skips.
+                conn.execute(sa.text("SELECT pg_advisory_xact_lock(7412001)"))
+            done = conn.execute(
+                sa.select(schema_migrations.c.version).where(schema_migrations.c.version == migration.version)
+            ).first()
+            if done is not None:
+                continue
+            log(f"applying {migration.version:04d} {migration.name}")
+            migration.upgrade(conn)
+            conn.execute(
+                schema_migrations.insert().values(
+                    version=migration.version, name=migration.name, applied_at=datetime.now(timezone.utc)
+                )
+            )
+        applied.append(migration.version)
+    return applied
+
+
+def check_schema(app, engine: sa.Engine) -> None:
+    """Startup hook: verify (or, in ``migrate`` mode, bring up) the schema version."""
+
+    mode = app.config["DB_SCHEMA_ON_START"] or (MIGRATE if engine.dialect.name == "sqlite" else CHECK)
+    if mode == OFF:
+        return
+    if mode not in (CHECK, MIGRATE):
+        raise ValueError(f"DB_SCHEMA_ON_START must be check, migrate or off, not {mode!r}")
+    current, latest = current_version(engine), head()
+    if current >= latest:
+        if current > latest:
+            app.logger.warning("database schema %d is newer than this code (%d)", current, latest)
+        return
+    if mode == MIGRATE:
+        upgrade(engine, log=app.logger.info)
+        return
+    raise SchemaOutdated(
+        f"database schema is at version {current}, this code needs {latest}: run `python -m app.migrations`"
+    )
@@ -0,0 +1,36 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""CLI entrypoint: ``python -m app.migrations [upgrade [--to N] | status]``."""
+
+from __future__ import annotations
+
+import argparse
+
+from .. import create_app
+from ..models import db
+from . import current_version, head, load, upgrade
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.migrations", description="Database schema migrations.")
+    sub = parser.add_subparsers(dest="command")
+    up = sub.add_parser("upgrade", help="apply pending migrations (default)")
+    up.add_argument("--to", type=int, default=None, help="stop after this version")
+    sub.add_parser("status", help="show current and available versions")
+    args = parser.parse_args(argv)
+
+    app = create_app({"DB_SCHEMA_ON_START": "off"})
+    with app.app_context():
+        engine = db.engine
+        if args.command == "status":
+            current = current_version(engine)
+            for m in load():
+                print(f"{'x' if m.version <= current else ' '} {m.version:04d} {m.name}")
+            print(f"current {current}, head {head()}")
+            return
+        applied = upgrade(engine, target=getattr(args, "to", None))
+        print(f"applied {len(applied)} migration(s); now at {current_version(engine)}")
+
+
+if __name__ == "__main__":
+    main()
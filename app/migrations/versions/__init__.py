@@ -0,0 +1,3 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Migration scripts ``vNNNN_<name>.py``, each with ``upgrade(conn)``; see app/migrations."""
@@ -0,0 +1,79 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Baseline: the tables as they were when migrations were introduced.
+
+Frozen here instead of taken from ``app.models`` so a fresh database is built
+the same way every time; later changes are later migrations. ``checkfirst``
+lets databases made by the old ``db.create_all()`` adopt the baseline.
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+
+meta = sa.MetaData()
+
+
+def _timestamps():
+    return (
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+sa.Table(
+    "users",
+    meta,
+    sa.Column("id", sa.String(36), primary_key=True),
+    sa.Column("nickname", sa.String(16), nullable=False),
+    sa.Column("email", sa.String(255), nullable=False),
+    sa.Column("password_hash", sa.String(255), nullable=False),
+    sa.Column("matches_played", sa.Integer, nullable=False),
+    sa.Column("wins", sa.Integer, nullable=False),
+    *_timestamps(),
+    sa.Index("ix_users_nickname", "nickname", unique=True),
+    sa.Index("ix_users_email", "email", unique=True),
+)
+
+sa.Table(
+    "rooms",
+    meta,
+    sa.Column("id", sa.Integer, primary_key=True),
+    sa.Column("name", sa.String(255), nullable=False),
+    sa.Column("mode", sa.String(16), nullable=False),
+    sa.Column("max_players", sa.Integer, nullable=False),
+    sa.Column("current_players", sa.Integer, nullable=False),
+    sa.Column("access", sa.String(16), nullable=False),
+    sa.Column("has_password", sa.Boolean, nullable=False),
+    sa.Column("password_hash", sa.String(255), nullable=True),
+    sa.Column("status", sa.String(32), nullable=False),
+    sa.Column("ping_ms", sa.Integer, nullable=False),
+    sa.Column("invite_code", sa.String(32), nullable=True, unique=True),
+    sa.Column("turn_duration_sec", sa.Integer, nullable=False),
+    *_timestamps(),
+)
+
+sa.Table(
+    "chat_messages",
+    meta,
+    sa.Column("id", sa.String(36), primary_key=True),
+    sa.Column("room_id", sa.Integer, sa.ForeignKey("rooms.id", ondelete="CASCADE"), nullable=False),
+    sa.Column("author", sa.String(64), nullable=False),
+    sa.Column("text", sa.Text, nullable=False),
+    *_timestamps(),
+)
+
+sa.Table(
+    "seat_reservations",
+    meta,
+    sa.Column("room_id", sa.Integer, sa.ForeignKey("rooms.id", ondelete="CASCADE"), primary_key=True),
+    sa.Column("seat", sa.Integer, primary_key=True),
+    sa.Column("player_id", sa.String(36), nullable=False),
+    sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True),
+    sa.UniqueConstraint("room_id", "player_id", name="uq_seat_reservations_room_player"),
+)
+
+
+def upgrade(conn) -> None:
+    meta.create_all(conn, checkfirst=True)
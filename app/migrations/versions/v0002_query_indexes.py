@@ -0,0 +1,25 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Indexes behind the keyset-paginated lobby / chat queries and the seat sweep.
+
+``db.create_all()`` never added indexes to tables that already existed, so
+older databases may lack some of these; ``checkfirst`` skips the ones present.
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+
+def upgrade(conn) -> None:
+    meta = sa.MetaData()
+    rooms = sa.Table("rooms", meta, autoload_with=conn)
+    chat = sa.Table("chat_messages", meta, autoload_with=conn)
+    seats = sa.Table("seat_reservations", meta, autoload_with=conn)
+    for index in (
+        sa.Index("ix_rooms_mode_access_created_id", rooms.c.mode, rooms.c.access, rooms.c.created_at, rooms.c.id),
+        sa.Index("ix_rooms_created_id", rooms.c.created_at, rooms.c.id),
+        sa.Index("ix_chat_messages_room_created_id", chat.c.room_id, chat.c.created_at, chat.c.id),
+        sa.Index("ix_seat_reservations_expires_at", seats.c.expires_at),
+    ):
+        index.create(conn, checkfirst=True)
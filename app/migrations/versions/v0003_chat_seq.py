@@ -0,0 +1,18 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Per-room ``chat_messages.seq`` (see app/chat_seq.py), backfilled in order."""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+from ...chat_seq import backfill
+
+
+def upgrade(conn) -> None:
+    columns = {c["name"] for c in sa.inspect(conn).get_columns("chat_messages")}
+    if "seq" not in columns:
+        conn.execute(sa.text("ALTER TABLE chat_messages ADD COLUMN seq BIGINT"))
+    conn.execute(sa.text("CREATE UNIQUE INDEX IF NOT EXISTS ix_chat_messages_room_seq ON chat_messages (room_id, seq)"))
+    if conn.execute(sa.text("SELECT 1 FROM chat_messages WHERE seq IS NULL LIMIT 1")).first() is not None:
+        backfill(conn)
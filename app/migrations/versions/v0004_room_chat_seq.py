@@ -0,0 +1,19 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""``rooms.chat_seq``: the last chat ``seq`` handed out per room (see app/chat_seq.py)."""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+
+
+def upgrade(conn) -> None:
+    columns = {c["name"] for c in sa.inspect(conn).get_columns("rooms")}
+    if "chat_seq" not in columns:
+        conn.execute(sa.text("ALTER TABLE rooms ADD COLUMN chat_seq BIGINT NOT NULL DEFAULT 0"))
+    conn.execute(
+        sa.text(
+            "UPDATE rooms SET chat_seq = COALESCE("
+            " (SELECT MAX(seq) FROM chat_messages WHERE chat_messages.room_id = rooms.id), 0)"
+        )
+    )
@@ -7,8 +7,11 @@ from uuid import uuid4
 
 from flask_sqlalchemy import SQLAlchemy
 
+from .db_routing import RoutingSession
 
-db = SQLAlchemy()
+
+# Reads in read-only views may go to a replica (app/db_routing.py).
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 
 class TimestampMixin:
@@ -51,6 +54,12 @@ class Room(TimestampMixin, db.Model):
     """
 
     __tablename__ = "rooms"
+    __table_args__ = (
+        # Lobby list: newest first, optionally filtered by mode / access, paged
+        # by (created_at, id) keyset cursors.
+        db.Index("ix_rooms_mode_access_created_id", "mode", "access", "created_at", "id"),
+        db.Index("ix_rooms_created_id", "created_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
@@ -72,6 +81,28 @@ class Room(TimestampMixin, db.Model):
     # Turn duration in seconds (30 quick / 45 classic).
     turn_duration_sec = db.Column(db.Integer, nullable=False, default=30)
 
+    # Last chat message seq handed out in this room (app/chat_seq.py).
+    chat_seq = db.Column(db.BigInteger, nullable=False, default=0, server_default="0")
+
+
+class SeatReservation(db.Model):
+    """A seat taken in a room by ``POST /rooms/<id>/join``.
+
+    ``rooms.current_players`` always equals the number of these rows per room:
+    both are changed in the same transaction (see app/seats.py). While the
+    player's match socket is connected ``expires_at`` is NULL; otherwise the
+    seat is freed once it expires.
+    """
+
+    __tablename__ = "seat_reservations"
+
+    room_id = db.Column(db.Integer, db.ForeignKey("rooms.id", ondelete="CASCADE"), primary_key=True)
+    seat = db.Column(db.Integer, primary_key=True)
+    player_id = db.Column(db.String(36), nullable=False)
+    expires_at = db.Column(db.DateTime(timezone=True), nullable=True, index=True)
+
+    __table_args__ = (db.UniqueConstraint("room_id", "player_id", name="uq_seat_reservations_room_player"),)
+
 
 class ChatMessage(TimestampMixin, db.Model):
     """Per-room chat history.
@@ -80,9 +111,19 @@ class ChatMessage(TimestampMixin, db.Model):
     """
 
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        # Keyset pagination: every history page is a range seek on this index,
+        # so its cost does not grow with the room's total history.
+        db.Index("ix_chat_messages_room_created_id", "room_id", "created_at", "id"),
+        # afterSeq resumption: one seek to the anchor row (app/chat_seq.py).
+        db.Index("ix_chat_messages_room_seq", "room_id", "seq", unique=True),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid4()))
-    room_id = db.Column(db.Integer, db.ForeignKey("rooms.id", ondelete="CASCADE"), nullable=False, index=True)
+    room_id = db.Column(db.Integer, db.ForeignKey("rooms.id", ondelete="CASCADE"), nullable=False)
+    # Per-room 1, 2, 3, ... in commit order (app/chat_seq.py); NULL only for
+    # rows written before the column existed and not yet backfilled.
+    seq = db.Column(db.BigInteger, nullable=True)
 
     author = db.Column(db.String(64), nullable=False)
     text = db.Column(db.Text, nullable=False)
@@ -90,16 +131,42 @@ class ChatMessage(TimestampMixin, db.Model):
     room = db.relationship(Room, backref=db.backref("messages", lazy="dynamic", cascade="all, delete-orphan"))
 
 
+# Public columns read by the list endpoints. ``select(*ROOM_LIST_COLUMNS)``
+# returns plain rows (no ORM hydration, identity map or unused columns such as
+# password_hash) that the *_to_dict helpers below accept like model objects.
+ROOM_LIST_COLUMNS = (
+    Room.id,
+    Room.name,
+    Room.mode,
+    Room.max_players,
+    Room.current_players,
+    Room.access,
+    Room.has_password,
+    Room.status,
+    Room.ping_ms,
+    Room.created_at,
+)
+CHAT_MESSAGE_COLUMNS = (
+    ChatMessage.id,
+    ChatMessage.seq,
+    ChatMessage.author,
+    ChatMessage.text,
+    ChatMessage.created_at,
+)
+
+
 def utc_iso(dt: datetime | None) -> str | None:
     """Render datetime as ISO-8601 with Z suffix (UTC) for JSON payloads."""
 
     if dt is None:
         return None
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
-    else:
+    offset = dt.utcoffset()
+    if offset is None:
+        return dt.isoformat() + "Z"
+    if offset:
         dt = dt.astimezone(timezone.utc)
-    return dt.isoformat().replace("+00:00", "Z")
+    # isoformat() of a UTC datetime always ends in "+00:00".
+    return dt.isoformat()[:-6] + "Z"
 
 
 def user_to_dict(user: User) -> dict:
@@ -131,6 +198,7 @@ def room_to_dict(room: Room) -> dict:
 def chat_message_to_dict(msg: ChatMessage) -> dict:
     return {
         "id": msg.id,
+        "seq": msg.seq,
         "author": msg.author,
         "text": msg.text,
         "createdAt": utc_iso(msg.created_at),
@@ -0,0 +1,57 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Opaque keyset cursors for paginated list endpoints.
+
+A cursor pins a position in an ``ORDER BY created_at, id`` listing. Clients
+must treat it as an opaque string and only echo it back (``before`` / ``after``).
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+from datetime import datetime, timedelta, timezone
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _to_micros(dt: datetime) -> int:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+def position_key(created_at: datetime, pk: object) -> tuple[int, str]:
+    """Comparable ``(epoch micros, pk)`` form of a position, for in-memory
+    ordering that must agree with the SQL ``ORDER BY created_at, id``."""
+
+    return _to_micros(created_at), str(pk)
+
+
+def encode_cursor(created_at: datetime, pk: object) -> str:
+    """Encode a ``(created_at, id)`` position as a URL-safe opaque token."""
+
+    raw = f"{_to_micros(created_at)}:{pk}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str | None) -> tuple[datetime, str] | None:
+    """Decode a cursor produced by :func:`encode_cursor`.
+
+    Returns ``None`` for missing or malformed cursors so callers can answer
+    with a validation error instead of a 500.
+    """
+
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        micros, pk = raw.split(":", 1)
+        created_at = _EPOCH + timedelta(microseconds=int(micros))
+    except (ValueError, OverflowError, UnicodeError, binascii.Error):
+        return None
+    if not pk:
+        return None
+    return created_at, pk
@@ -0,0 +1,132 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Password hashing off the request threads.
+
+Werkzeug's scrypt / pbkdf2 hashing is deliberately CPU-heavy; run inline, a
+login burst occupies every web worker. :class:`PasswordHasher` sends the work
+to a small dedicated process pool and admits at most
+``PASSWORD_HASH_MAX_PENDING`` jobs at a time. When that many are already in
+flight, callers get :class:`HasherBusy` at once (the API answers 503 with
+``Retry-After``) instead of queueing behind the burst.
+
+``PASSWORD_HASH_METHOD`` is any Werkzeug method string, e.g.
+``scrypt:32768:8:1`` or ``pbkdf2:sha256:600000``. Stored hashes made with
+other parameters are upgraded on the next successful login
+(:meth:`PasswordHasher.needs_rehash`).
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+
+class HasherBusy(RuntimeError):
+    """Every hashing slot is taken (or the job timed out)."""
+
+
+def normalize_method(method: str) -> str:
+    """The method prefix Werkzeug stores for ``method``, defaults filled in.
+
+    ``scrypt`` -> ``scrypt:32768:8:1``, ``pbkdf2`` -> ``pbkdf2:sha256:<default
+    iterations>``, mirroring :func:`~werkzeug.security.generate_password_hash`.
+    """
+
+    name, *args = method.split(":")
+    if name == "scrypt":
+        if not args:
+            args = ["32768", "8", "1"]
+        elif len(args) != 3:
+            raise ValueError("'scrypt' takes 3 arguments.")
+        return ":".join([name, *(str(int(a)) for a in args)])
+    if name == "pbkdf2":
+        if len(args) > 2:
+            raise ValueError("'pbkdf2' takes 2 arguments.")
+        hash_name = args[0] if args else "sha256"
+        iterations = int(args[1]) if len(args) == 2 else DEFAULT_PBKDF2_ITERATIONS
+        return f"{name}:{hash_name}:{iterations}"
+    raise ValueError(f"Invalid hash method '{method}'.")
+
+
+def _hash(password: str, method: str) -> str:
+    return generate_password_hash(password, method=method)
+
+
+def _verify(pwhash: str, password: str) -> bool:
+    return check_password_hash(pwhash, password)
+
+
+class PasswordHasher:
+    def __init__(self):
+        self.method = "scrypt:32768:8:1"
+        self._stored_method = self.method
+        self.workers = 2
+        self.timeout = 5.0
+        self._slots = threading.BoundedSemaphore(16)
+        self._pool: ProcessPoolExecutor | None = None
+        self._pool_lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        cfg = app.config
+        self.method = cfg["PASSWORD_HASH_METHOD"]
+        self._stored_method = normalize_method(self.method)
+        self.workers = cfg["PASSWORD_HASH_WORKERS"]
+        self.timeout = cfg["PASSWORD_HASH_TIMEOUT_SEC"]
+        self._slots = threading.BoundedSemaphore(max(1, cfg["PASSWORD_HASH_MAX_PENDING"]))
+        app.extensions["password_hasher"] = self
+
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password, self.method)
+
+    def verify(self, pwhash: str, password: str) -> bool:
+        if not pwhash:
+            return False
+        return self._run(_verify, pwhash, password)
+
+    def needs_rehash(self, pwhash: str) -> bool:
+        return pwhash.split("$", 1)[0] != self._stored_method
+
+    def shutdown(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy()
+        if self.workers <= 0:
+            # PASSWORD_HASH_WORKERS=0: hash inline (tests, tiny deployments).
+            try:
+                return fn(*args)
+            finally:
+                self._slots.release()
+        try:
+            future = self._get_pool().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        # The slot is held until the job really finishes, even if we stop
+        # waiting for it, so a stuck pool cannot pile up unbounded work.
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise HasherBusy() from None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn: never fork a multi-threaded web server process.
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,205 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Opt-in sampling profiler for live requests.
+
+With ``PROFILER_ENABLED`` on, a request is profiled when it carries a valid
+``X-Profile-Token`` header (mint one with ``python -m app.profiler token``)
+or wins the ``PROFILER_SAMPLE_RATE`` draw. One shared background thread
+snapshots the stacks of the profiled request threads every
+``PROFILER_INTERVAL_MS``; when the request finishes, its samples are written
+as folded stacks (``frame;frame;frame count`` per line, the input format of
+flamegraph.pl, speedscope and inferno) to ``PROFILER_DIR``, and the response
+gets an ``X-Profile-Id`` header naming the file.
+
+Overhead and disk are capped: at most ``PROFILER_MAX_PER_MINUTE`` profiles per
+process (header requests included), ``PROFILER_MAX_CONCURRENT`` at a time,
+runs shorter than ``PROFILER_MIN_DURATION_MS`` are dropped, and the oldest
+files are deleted once the directory exceeds ``PROFILER_MAX_DISK_MB``. For
+streamed responses (SSE) the profile covers building the response only.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+from flask import current_app, g, request
+
+from ..tokens import verify_profile_token
+
+
+HEADER = "X-Profile-Token"
+
+
+def _frame_label(frame) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_qualname}"
+
+
+class _Run:
+    __slots__ = ("thread_id", "started", "samples")
+
+    def __init__(self, thread_id: int):
+        self.thread_id = thread_id
+        self.started = time.perf_counter()
+        self.samples: Counter[str] = Counter()
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.sample_rate = 0.0
+        self.interval = 0.005
+        self.max_per_minute = 6
+        self.max_concurrent = 2
+        self.min_duration = 0.0
+        self.max_disk_bytes = 50 * 1024 * 1024
+        self.directory = ""
+        self._lock = threading.Lock()
+        self._runs: dict[int, _Run] = {}
+        self._recent: deque[float] = deque()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._names = itertools.count(1)
+
+    def init_app(self, app) -> None:
+        cfg = app.config
+        self.enabled = cfg["PROFILER_ENABLED"]
+        self.sample_rate = cfg["PROFILER_SAMPLE_RATE"]
+        self.interval = cfg["PROFILER_INTERVAL_MS"] / 1000.0
+        self.max_per_minute = cfg["PROFILER_MAX_PER_MINUTE"]
+        self.max_concurrent = cfg["PROFILER_MAX_CONCURRENT"]
+        self.min_duration = cfg["PROFILER_MIN_DURATION_MS"] / 1000.0
+        self.max_disk_bytes = int(cfg["PROFILER_MAX_DISK_MB"] * 1024 * 1024)
+        self.directory = cfg["PROFILER_DIR"] or os.path.join(app.instance_path, "profiles")
+        app.extensions["profiler"] = self
+        if not self.enabled:
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    # ---------- request hooks ----------
+
+    def _wanted(self) -> bool:
+        token = request.headers.get(HEADER)
+        if token:
+            cfg = current_app.config
+            return verify_profile_token(cfg["SECRET_KEY"], token, cfg["PROFILER_TOKEN_TTL_SEC"])
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _admit(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            while self._recent and now - self._recent[0] > 60:
+                self._recent.popleft()
+            if len(self._recent) >= self.max_per_minute or len(self._runs) >= self.max_concurrent:
+                return False
+            self._recent.append(now)
+            run = _Run(threading.get_ident())
+            self._runs[run.thread_id] = run
+        g.profile_run = run
+        self._ensure_thread()
+        self._wake.set()
+        return True
+
+    def _before_request(self) -> None:
+        if self._wanted():
+            self._admit()
+
+    def _stop(self) -> _Run | None:
+        run = g.pop("profile_run", None)
+        if run is not None:
+            with self._lock:
+                self._runs.pop(run.thread_id, None)
+        return run
+
+    def _after_request(self, response):
+        run = self._stop()
+        if run is None:
+            return response
+        elapsed = time.perf_counter() - run.started
+        if elapsed >= self.min_duration and run.samples:
+            name = self._write(run, elapsed)
+            if name:
+                response.headers["X-Profile-Id"] = name
+        return response
+
+    def _teardown_request(self, _exc) -> None:
+        # after_request did not run (unhandled error): drop the run.
+        self._stop()
+
+    # ---------- sampling ----------
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="request-profiler", daemon=True)
+                self._thread.start()
+
+    def _loop(self) -> None:
+        while True:
+            with self._lock:
+                runs = list(self._runs.values())
+            if not runs:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            frames = sys._current_frames()
+            stacks = []
+            for run in runs:
+                frame = frames.get(run.thread_id)
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                if stack:
+                    stacks.append((run, ";".join(reversed(stack))))
+            del frames
+            with self._lock:
+                # Only runs still registered: once _stop() has removed a run,
+                # its request thread owns the Counter and writes it out.
+                for run, stack in stacks:
+                    if self._runs.get(run.thread_id) is run:
+                        run.samples[stack] += 1
+            time.sleep(self.interval)
+
+    # ---------- output ----------
+
+    def _write(self, run: _Run, elapsed: float) -> str | None:
+        endpoint = (request.endpoint or "unmatched").replace(".", "-")
+        stamp = time.strftime("%Y%m%dT%H%M%S")
+        name = f"{stamp}-{os.getpid()}-{next(self._names)}-{endpoint}-{elapsed * 1000:.0f}ms.folded"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, name), "w", encoding="utf-8") as fh:
+                for stack, count in run.samples.most_common():
+                    fh.write(f"{stack} {count}\n")
+            self._enforce_disk_cap()
+        except OSError:
+            current_app.logger.exception("profiler: could not write %s", name)
+            return None
+        return name
+
+    def _enforce_disk_cap(self) -> None:
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".folded") and entry.is_file():
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+
+profiler = Profiler()
@@ -0,0 +1,24 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""CLI entrypoint: ``python -m app.profiler token``."""
+
+from __future__ import annotations
+
+import argparse
+
+from config import Config
+
+from ..tokens import issue_profile_token
+from . import HEADER
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.profiler", description="Request profiler helpers.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("token", help=f"print a signed {HEADER} value (uses SECRET_KEY)")
+    parser.parse_args(argv)
+    print(issue_profile_token(Config.SECRET_KEY))
+
+
+if __name__ == "__main__":
+    main()
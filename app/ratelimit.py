@@ -0,0 +1,190 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Token-bucket rate limits for flood-prone endpoints.
+
+Each rule (``RATE_LIMIT_<RULE>`` = ``"<count>/<seconds>"``) is a bucket of
+``count`` tokens refilled evenly over ``seconds``, kept per key (user id, client
+IP, room id, login email). Buckets are stored as GCRA "theoretical arrival
+times", a single float per active key: a key whose time has passed holds a
+full bucket, so it is simply forgotten (lazily in memory, by key expiry in
+Redis).
+
+:meth:`RateLimiter.hit` checks several buckets at once and takes a token from
+all of them or from none, so a rejected request does not drain the buckets
+that allowed it. Storage (``RATE_LIMIT_STORAGE``): ``memory`` is per process;
+``redis`` shares buckets between workers with one Lua call per request. If
+Redis is unreachable, requests are allowed (and logged).
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+try:  # optional: only the redis storage needs it
+    import redis
+except ImportError:  # pragma: no cover - depends on the environment
+    redis = None
+
+
+MEMORY = "memory"
+REDIS = "redis"
+
+RULES = ("chat_user", "chat_ip", "chat_room", "login_ip", "login_account", "register_ip")
+
+# Float slack when a bucket is exactly at its last token.
+_EPSILON = 1e-6
+
+log = logging.getLogger(__name__)
+
+
+class Limit(NamedTuple):
+    burst: int
+    interval: float  # seconds per token
+
+
+def parse_limit(spec: str) -> Limit | None:
+    """``"5/10"`` -> 5 tokens per 10 seconds; empty or ``"0"`` -> no limit."""
+
+    spec = spec.strip()
+    if spec in ("", "0"):
+        return None
+    count, _, seconds = spec.partition("/")
+    burst, period = int(count), float(seconds or 1)
+    if burst <= 0 or period <= 0:
+        raise ValueError(f"rate limit must be <count>/<seconds>, got {spec!r}")
+    return Limit(burst, period / burst)
+
+
+class Denied(NamedTuple):
+    rule: str
+    retry_after: float
+
+
+class MemoryStorage:
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        # key -> theoretical arrival time, least recently hit first
+        self._tats: OrderedDict[str, float] = OrderedDict()
+
+    def hit(self, buckets: list[tuple[str, Limit]]) -> tuple[int, float]:
+        """Index of the first bucket that is empty and seconds until it has a token; ``(-1, 0)`` if allowed."""
+
+        now = time.monotonic()
+        tats = self._tats
+        with self._lock:
+            # Evict a few idle (or, at the cap, the least recent) keys per
+            # call: O(1) amortised, and the dict never outgrows max_keys.
+            for _ in range(len(buckets) + 1):
+                if not tats:
+                    break
+                key, tat = next(iter(tats.items()))
+                if tat > now and len(tats) < self.max_keys:
+                    break
+                del tats[key]
+            new = []
+            for i, (key, limit) in enumerate(buckets):
+                tat = max(tats.get(key, now), now) + limit.interval
+                wait = tat - now - limit.burst * limit.interval
+                if wait > _EPSILON:
+                    return i, wait
+                new.append(tat)
+            for (key, _), tat in zip(buckets, new):
+                tats[key] = tat
+                tats.move_to_end(key)
+        return -1, 0.0
+
+
+# KEYS: bucket keys; ARGV: interval, burst per key. All-or-nothing, like MemoryStorage.
+_GCRA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local tats = {}
+for i, key in ipairs(KEYS) do
+  local interval = tonumber(ARGV[2 * i - 1])
+  local burst = tonumber(ARGV[2 * i])
+  local tat = math.max(tonumber(redis.call('GET', key) or now), now) + interval
+  local wait = tat - now - burst * interval
+  if wait > 1e-6 then
+    return {i - 1, tostring(wait)}
+  end
+  tats[i] = tat
+end
+for i, key in ipairs(KEYS) do
+  redis.call('SET', key, tostring(tats[i]), 'EX', math.max(1, math.ceil(tats[i] - now)))
+end
+return {-1, '0'}
+"""
+
+
+class RedisStorage:
+    def __init__(self, url: str, prefix: str):
+        if redis is None:
+            raise ValueError("RATE_LIMIT_STORAGE=redis but the redis package is not installed")
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.prefix = prefix
+        self._script = self.client.register_script(_GCRA)
+
+    def hit(self, buckets: list[tuple[str, Limit]]) -> tuple[int, float]:
+        args: list[float] = []
+        for _, limit in buckets:
+            args += [limit.interval, limit.burst]
+        index, wait = self._script(keys=[f"{self.prefix}rl:{key}" for key, _ in buckets], args=args)
+        return int(index), float(wait)
+
+
+class RateLimiter:
+    def __init__(self):
+        self.enabled = False
+        self.limits: dict[str, Limit] = {}
+        self._storage = MemoryStorage(100_000)
+
+    def init_app(self, app) -> None:
+        cfg = app.config
+        self.enabled = cfg["RATE_LIMIT_ENABLED"]
+        self.limits = {}
+        for rule in RULES:
+            limit = parse_limit(cfg[f"RATE_LIMIT_{rule.upper()}"])
+            if limit is not None:
+                self.limits[rule] = limit
+        storage = cfg["RATE_LIMIT_STORAGE"]
+        if storage == MEMORY:
+            self._storage = MemoryStorage(cfg["RATE_LIMIT_MAX_KEYS"])
+        elif storage == REDIS:
+            self._storage = RedisStorage(cfg["REDIS_URL"], cfg["EVENT_BUS_PREFIX"])
+        else:
+            raise ValueError(f"RATE_LIMIT_STORAGE must be memory or redis, not {storage!r}")
+        app.extensions["rate_limiter"] = self
+
+    def hit(self, **keys) -> Denied | None:
+        """Take one token from each ``rule=key`` bucket; None if allowed.
+
+        Rules without a configured limit (and ``None`` keys) are skipped.
+        """
+
+        if not self.enabled:
+            return None
+        buckets = []
+        rules = []
+        for rule, key in keys.items():
+            limit = self.limits.get(rule)
+            if limit is not None and key is not None:
+                buckets.append((f"{rule}:{key}", limit))
+                rules.append(rule)
+        if not buckets:
+            return None
+        try:
+            index, wait = self._storage.hit(buckets)
+        except Exception:
+            log.exception("rate limiter: storage failed, allowing request")
+            return None
+        if index < 0:
+            return None
+        return Denied(rules[index], wait)
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,12 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Realtime match gateway (WebSocket), replacing ``mocks/ws-mock.js``.
+
+Run with ``python -m app.realtime`` (see ``--help``).
+"""
+
+from .envelope import encode_event, make_event
+from .match import MatchInfo, MatchRoom
+from .server import Admission, MatchGateway
+
+__all__ = ["Admission", "MatchGateway", "MatchInfo", "MatchRoom", "encode_event", "make_event"]
@@ -0,0 +1,83 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""CLI entrypoint: ``python -m app.realtime [--host H] [--port P]``."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+
+from .. import create_app
+from ..models import Room, db
+from ..seats import claim_seat, release_seat
+from ..tokens import verify_match_token
+from .match import MatchInfo
+from .server import Admission, MatchGateway
+
+
+def build_gateway(app) -> MatchGateway:
+    """Wire the gateway to the app's database."""
+
+    def load_room(match_id: str) -> MatchInfo | None:
+        try:
+            room_pk = int(match_id)
+        except ValueError:
+            return None
+        with app.app_context():
+            room = db.session.get(Room, room_pk)
+            if room is None:
+                return None
+            return MatchInfo(
+                room_id=str(room.id),
+                mode=room.mode,
+                max_players=room.max_players,
+                turn_duration_sec=room.turn_duration_sec,
+            )
+
+    secret = app.config["SECRET_KEY"]
+    token_ttl = app.config["MATCH_TOKEN_TTL_SEC"]
+
+    def authenticate(token: str, match_id: str, player_id: str) -> Admission | None:
+        # The match token from wsUrl is checked offline; only players that
+        # still hold their seat from POST /rooms/<id>/join get in, and they
+        # sit in the match where the reservation says.
+        nickname = verify_match_token(secret, token, match_id, player_id, token_ttl)
+        if nickname is None or not match_id.isdigit():
+            return None
+        with app.app_context():
+            seat = claim_seat(int(match_id), player_id)
+        if seat is None:
+            return None
+        return Admission(nickname, seat)
+
+    def on_disconnect(match_id: str, player_id: str) -> None:
+        with app.app_context():
+            release_seat(int(match_id), player_id, app.config["ROOM_SEAT_RECONNECT_GRACE_SEC"])
+
+    return MatchGateway(
+        load_room,
+        authenticate=authenticate,
+        on_disconnect=on_disconnect,
+        heartbeat_timeout=app.config["MATCH_WS_HEARTBEAT_TIMEOUT_SEC"],
+        max_buffered_bytes=app.config["MATCH_WS_MAX_BUFFERED_BYTES"],
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="City Legends realtime match gateway")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--backlog", type=int, default=1024, help="listen() backlog for connection bursts")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="[realtime] %(message)s")
+    gateway = build_gateway(create_app())
+    try:
+        asyncio.run(gateway.serve_forever(args.host, args.port, backlog=args.backlog))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""One server-side WebSocket on top of asyncio streams.
+
+Framing is done by ``wsproto`` (sans-IO), so a connection costs one reader
+coroutine and no extra tasks or queues: outgoing frames go straight into the
+transport buffer, and a connection whose buffer grows past
+``max_buffered_bytes`` is treated as a slow consumer and dropped.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from wsproto import ConnectionType, WSConnection
+from wsproto.connection import ConnectionState
+from wsproto.events import (
+    AcceptConnection,
+    BytesMessage,
+    CloseConnection,
+    Ping,
+    RejectConnection,
+    Request,
+    TextMessage,
+)
+
+
+# Close codes (RFC 6455 + app-specific 4xxx).
+CLOSE_NORMAL = 1000
+CLOSE_GOING_AWAY = 1001
+CLOSE_UNSUPPORTED = 1003
+CLOSE_TOO_BIG = 1009
+CLOSE_TRY_AGAIN_LATER = 1013
+CLOSE_REPLACED = 4001
+
+
+class WsConnection:
+    """Accepted (or about to be accepted) client socket."""
+
+    __slots__ = (
+        "path",
+        "query",
+        "last_seen",
+        "closed",
+        "_reader",
+        "_writer",
+        "_ws",
+        "_max_message_bytes",
+        "_max_buffered_bytes",
+    )
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        *,
+        max_message_bytes: int,
+        max_buffered_bytes: int,
+    ):
+        self.path = ""
+        self.query: dict[str, str] = {}
+        self.last_seen = time.monotonic()
+        self.closed = False
+        self._reader = reader
+        self._writer = writer
+        self._ws = WSConnection(ConnectionType.SERVER)
+        self._max_message_bytes = max_message_bytes
+        self._max_buffered_bytes = max_buffered_bytes
+
+    # ---------- handshake ----------
+
+    async def handshake(self) -> bool:
+        """Read the HTTP upgrade request; fills ``path`` / ``query``."""
+
+        while True:
+            data = await self._reader.read(4096)
+            if not data:
+                return False
+            self._ws.receive_data(data)
+            for event in self._ws.events():
+                if isinstance(event, Request):
+                    target = urlsplit(event.target)
+                    self.path = target.path
+                    self.query = {k: v[0] for k, v in parse_qs(target.query).items()}
+                    return True
+
+    def accept(self) -> None:
+        self._write(self._ws.send(AcceptConnection()))
+
+    def reject(self, status_code: int) -> None:
+        self._write(self._ws.send(RejectConnection(status_code=status_code)))
+        self._abort()
+
+    # ---------- outgoing ----------
+
+    def send(self, text: str) -> bool:
+        """Queue one text message; returns False if the socket is gone.
+
+        Never awaits: if the peer does not drain its buffer fast enough, the
+        connection is closed instead of letting memory grow without bound.
+        """
+
+        if self.closed:
+            return False
+        transport = self._writer.transport
+        if transport.get_write_buffer_size() > self._max_buffered_bytes:
+            self.close(CLOSE_TRY_AGAIN_LATER, "slow consumer")
+            return False
+        self._write(self._ws.send(TextMessage(data=text)))
+        return True
+
+    def close(self, code: int = CLOSE_NORMAL, reason: str | None = None) -> None:
+        if self.closed:
+            return
+        if self._ws.state is ConnectionState.OPEN:
+            self._write(self._ws.send(CloseConnection(code=code, reason=reason)))
+        self._abort()
+
+    # ---------- incoming ----------
+
+    async def messages(self):
+        """Yield complete inbound text messages until the socket closes."""
+
+        parts: list[str] = []
+        size = 0
+        try:
+            while not self.closed:
+                data = await self._reader.read(65536)
+                if not data:
+                    break
+                self.last_seen = time.monotonic()
+                self._ws.receive_data(data)
+                for event in self._ws.events():
+                    if isinstance(event, TextMessage):
+                        size += len(event.data)
+                        if size > self._max_message_bytes:
+                            self.close(CLOSE_TOO_BIG, "message too big")
+                            return
+                        parts.append(event.data)
+                        if event.message_finished:
+                            message = "".join(parts)
+                            parts.clear()
+                            size = 0
+                            yield message
+                    elif isinstance(event, BytesMessage):
+                        self.close(CLOSE_UNSUPPORTED, "text frames only")
+                        return
+                    elif isinstance(event, Ping):
+                        self._write(self._ws.send(event.response()))
+                    elif isinstance(event, CloseConnection):
+                        if self._ws.state is ConnectionState.REMOTE_CLOSING:
+                            self._write(self._ws.send(event.response()))
+                        self._abort()
+                        return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._abort()
+
+    # ---------- internals ----------
+
+    def _write(self, data: bytes) -> None:
+        if data and not self._writer.is_closing():
+            self._writer.write(data)
+
+    def _abort(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self._writer.close()
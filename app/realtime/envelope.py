@@ -0,0 +1,25 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Event envelope shared by every match WS message (docs/dev/api/ws-events.md)."""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+
+from ..models import utc_iso
+
+
+def make_event(event_type: str, match_id: str, payload: dict | None = None) -> dict:
+    return {
+        "type": event_type,
+        "matchId": match_id,
+        "timestamp": utc_iso(datetime.now(timezone.utc)),
+        "payload": payload or {},
+    }
+
+
+def encode_event(event_type: str, match_id: str, payload: dict | None = None) -> str:
+    """Serialize an event once so it can be fanned out to many sockets."""
+
+    return json.dumps(make_event(event_type, match_id, payload), ensure_ascii=False, separators=(",", ":"))
@@ -0,0 +1,306 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Per-match broadcast group, turn timer and AFK / technical-loss rules.
+
+Mirrors the flow scripted in ``mocks/ws-mock.js`` but driven by real players
+and the authoritative rules engine (:mod:`app.game`): ``match_start`` once
+every seat is connected, ``turn_start`` per turn, ``move_committed`` for each
+validated action, ``afk_warning`` at 2 of the last 3 own turns missed and
+``technical_loss`` at 3 of 3, on surrender, or when only one player is left.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from ..game import Diff, IllegalAction, MatchState, Move, apply_action, forfeit, new_match
+from ..models import utc_iso
+from .connection import CLOSE_REPLACED, WsConnection
+from .envelope import encode_event
+
+
+MAX_AFK_STRIKES = 3
+
+
+@dataclass(frozen=True)
+class MatchInfo:
+    """Room settings the gateway needs to run a match."""
+
+    room_id: str
+    mode: str
+    max_players: int
+    turn_duration_sec: int
+
+
+class MatchPlayer:
+    __slots__ = ("id", "nickname", "seat", "conn", "missed", "eliminated")
+
+    def __init__(self, player_id: str, nickname: str, seat: int):
+        self.id = player_id
+        self.nickname = nickname
+        self.seat = seat
+        self.conn: WsConnection | None = None
+        # Missed flags of the player's last 3 own turns.
+        self.missed: deque[bool] = deque(maxlen=MAX_AFK_STRIKES)
+        self.eliminated = False
+
+    @property
+    def strikes(self) -> int:
+        return sum(self.missed)
+
+
+class MatchRoom:
+    """All sockets of one match; the unit of broadcast."""
+
+    def __init__(self, match_id: str, info: MatchInfo):
+        self.match_id = match_id
+        self.info = info
+        self.players: dict[str, MatchPlayer] = {}
+        self.game: MatchState | None = None
+        self.active: MatchPlayer | None = None
+        self.turn_ends_at: datetime | None = None
+        self.started = False
+        self.finished = False
+        self._acted = False
+        self._turn_done: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    # ---------- membership ----------
+
+    def attach(self, player_id: str, nickname: str, conn: WsConnection, seat: int | None = None) -> MatchPlayer | None:
+        """Bind a socket to a seat; reconnects replace the previous socket.
+
+        ``seat`` is the player's reserved seat (``app.seats``); without one
+        the lowest free seat is used. None if the match has started or the
+        seat is not free.
+        """
+
+        player = self.players.get(player_id)
+        if player is None:
+            if self.started:
+                return None
+            taken = {p.seat for p in self.players.values()}
+            if seat is None:
+                seat = next((n for n in range(1, self.info.max_players + 1) if n not in taken), None)
+            if seat is None or seat in taken or not 1 <= seat <= self.info.max_players:
+                return None
+            player = MatchPlayer(player_id, nickname, seat=seat)
+            self.players[player_id] = player
+        elif player.conn is not None and player.conn is not conn:
+            player.conn.close(CLOSE_REPLACED, "replaced by a newer connection")
+        player.conn = conn
+
+        if self.started:
+            # Resync a reconnecting player with the current match state.
+            self._send_match_start(player)
+            if self.active is not None and not self.finished:
+                self.send_to(player, "turn_start", self._turn_start_payload())
+        elif len(self.players) == self.info.max_players and self.connected_count() == self.info.max_players:
+            self.started = True
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return player
+
+    def detach(self, player: MatchPlayer, conn: WsConnection) -> None:
+        if player.conn is conn:
+            player.conn = None
+        if not self.started and player.conn is None:
+            # Seats are only held by live sockets until the match starts.
+            del self.players[player.id]
+
+    def connected_count(self) -> int:
+        return sum(1 for p in self.players.values() if p.conn is not None)
+
+    def is_idle(self) -> bool:
+        return self.connected_count() == 0 and (self.finished or not self.started)
+
+    def cancel(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+    # ---------- sending ----------
+
+    def broadcast(self, event_type: str, payload: dict) -> None:
+        message = encode_event(event_type, self.match_id, payload)
+        for player in self.players.values():
+            if player.conn is not None:
+                player.conn.send(message)
+
+    def send_to(self, player: MatchPlayer, event_type: str, payload: dict) -> None:
+        if player.conn is not None:
+            player.conn.send(encode_event(event_type, self.match_id, payload))
+
+    # ---------- inbound ----------
+
+    def handle(self, player: MatchPlayer, message: dict) -> None:
+        """Apply a client event; ``ping`` is answered by the gateway."""
+
+        kind = message.get("type")
+        if kind == "action":
+            payload = message.get("payload")
+            if not isinstance(payload, dict):
+                self.send_to(player, "error", {"code": "invalid_payload"})
+                return
+            self._apply(player, payload)
+        elif kind == "end_turn":
+            self._apply(player, {"kind": "end_turn"})
+        elif kind == "surrender":
+            if not self.started or self.finished or player.eliminated:
+                return
+            self._technical_loss(player, "surrender")
+        else:
+            self.send_to(player, "error", {"code": "unknown_type", "type": kind})
+
+    def _apply(self, player: MatchPlayer, action: dict) -> None:
+        if self.game is None or self.finished:
+            self.send_to(player, "error", {"code": "game_over" if self.finished else "not_started"})
+            return
+        turn_number = self.game.turn_number
+        try:
+            move = apply_action(self.game, player.id, action)
+        except IllegalAction as exc:
+            self.send_to(player, "error", {"code": exc.code})
+            return
+        self._acted = True
+        self._commit(player, move, turn_number)
+
+    def _commit(self, player: MatchPlayer, move: Move, turn_number: int) -> None:
+        self.broadcast(
+            "move_committed",
+            {
+                "turnNumber": turn_number,
+                "playerId": player.id,
+                "kind": move.kind,
+                "summary": move.summary,
+                "diff": move.diff,
+            },
+        )
+        # Drawn / discarded card identities only go to their owner.
+        for pid in move.diff.get("hand", ()):
+            self._send_hand(self.players[pid])
+        self._after_state_change()
+
+    def _after_state_change(self) -> None:
+        game = self.game
+        if game.finished and not self.finished:
+            self.finished = True
+            winner = game.player_ids[game.winner] if game.winner >= 0 else None
+            self.broadcast(
+                "match_end",
+                {
+                    "winnerId": winner,
+                    "reason": game.end_reason,
+                    "round": game.round,
+                    "vp": {pid: game.vp(i) for i, pid in enumerate(game.player_ids)},
+                },
+            )
+        if self._turn_done is not None and (self.finished or self.active is None or game.current != self.active.seat - 1):
+            self._turn_done.set()
+
+    # ---------- match flow ----------
+
+    async def _run(self) -> None:
+        # Full and started: seats are exactly 1..max_players, seat n is game index n - 1.
+        players = sorted(self.players.values(), key=lambda p: p.seat)
+        self.game = new_match(self.info.mode, [p.id for p in players], [p.nickname for p in players])
+        for player in players:
+            self._send_match_start(player)
+
+        duration = self.info.turn_duration_sec
+        while not self.finished:
+            game = self.game
+            player = players[game.current]
+            self.active = player
+            self._acted = False
+            self.turn_ends_at = datetime.now(timezone.utc) + timedelta(seconds=duration)
+            self._turn_done = asyncio.Event()
+            self.broadcast("turn_start", self._turn_start_payload())
+            try:
+                await asyncio.wait_for(self._turn_done.wait(), timeout=duration)
+                timed_out = False
+            except asyncio.TimeoutError:
+                timed_out = True
+            if timed_out and not self.finished and game.current == player.seat - 1:
+                # Time is up: the server ends the turn on the player's behalf.
+                self._record_turn(player, self._acted)
+                if not self.finished and game.current == player.seat - 1:
+                    turn_number = game.turn_number
+                    self._commit(player, apply_action(game, player.id, {"kind": "end_turn"}), turn_number)
+            elif not player.eliminated:
+                self._record_turn(player, True)
+        self.active = None
+
+    def _record_turn(self, player: MatchPlayer, acted: bool) -> None:
+        player.missed.append(not acted)
+        if acted:
+            return
+        reason = "no_actions" if player.conn is not None else "disconnect"
+        if player.strikes >= MAX_AFK_STRIKES:
+            self._technical_loss(player, "afk" if reason == "no_actions" else "disconnect")
+        elif player.strikes == MAX_AFK_STRIKES - 1:
+            self.broadcast(
+                "afk_warning",
+                {
+                    "playerId": player.id,
+                    "strikes": player.strikes,
+                    "maxStrikes": MAX_AFK_STRIKES,
+                    "turnsLeftUntilLoss": MAX_AFK_STRIKES - player.strikes,
+                    "reason": reason,
+                },
+            )
+
+    def _technical_loss(self, loser: MatchPlayer, reason: str) -> None:
+        loser.eliminated = True
+        remaining = [p for p in self.players.values() if not p.eliminated]
+        payload = {"loserId": loser.id, "reason": reason, "atTurn": self.game.turn_number}
+        if len(remaining) == 1:
+            payload["winnerId"] = remaining[0].id
+        self.broadcast("technical_loss", payload)
+        diff = Diff()
+        forfeit(self.game, loser.seat - 1, diff)
+        for pid in diff.hand:
+            # The turn may have passed on, and the next player drew cards.
+            self._send_hand(self.players[pid])
+        self._after_state_change()
+
+    def _send_match_start(self, you: MatchPlayer) -> None:
+        self.send_to(
+            you,
+            "match_start",
+            {
+                "roomId": self.info.room_id,
+                "mode": self.info.mode,
+                "turnDurationSec": self.info.turn_duration_sec,
+                "players": [
+                    {"id": p.id, "nickname": p.nickname, "seat": p.seat, "isYou": p is you}
+                    for p in sorted(self.players.values(), key=lambda p: p.seat)
+                ],
+            },
+        )
+        self._send_hand(you)
+
+    def _send_hand(self, player: MatchPlayer) -> None:
+        if self.game is not None:
+            self.send_to(player, "hand", self.game.private_view(player.seat - 1))
+
+    def _turn_start_payload(self) -> dict:
+        remaining = (self.turn_ends_at - datetime.now(timezone.utc)).total_seconds()
+        return {
+            "turnNumber": self.game.turn_number,
+            "round": self.game.round,
+            "activePlayerId": self.active.id,
+            "turnEndsAt": utc_iso(self.turn_ends_at),
+            "remainingTimeSec": max(0, round(remaining)),
+            "afkStrikes": {p.id: p.strikes for p in self.players.values()},
+        }
+
+
+def parse_client_message(raw: str) -> dict | None:
+    try:
+        message = json.loads(raw)
+    except ValueError:
+        return None
+    return message if isinstance(message, dict) else None
@@ -0,0 +1,192 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Asyncio match gateway: ``ws://HOST:PORT/ws/match/<matchId>?token=...&playerId=...``.
+
+One event loop serves every socket of the process; matches are independent
+broadcast groups (:class:`MatchRoom`). Heartbeats follow ``ws-client.js``:
+clients send ``{"type": "ping"}`` every 15 s and get a ``pong`` event back; a
+socket that stays silent for ``heartbeat_timeout`` seconds is closed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Callable, NamedTuple
+
+from .connection import CLOSE_GOING_AWAY, WsConnection
+from .envelope import encode_event
+from .match import MatchInfo, MatchRoom, parse_client_message
+
+
+log = logging.getLogger(__name__)
+
+MATCH_PATH_PREFIX = "/ws/match/"
+
+
+class Admission(NamedTuple):
+    nickname: str
+    seat: int | None  # reserved seat number; None = first free one
+
+
+RoomLoader = Callable[[str], "MatchInfo | None"]
+Authenticator = Callable[[str, str, str], "Admission | None"]
+DisconnectHook = Callable[[str, str], None]
+
+
+def allow_dev_token(token: str, match_id: str, player_id: str) -> Admission | None:
+    """Default authenticator: accept any token, nickname = player id, any free seat."""
+
+    return Admission(player_id, None)
+
+
+class MatchGateway:
+    """Accepts match sockets and routes them to per-match rooms."""
+
+    def __init__(
+        self,
+        room_loader: RoomLoader,
+        *,
+        authenticate: Authenticator = allow_dev_token,
+        on_disconnect: DisconnectHook | None = None,
+        heartbeat_timeout: float = 45.0,
+        max_message_bytes: int = 64 * 1024,
+        max_buffered_bytes: int = 256 * 1024,
+        handshake_timeout: float = 10.0,
+    ):
+        # room_loader / authenticate / on_disconnect are blocking callables
+        # (they may hit the DB) and always run in the default executor.
+        # on_disconnect also runs for an admitted socket that is then turned
+        # away (unknown match, no free seat), so whatever authenticate took
+        # (a claimed seat) is given back.
+        self.room_loader = room_loader
+        self.authenticate = authenticate
+        self.on_disconnect = on_disconnect
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_message_bytes = max_message_bytes
+        self.max_buffered_bytes = max_buffered_bytes
+        self.handshake_timeout = handshake_timeout
+        self.rooms: dict[str, MatchRoom] = {}
+        self._connections: set[WsConnection] = set()
+        self._sweeper: asyncio.Task | None = None
+
+    # ---------- lifecycle ----------
+
+    async def start(self, host: str = "0.0.0.0", port: int = 8081, **kwargs) -> asyncio.AbstractServer:
+        server = await asyncio.start_server(self.handle_client, host, port, **kwargs)
+        self._sweeper = asyncio.get_running_loop().create_task(self._sweep_heartbeats())
+        return server
+
+    async def serve_forever(self, host: str = "0.0.0.0", port: int = 8081, **kwargs) -> None:
+        server = await self.start(host, port, **kwargs)
+        log.info("match gateway listening on ws://%s:%s%s<matchId>", host, port, MATCH_PATH_PREFIX)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.shutdown()
+
+    def shutdown(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+        for room in self.rooms.values():
+            room.cancel()
+        for conn in list(self._connections):
+            conn.close(CLOSE_GOING_AWAY, "server shutdown")
+
+    def stats(self) -> dict:
+        return {"connections": len(self._connections), "matches": len(self.rooms)}
+
+    # ---------- per-socket ----------
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        conn = WsConnection(
+            reader,
+            writer,
+            max_message_bytes=self.max_message_bytes,
+            max_buffered_bytes=self.max_buffered_bytes,
+        )
+        try:
+            if not await asyncio.wait_for(conn.handshake(), timeout=self.handshake_timeout):
+                conn.close()
+                return
+        except (asyncio.TimeoutError, ConnectionError, OSError):
+            conn.close()
+            return
+        except Exception:
+            # Malformed upgrade request (wsproto raises on bad handshakes).
+            conn.reject(400)
+            return
+
+        if not conn.path.startswith(MATCH_PATH_PREFIX):
+            conn.reject(404)
+            return
+        match_id = conn.path[len(MATCH_PATH_PREFIX):].strip("/")
+        player_id = conn.query.get("playerId", "")
+        token = conn.query.get("token", "")
+        if not match_id or not player_id:
+            conn.reject(400)
+            return
+
+        loop = asyncio.get_running_loop()
+        admission = await loop.run_in_executor(None, self.authenticate, token, match_id, player_id)
+        if admission is None:
+            conn.reject(401)
+            return
+
+        room = await self._get_room(match_id)
+        if room is None:
+            conn.reject(404)
+            self._turned_away(match_id, player_id)
+            return
+
+        conn.accept()
+        player = room.attach(player_id, admission.nickname, conn, admission.seat)
+        if player is None:
+            conn.send(encode_event("error", match_id, {"code": "room_full"}))
+            conn.close()
+            self._turned_away(match_id, player_id)
+            return
+
+        self._connections.add(conn)
+        try:
+            async for raw in conn.messages():
+                message = parse_client_message(raw)
+                if message is None:
+                    conn.send(encode_event("error", match_id, {"code": "invalid_json"}))
+                elif message.get("type") == "ping":
+                    conn.send(encode_event("pong", match_id))
+                else:
+                    room.handle(player, message)
+        finally:
+            self._connections.discard(conn)
+            room.detach(player, conn)
+            if room.is_idle() and self.rooms.get(match_id) is room:
+                room.cancel()
+                del self.rooms[match_id]
+            if self.on_disconnect is not None and player.conn is None:
+                loop.run_in_executor(None, self.on_disconnect, match_id, player_id)
+
+    def _turned_away(self, match_id: str, player_id: str) -> None:
+        if self.on_disconnect is not None:
+            asyncio.get_running_loop().run_in_executor(None, self.on_disconnect, match_id, player_id)
+
+    async def _get_room(self, match_id: str) -> MatchRoom | None:
+        room = self.rooms.get(match_id)
+        if room is not None:
+            return room
+        info = await asyncio.get_running_loop().run_in_executor(None, self.room_loader, match_id)
+        if info is None:
+            return None
+        # Another socket may have created it while we were loading.
+        return self.rooms.setdefault(match_id, MatchRoom(match_id, info))
+
+    async def _sweep_heartbeats(self) -> None:
+        interval = max(1.0, self.heartbeat_timeout / 3)
+        while True:
+            await asyncio.sleep(interval)
+            deadline = time.monotonic() - self.heartbeat_timeout
+            for conn in list(self._connections):
+                if conn.last_seen < deadline:
+                    conn.close(CLOSE_GOING_AWAY, "heartbeat timeout")
@@ -0,0 +1,164 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Room seat reservations.
+
+Joining is one conditional ``UPDATE rooms SET current_players = current_players + 1
+WHERE id = :id AND current_players < max_players``: the database decides who
+gets the last seat, and the row lock it takes serialises the seat-number pick
+that follows in the same transaction. Every insert / delete of a
+:class:`SeatReservation` moves ``current_players`` in the same transaction, so
+the counter never drifts and no reconciliation job is needed.
+
+A seat lives until its player's match socket connects (``claim_seat``); after
+a disconnect it is kept for a reconnect grace period (``release_seat``).
+Expired seats are swept lazily: per room on every join, and table-wide at
+most every :data:`SWEEP_INTERVAL_SEC` from the lobby list.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select, update
+
+from .lobby_cache import lobby_cache
+from .models import Room, SeatReservation, db
+
+
+SWEEP_INTERVAL_SEC = 5.0
+
+_last_global_sweep = 0.0
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _release(rows) -> int:
+    """Give back seats of deleted reservation rows ``(room_id,)``."""
+
+    per_room = Counter(room_id for (room_id,) in rows)
+    for room_id, n in per_room.items():
+        db.session.execute(
+            update(Room).where(Room.id == room_id).values(current_players=Room.current_players - n)
+        )
+    return sum(per_room.values())
+
+
+def sweep_expired(room_id: int | None = None) -> int:
+    """Delete expired reservations (of one room or all) and free their seats.
+
+    Runs in the caller's transaction; returns the number of seats freed.
+    ``DELETE ... RETURNING`` only reports rows this transaction actually
+    deleted, so concurrent sweeps never decrement twice.
+    """
+
+    stmt = delete(SeatReservation).where(SeatReservation.expires_at < _now())
+    if room_id is not None:
+        stmt = stmt.where(SeatReservation.room_id == room_id)
+    rows = db.session.execute(stmt.returning(SeatReservation.room_id)).all()
+    return _release(rows)
+
+
+def maybe_sweep_all() -> None:
+    """Table-wide sweep, throttled per process; commits if anything expired."""
+
+    global _last_global_sweep
+    now = time.monotonic()
+    if now - _last_global_sweep < SWEEP_INTERVAL_SEC:
+        return
+    _last_global_sweep = now
+    if sweep_expired():
+        db.session.commit()
+        lobby_cache.invalidate()
+
+
+def reserve_seat(room_id: int, player_id: str, ttl_sec: float) -> int | None:
+    """Atomically take a seat; returns its number (1-based) or None if full.
+
+    Commits on success; for a full room only the expiry sweep is kept.
+    """
+
+    swept = sweep_expired(room_id)
+    taken = db.session.execute(
+        update(Room)
+        .where(Room.id == room_id, Room.current_players < Room.max_players)
+        .values(current_players=Room.current_players + 1)
+        .returning(Room.max_players)
+    ).first()
+    if taken is None:
+        if swept:
+            # Keep the sweep even though the room is still full.
+            db.session.commit()
+            lobby_cache.invalidate()
+        else:
+            db.session.rollback()
+        return None
+
+    # The room row stays locked until commit, so the lowest free seat cannot
+    # be picked by a concurrent join in between.
+    used = set(db.session.scalars(select(SeatReservation.seat).where(SeatReservation.room_id == room_id)))
+    seat = next(n for n in range(1, taken.max_players + 1) if n not in used)
+    db.session.add(
+        SeatReservation(
+            room_id=room_id,
+            seat=seat,
+            player_id=player_id,
+            expires_at=_now() + timedelta(seconds=ttl_sec),
+        )
+    )
+    db.session.commit()
+    lobby_cache.invalidate()
+    return seat
+
+
+def seat_new_room(room: Room, player_ids: list[str], ttl_sec: float) -> list[int]:
+    """Reserve seats 1..n of ``room`` for ``player_ids``; returns the seat numbers.
+
+    For a room inserted in the caller's (not yet committed) transaction: the
+    room row and its reservations commit together, so nobody else can take a
+    seat in between, and nothing is left half-seated if the commit fails.
+    Does not commit.
+    """
+
+    if room.id is None:
+        db.session.flush()
+    expires_at = _now() + timedelta(seconds=ttl_sec)
+    seats = list(range(1, len(player_ids) + 1))
+    for seat, player_id in zip(seats, player_ids):
+        db.session.add(SeatReservation(room_id=room.id, seat=seat, player_id=player_id, expires_at=expires_at))
+    room.current_players = (room.current_players or 0) + len(player_ids)
+    return seats
+
+
+def claim_seat(room_id: int, player_id: str) -> int | None:
+    """Mark a reservation as held by a live socket; None if it does not exist (anymore)."""
+
+    swept = sweep_expired(room_id)
+    seat = db.session.execute(
+        update(SeatReservation)
+        .where(SeatReservation.room_id == room_id, SeatReservation.player_id == player_id)
+        .values(expires_at=None)
+        .returning(SeatReservation.seat)
+    ).scalar()
+    db.session.commit()
+    if swept:
+        lobby_cache.invalidate()
+    return seat
+
+
+def release_seat(room_id: int, player_id: str, grace_sec: float = 0) -> None:
+    """Free a seat after its socket closed, immediately or after ``grace_sec``."""
+
+    where = (SeatReservation.room_id == room_id, SeatReservation.player_id == player_id)
+    if grace_sec > 0:
+        db.session.execute(
+            update(SeatReservation).where(*where).values(expires_at=_now() + timedelta(seconds=grace_sec))
+        )
+    else:
+        rows = db.session.execute(delete(SeatReservation).where(*where).returning(SeatReservation.room_id)).all()
+        _release(rows)
+    db.session.commit()
+    lobby_cache.invalidate()
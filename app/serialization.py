@@ -0,0 +1,107 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""JSON encoding for API responses.
+
+- :class:`FastJSONProvider` is the app's ``app.json``: it encodes with
+  ``orjson`` when that package is installed (``JSON_ENCODER=auto``), else with
+  the standard library like Flask does. Output is the same JSON (sorted keys),
+  except that non-ASCII text is sent as UTF-8 instead of ``\\uXXXX`` escapes.
+- Chat messages never change once posted, so each is encoded once into a
+  :class:`ChatItem` fragment that history pages, the ring buffer
+  (app/chat_cache.py) and every SSE subscriber reuse; :func:`json_object`
+  splices such fragments into a page body without re-encoding them.
+- The ``*_to_dict`` helpers in app/models.py only read attributes, so they
+  accept column-projected result rows as well as ORM objects.
+"""
+
+from __future__ import annotations
+
+from typing import Any, NamedTuple
+
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+
+from .models import chat_message_to_dict
+from .pagination import encode_cursor
+
+try:  # optional: roughly 5-10x faster encoding
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+AUTO = "auto"
+ORJSON = "orjson"
+STD = "std"
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """``DefaultJSONProvider`` with an ``orjson`` fast path.
+
+    Calls with extra keyword arguments (``indent``, ``separators``, ...) and
+    pretty-printed debug responses keep using the standard library.
+    """
+
+    def __init__(self, app, encoder: str = AUTO):
+        super().__init__(app)
+        if encoder not in (AUTO, ORJSON, STD):
+            raise ValueError(f"JSON_ENCODER must be auto, orjson or std, not {encoder!r}")
+        if encoder == ORJSON and orjson is None:
+            raise ValueError("JSON_ENCODER=orjson but the orjson package is not installed")
+        self.fast = orjson is not None and encoder != STD
+
+    def _options(self) -> int:
+        opts = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            opts |= orjson.OPT_SORT_KEYS
+        return opts
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if not self.fast or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+
+    def dumpb(self, obj: Any) -> bytes:
+        """Like :meth:`dumps` but returns UTF-8 bytes (no str round trip with orjson)."""
+
+        if not self.fast:
+            return super().dumps(obj).encode()
+        return orjson.dumps(obj, default=self.default, option=self._options())
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if not self.fast or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        if not self.fast or (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._options() | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+class ChatItem(NamedTuple):
+    """One chat message, ready to send: its cursor, dict payload and encoded JSON."""
+
+    cursor: str
+    payload: dict
+    json: str
+
+
+def chat_item(msg) -> ChatItem:
+    """Encode a message (ORM object or result row with the same attribute names)."""
+
+    payload = chat_message_to_dict(msg)
+    return ChatItem(encode_cursor(msg.created_at, msg.id), payload, current_app.json.dumps(payload))
+
+
+def json_object(fields: dict[str, Any], raw: dict[str, str]) -> bytes:
+    """Encode ``fields`` plus already-encoded ``raw`` values as one JSON object.
+
+    Keys come out sorted, matching :class:`FastJSONProvider`.
+    """
+
+    enc = current_app.json.dumps
+    parts = [f"{enc(k)}:{raw[k] if k in raw else enc(fields[k])}" for k in sorted({*fields, *raw})]
+    return ("{" + ",".join(parts) + "}").encode()
@@ -565,6 +565,12 @@ let chatSendBtn = null;
 let nicknameInputEl = document.getElementById("nicknameInput");
 let roomId = null;
 let lastMessageId = null;
+let lastMessageSeq = null;
+let chatStream = null;
+let renderedMessageIds = new Set();
+
+// EventSource-capable browsers get pushed messages; others fall back to polling.
+const CHAT_STREAM_SUPPORTED = typeof window.EventSource === "function";
 
 function escapeHtml(str) {
     return String(str)
@@ -579,7 +585,21 @@ function setRoomId(id) {
     console.log("ROOM SET:", id);
     roomId = id;
     lastMessageId = null;
-    loadChat();
+    lastMessageSeq = null;
+    renderedMessageIds = new Set();
+    if (chatMessages) chatMessages.innerHTML = "";
+    startChatFeed();
+}
+
+function startChatFeed() {
+    // Chat UI may be initialized after the room is set; initializeChatUI() calls us again.
+    if (!roomId || !chatMessages) return;
+
+    if (CHAT_STREAM_SUPPORTED) {
+        openChatStream();
+    } else {
+        loadChat();
+    }
 }
 
 function renderMessage(msg) {
@@ -603,12 +623,55 @@ function renderMessage(msg) {
     return wrap;
 }
 
+function appendMessages(messages) {
+    if (!chatMessages) return;
+
+    for (const msg of messages) {
+        lastMessageId = msg.id;
+        if (msg.seq != null) lastMessageSeq = msg.seq;
+        if (renderedMessageIds.has(msg.id)) continue;
+        renderedMessageIds.add(msg.id);
+        chatMessages.appendChild(renderMessage(msg));
+    }
+
+    chatMessages.scrollTop = chatMessages.scrollHeight;
+}
+
+function openChatStream() {
+    if (chatStream) {
+        chatStream.close();
+        chatStream = null;
+    }
+    if (!roomId) return;
+
+    // The server replays the latest page first, then pushes new messages.
+    // EventSource reconnects on its own and resumes via Last-Event-ID.
+    const stream = new EventSource(`/api/chat/${roomId}/stream`);
+    const streamRoomId = roomId;
+
+    stream.addEventListener("message", (event) => {
+        if (streamRoomId !== roomId) return;
+        try {
+            appendMessages([JSON.parse(event.data)]);
+        } catch (err) {
+            console.error("Chat stream parse error:", err);
+        }
+    });
+
+    chatStream = stream;
+}
+
 async function loadChat() {
     if (!roomId || !chatMessages) return;
 
-    const url = lastMessageId
-        ? `/api/chat/${roomId}?sinceId=${encodeURIComponent(lastMessageId)}`
-        : `/api/chat/${roomId}`;
+    // Per-room sequence numbers resume with one index seek; sinceId is kept
+    // for messages stored before they existed.
+    let url = `/api/chat/${roomId}`;
+    if (lastMessageSeq != null) {
+        url += `?afterSeq=${lastMessageSeq}`;
+    } else if (lastMessageId) {
+        url += `?sinceId=${encodeURIComponent(lastMessageId)}`;
+    }
 
     try {
         const res = await fetch(url);
@@ -617,14 +680,7 @@ async function loadChat() {
         const data = await res.json();
         const messages = Array.isArray(data.messages) ? data.messages : [];
 
-        if (!lastMessageId) chatMessages.innerHTML = "";
-
-        for (const msg of messages) {
-            chatMessages.appendChild(renderMessage(msg));
-            lastMessageId = msg.id;
-        }
-
-        chatMessages.scrollTop = chatMessages.scrollHeight;
+        appendMessages(messages);
     } catch (err) {
         console.error("Chat load error:", err);
     }
@@ -675,8 +731,14 @@ async function sendMessage() {
             return;
         }
 
-        // якщо бекенд відповів — підтягнемо "офіційну" історію
-        await loadChat();
+        // локальна копія вже на екрані — не дублюємо її, коли сервер пришле "офіційну"
+        const data = await res.json();
+        if (data && data.message && data.message.id) {
+            renderedMessageIds.add(data.message.id);
+        }
+
+        // без стріму підтягнемо "офіційну" історію самі
+        if (!CHAT_STREAM_SUPPORTED) await loadChat();
     } catch (err) {
         console.error("Chat send error:", err);
         // UI вже оновлено, так що просто лог
@@ -704,11 +766,15 @@ function initializeChatUI() {
     };
 
     console.log("Chat UI initialized successfully");
+    startChatFeed();
 }
 
-setInterval(() => {
-    if (roomId) loadChat();
-}, 2000);
+// Fallback for browsers without EventSource: poll for new messages.
+if (!CHAT_STREAM_SUPPORTED) {
+    setInterval(() => {
+        if (roomId) loadChat();
+    }, 2000);
+}
 
 
 
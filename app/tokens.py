@@ -0,0 +1,92 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Signed, expiring tokens (itsdangerous, keyed by ``SECRET_KEY``).
+
+- access: ``{"uid", "nick"}``, short-lived; sent as ``Authorization: Bearer``.
+- refresh: ``{"uid"}``, long-lived; exchanged at ``POST /auth/refresh``.
+- match: ``{"mid", "pid", "nick"}``, embedded in ``wsUrl``; the match gateway
+  checks it offline with the shared secret.
+- profile: ``{"p": 1}``, sent as ``X-Profile-Token`` to ask for a request
+  profile (app/profiler/); minted by ops with ``python -m app.profiler token``.
+
+Verification is a signature + age check only, no database round trip. Each
+kind has its own salt, so one kind can never be replayed as another.
+"""
+
+from __future__ import annotations
+
+from typing import NamedTuple
+
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+
+ACCESS = "access"
+REFRESH = "refresh"
+MATCH = "match"
+PROFILE = "profile"
+
+
+class Claims(NamedTuple):
+    user_id: str
+    nickname: str
+
+
+def _serializer(secret: str, kind: str) -> URLSafeTimedSerializer:
+    return URLSafeTimedSerializer(secret, salt=f"citylegends.{kind}")
+
+
+def issue(secret: str, kind: str, payload: dict) -> str:
+    return _serializer(secret, kind).dumps(payload)
+
+
+def verify(secret: str, kind: str, token: str | None, max_age: float) -> dict | None:
+    """Payload of a valid, unexpired token of ``kind``; None otherwise."""
+
+    if not token:
+        return None
+    try:
+        payload = _serializer(secret, kind).loads(token, max_age=max_age)
+    except BadSignature:  # also covers SignatureExpired
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def issue_access_token(secret: str, user_id: str, nickname: str) -> str:
+    return issue(secret, ACCESS, {"uid": user_id, "nick": nickname})
+
+
+def verify_access_token(secret: str, token: str | None, max_age: float) -> Claims | None:
+    payload = verify(secret, ACCESS, token, max_age)
+    if payload is None or "uid" not in payload:
+        return None
+    return Claims(payload["uid"], payload.get("nick", ""))
+
+
+def issue_refresh_token(secret: str, user_id: str) -> str:
+    return issue(secret, REFRESH, {"uid": user_id})
+
+
+def verify_refresh_token(secret: str, token: str | None, max_age: float) -> str | None:
+    payload = verify(secret, REFRESH, token, max_age)
+    return payload.get("uid") if payload else None
+
+
+def issue_match_token(secret: str, match_id: str, player_id: str, nickname: str) -> str:
+    return issue(secret, MATCH, {"mid": match_id, "pid": player_id, "nick": nickname})
+
+
+def verify_match_token(secret: str, token: str | None, match_id: str, player_id: str, max_age: float) -> str | None:
+    """Nickname for a token issued to this player in this match; None otherwise."""
+
+    payload = verify(secret, MATCH, token, max_age)
+    if payload is None or payload.get("mid") != match_id or payload.get("pid") != player_id:
+        return None
+    return payload.get("nick") or player_id
+
+
+def issue_profile_token(secret: str) -> str:
+    return issue(secret, PROFILE, {"p": 1})
+
+
+def verify_profile_token(secret: str, token: str | None, max_age: float) -> bool:
+    return verify(secret, PROFILE, token, max_age) is not None
@@ -18,7 +18,175 @@ class Config:
     # If not provided, falls back to a local SQLite file for quick dev runs.
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///citylegends.db")
 
+    # Engine / pool tuning (app/database.py). DB_PROFILE picks a row of
+    # DB_PROFILES; empty = "prod" for PostgreSQL URLs, "dev" otherwise. The
+    # DB_* variables below override single values of the chosen profile.
+    #   pool_size / max_overflow: connections kept / extra under load, per process
+    #   pool_timeout_sec: wait for a free connection before failing the request
+    #   pool_recycle_sec: reconnect older connections (beats server / LB idle cuts)
+    #   pool_pre_ping: test a connection on checkout, replacing dead ones
+    #   statement_timeout_ms: server-side cap per statement (PostgreSQL; 0 = off)
+    DB_PROFILE = os.getenv("DB_PROFILE", "")
+    DB_PROFILES = {
+        "dev": {},
+        "prod": {
+            "pool_size": 5,
+            "max_overflow": 5,
+            "pool_timeout_sec": 5,
+            "pool_recycle_sec": 1800,
+            "pool_pre_ping": True,
+            "statement_timeout_ms": 5000,
+        },
+    }
+    DB_POOL_SIZE = os.getenv("DB_POOL_SIZE")
+    DB_MAX_OVERFLOW = os.getenv("DB_MAX_OVERFLOW")
+    DB_POOL_TIMEOUT_SEC = os.getenv("DB_POOL_TIMEOUT_SEC")
+    DB_POOL_RECYCLE_SEC = os.getenv("DB_POOL_RECYCLE_SEC")
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING")
+    DB_STATEMENT_TIMEOUT_MS = os.getenv("DB_STATEMENT_TIMEOUT_MS")
+    # Schema check at startup (app/migrations): "check" refuses to start on an
+    # outdated schema, "migrate" applies pending migrations, "off" skips it.
+    # Empty = migrate for SQLite (dev / tests), check otherwise.
+    DB_SCHEMA_ON_START = os.getenv("DB_SCHEMA_ON_START", "")
+
+    # Optional read replicas (comma-separated URLs, same profile), used by
+    # read-only endpoints (app/db_routing.py). REPLICA_STICKY_SEC: after a
+    # client's own write its reads stay on the primary this long (replica lag);
+    # replicas are re-checked every REPLICA_HEALTH_INTERVAL_SEC and skipped
+    # while down or lagging more than REPLICA_MAX_LAG_SEC (PostgreSQL).
+    DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL", "")
+    REPLICA_STICKY_SEC = float(os.getenv("REPLICA_STICKY_SEC", "5"))
+    REPLICA_HEALTH_INTERVAL_SEC = float(os.getenv("REPLICA_HEALTH_INTERVAL_SEC", "10"))
+    REPLICA_MAX_LAG_SEC = float(os.getenv("REPLICA_MAX_LAG_SEC", "10"))
+    # Startup check: worker processes (gunicorn's WEB_CONCURRENCY) times
+    # pool_size + max_overflow must fit the server's connection budget (0 = skip).
+    WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+    DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "0"))
+
     # Disable event system overhead; we don't use SQLAlchemy's modification tracking.
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Request / SQL metrics and GET /metrics (app/metrics.py), off by default:
+    # the page exposes routes and database internals. Off = no hooks at all.
+    # With METRICS_TOKEN set, scrapers must send "Authorization: Bearer <token>";
+    # without one, keep /metrics off the public network.
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0").lower() in ("1", "true", "yes", "on")
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+    # Sampling request profiler (app/profiler/), off by default. When on, a
+    # request is profiled if it sends a valid X-Profile-Token header (python -m
+    # app.profiler token, valid PROFILER_TOKEN_TTL_SEC) or with probability
+    # PROFILER_SAMPLE_RATE. Stacks are sampled every PROFILER_INTERVAL_MS and
+    # written as folded-stack files to PROFILER_DIR (default instance/profiles).
+    # Caps: PROFILER_MAX_PER_MINUTE and PROFILER_MAX_CONCURRENT profiles per
+    # process, PROFILER_MAX_DISK_MB on disk (oldest files deleted); runs under
+    # PROFILER_MIN_DURATION_MS are not kept.
+    PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "0").lower() in ("1", "true", "yes", "on")
+    PROFILER_SAMPLE_RATE = float(os.getenv("PROFILER_SAMPLE_RATE", "0"))
+    PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "5"))
+    PROFILER_MAX_PER_MINUTE = int(os.getenv("PROFILER_MAX_PER_MINUTE", "6"))
+    PROFILER_MAX_CONCURRENT = int(os.getenv("PROFILER_MAX_CONCURRENT", "2"))
+    PROFILER_MIN_DURATION_MS = float(os.getenv("PROFILER_MIN_DURATION_MS", "0"))
+    PROFILER_MAX_DISK_MB = float(os.getenv("PROFILER_MAX_DISK_MB", "50"))
+    PROFILER_DIR = os.getenv("PROFILER_DIR", "")
+    PROFILER_TOKEN_TTL_SEC = int(os.getenv("PROFILER_TOKEN_TTL_SEC", "3600"))
+
+    # JSON encoder for API responses (app/serialization.py): auto = orjson when
+    # installed, else the standard library; orjson / std force one.
+    JSON_ENCODER = os.getenv("JSON_ENCODER", "auto")
+
+    # Lobby chat SSE stream (/api/chat/<room_id>/stream): comment-line keepalive
+    # interval and max lifetime of one connection before the client reconnects.
+    CHAT_STREAM_KEEPALIVE_SEC = int(os.getenv("CHAT_STREAM_KEEPALIVE_SEC", "15"))
+    CHAT_STREAM_MAX_SEC = int(os.getenv("CHAT_STREAM_MAX_SEC", "300"))
+
+    # Signed tokens (app/tokens.py): access tokens for API calls, refresh tokens
+    # for POST /auth/refresh, match tokens in wsUrl (verified by the gateway).
+    ACCESS_TOKEN_TTL_SEC = int(os.getenv("ACCESS_TOKEN_TTL_SEC", "900"))
+    REFRESH_TOKEN_TTL_SEC = int(os.getenv("REFRESH_TOKEN_TTL_SEC", str(30 * 24 * 3600)))
+    MATCH_TOKEN_TTL_SEC = int(os.getenv("MATCH_TOKEN_TTL_SEC", str(6 * 3600)))
+
+    # Password hashing (app/passwords.py): Werkzeug method string, dedicated
+    # process pool size (0 = inline), max jobs in flight before answering 503,
+    # and how long a request waits for its hash.
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "16"))
+    PASSWORD_HASH_TIMEOUT_SEC = float(os.getenv("PASSWORD_HASH_TIMEOUT_SEC", "5"))
+
+    # Lifetime of cached GET /rooms pages (app/lobby_cache.py); writes in this
+    # process invalidate them immediately, other processes within this TTL.
+    LOBBY_CACHE_TTL_SEC = float(os.getenv("LOBBY_CACHE_TTL_SEC", "2"))
+
+    # Room seats (app/seats.py): how long a seat from POST /rooms/<id>/join waits
+    # for its match socket, and how long it is kept after that socket drops.
+    ROOM_SEAT_TTL_SEC = int(os.getenv("ROOM_SEAT_TTL_SEC", "120"))
+    ROOM_SEAT_RECONNECT_GRACE_SEC = int(os.getenv("ROOM_SEAT_RECONNECT_GRACE_SEC", "30"))
+
+    # Matchmaking queue (app/matchmaking.py): batching interval, how long an
+    # unpolled ticket stays queued, and the max long-poll wait per request.
+    MATCHMAKING_TICK_SEC = float(os.getenv("MATCHMAKING_TICK_SEC", "1"))
+    MATCHMAKING_TICKET_TTL_SEC = int(os.getenv("MATCHMAKING_TICKET_TTL_SEC", "60"))
+    MATCHMAKING_WAIT_MAX_SEC = int(os.getenv("MATCHMAKING_WAIT_MAX_SEC", "25"))
+
+    # Chat write-behind (app/chat_writer.py): async | batch | sync durability,
+    # rows per multi-row INSERT, max wait before a partial batch is written,
+    # how many unwritten messages are accepted before answering 503, and the
+    # longest backoff between retries of a failed write.
+    CHAT_WRITE_DURABILITY = os.getenv("CHAT_WRITE_DURABILITY", "async")
+    CHAT_WRITE_BATCH_SIZE = int(os.getenv("CHAT_WRITE_BATCH_SIZE", "100"))
+    CHAT_WRITE_FLUSH_MS = int(os.getenv("CHAT_WRITE_FLUSH_MS", "50"))
+    CHAT_WRITE_MAX_PENDING = int(os.getenv("CHAT_WRITE_MAX_PENDING", "10000"))
+    CHAT_WRITE_RETRY_MAX_MS = int(os.getenv("CHAT_WRITE_RETRY_MAX_MS", "5000"))
+
+    # In-memory chat history (app/chat_cache.py): newest messages kept per room
+    # (0 disables the cache) and the estimated memory budget across all rooms.
+    # Off automatically when WEB_CONCURRENCY > 1 and EVENT_BUS is memory.
+    CHAT_CACHE_ROOM_SIZE = int(os.getenv("CHAT_CACHE_ROOM_SIZE", "200"))
+    CHAT_CACHE_MAX_BYTES = int(os.getenv("CHAT_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+    # Realtime match gateway (python -m app.realtime). MATCH_WS_URL is the public
+    # base URL handed out by POST /rooms/<id>/join.
+    MATCH_WS_URL = os.getenv("MATCH_WS_URL", "ws://localhost:8081")
+    MATCH_WS_HEARTBEAT_TIMEOUT_SEC = float(os.getenv("MATCH_WS_HEARTBEAT_TIMEOUT_SEC", "45"))
+    MATCH_WS_MAX_BUFFERED_BYTES = int(os.getenv("MATCH_WS_MAX_BUFFERED_BYTES", str(256 * 1024)))
+
     REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+    # Cross-worker events and online presence (app/events.py): memory = this
+    # process only (tests, local runs, a single worker); redis = pub/sub and
+    # presence sets at REDIS_URL, keys prefixed with EVENT_BUS_PREFIX. A
+    # presence heartbeat keeps a client online for PRESENCE_TTL_SEC.
+    EVENT_BUS = os.getenv("EVENT_BUS", "memory")
+    EVENT_BUS_PREFIX = os.getenv("EVENT_BUS_PREFIX", "citylegends:")
+    PRESENCE_TTL_SEC = float(os.getenv("PRESENCE_TTL_SEC", "60"))
+
+    # Token-bucket rate limits (app/ratelimit.py), answered with 429 +
+    # Retry-After. Each RATE_LIMIT_<RULE> is "<count>/<seconds>": bursts of
+    # count requests, refilled evenly over seconds ("" or "0" turns a rule off).
+    # Chat is limited per logged-in user, per client IP and per room; login per
+    # IP and per email; registration per IP. RATE_LIMIT_STORAGE = memory (per
+    # process, at most RATE_LIMIT_MAX_KEYS active keys) or redis (REDIS_URL,
+    # shared by all workers).
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1").lower() in ("1", "true", "yes", "on")
+    RATE_LIMIT_STORAGE = os.getenv("RATE_LIMIT_STORAGE", "memory")
+    RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+    RATE_LIMIT_CHAT_USER = os.getenv("RATE_LIMIT_CHAT_USER", "5/5")
+    RATE_LIMIT_CHAT_IP = os.getenv("RATE_LIMIT_CHAT_IP", "20/10")
+    RATE_LIMIT_CHAT_ROOM = os.getenv("RATE_LIMIT_CHAT_ROOM", "50/10")
+    RATE_LIMIT_LOGIN_IP = os.getenv("RATE_LIMIT_LOGIN_IP", "20/60")
+    RATE_LIMIT_LOGIN_ACCOUNT = os.getenv("RATE_LIMIT_LOGIN_ACCOUNT", "5/60")
+    RATE_LIMIT_REGISTER_IP = os.getenv("RATE_LIMIT_REGISTER_IP", "5/300")
+    # Number of reverse proxies in front of the app whose X-Forwarded-For /
+    # -Proto / -Host headers are trusted (0 = use the socket peer address).
+    PROXY_HOPS = int(os.getenv("PROXY_HOPS", "0"))
+
+    # Fingerprinted static assets (app/assets/). `python -m app.assets build`
+    # writes content-hashed copies of app/static and the art assets, gzip (and
+    # brotli, if installed) variants of text files and a manifest to ASSETS_DIR
+    # (default instance/assets). With a build present and ASSETS_ENABLED on,
+    # url_for('static', ...) returns the hashed URLs, served with
+    # Cache-Control: immutable for ASSETS_MAX_AGE_SEC. Rebuild after editing.
+    ASSETS_ENABLED = os.getenv("ASSETS_ENABLED", "1").lower() in ("1", "true", "yes", "on")
+    ASSETS_DIR = os.getenv("ASSETS_DIR", "")
+    ASSETS_MAX_AGE_SEC = int(os.getenv("ASSETS_MAX_AGE_SEC", str(365 * 24 * 3600)))
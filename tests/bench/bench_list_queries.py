@@ -0,0 +1,174 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Per-row cost of the list endpoints' query path: ORM objects vs. column rows.
+
+Compares, on an in-memory SQLite database, hydrating full models
+(``Room.query`` / ``ChatMessage.query`` + ``*_to_dict``) with selecting only
+the public columns (``ROOM_LIST_COLUMNS`` / ``CHAT_MESSAGE_COLUMNS``) for a
+100-room lobby page and a 1000-message chat page. Each run starts from a fresh
+session, as a request does.
+
+    python tests/bench/bench_list_queries.py [--repeat 5] [--number 20] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from sqlalchemy import insert, select  # noqa: E402
+
+from app import create_app  # noqa: E402
+from app.models import (  # noqa: E402
+    CHAT_MESSAGE_COLUMNS,
+    ROOM_LIST_COLUMNS,
+    ChatMessage,
+    Room,
+    chat_message_to_dict,
+    db,
+    room_to_dict,
+)
+
+ROOMS = 100
+MESSAGES = 1000
+
+
+def seed() -> int:
+    now = datetime.now(timezone.utc)
+    db.session.execute(
+        insert(Room),
+        [
+            {
+                "name": f"Кімната {i}",
+                "mode": "quick" if i % 2 else "classic",
+                "max_players": 4,
+                "current_players": i % 4,
+                "access": "public",
+                "has_password": False,
+                "password_hash": None,
+                "status": "waiting",
+                "ping_ms": 42,
+                "invite_code": f"CL-{i:06d}",
+                "turn_duration_sec": 30,
+                "created_at": now - timedelta(seconds=i),
+                "updated_at": now,
+            }
+            for i in range(ROOMS)
+        ],
+    )
+    room_id = db.session.scalar(select(Room.id).limit(1))
+    db.session.execute(
+        insert(ChatMessage),
+        [
+            {
+                "id": f"{i:08d}-0000-7000-8000-000000000000",
+                "room_id": room_id,
+                "seq": i + 1,
+                "author": "Гравець",
+                "text": f"Повідомлення номер {i}, трохи тексту для реалістичного розміру.",
+                "created_at": now + timedelta(microseconds=i),
+                "updated_at": now,
+            }
+            for i in range(MESSAGES)
+        ],
+    )
+    db.session.commit()
+    return room_id
+
+
+def rooms_orm(_room_id: int) -> int:
+    rooms = Room.query.order_by(Room.created_at.desc(), Room.id.desc()).limit(ROOMS).all()
+    return len([room_to_dict(r) for r in rooms])
+
+
+def rooms_rows(_room_id: int) -> int:
+    rows = db.session.execute(
+        select(*ROOM_LIST_COLUMNS).order_by(Room.created_at.desc(), Room.id.desc()).limit(ROOMS)
+    ).all()
+    return len([room_to_dict(r) for r in rows])
+
+
+def chat_orm(room_id: int) -> int:
+    msgs = (
+        ChatMessage.query.filter(ChatMessage.room_id == room_id)
+        .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+        .limit(MESSAGES)
+        .all()
+    )
+    return len([chat_message_to_dict(m) for m in msgs])
+
+
+def chat_rows(room_id: int) -> int:
+    rows = db.session.execute(
+        select(*CHAT_MESSAGE_COLUMNS)
+        .where(ChatMessage.room_id == room_id)
+        .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+        .limit(MESSAGES)
+    ).all()
+    return len([chat_message_to_dict(r) for r in rows])
+
+
+CASES = (
+    ("rooms x100", rooms_orm, rooms_rows),
+    ("chat x1000", chat_orm, chat_rows),
+)
+
+
+def measure(fn, room_id: int, repeat: int, number: int) -> tuple[float, int]:
+    """Best-of-``repeat`` seconds per call, and the row count."""
+
+    rows = fn(room_id)
+    db.session.remove()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn(room_id)
+            db.session.remove()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best, rows
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args(argv)
+
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://", "TESTING": True})
+    results = []
+    with app.app_context():
+        room_id = seed()
+        for name, before, after in CASES:
+            t_before, rows = measure(before, room_id, args.repeat, args.number)
+            t_after, _ = measure(after, room_id, args.repeat, args.number)
+            results.append(
+                {
+                    "case": name,
+                    "rows": rows,
+                    "orm_us_per_row": t_before / rows * 1e6,
+                    "rows_us_per_row": t_after / rows * 1e6,
+                    "speedup": t_before / t_after,
+                }
+            )
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'case':<12} {'rows':>5} {'ORM us/row':>11} {'cols us/row':>12} {'speedup':>8}")
+    for r in results:
+        print(
+            f"{r['case']:<12} {r['rows']:>5} {r['orm_us_per_row']:>11.2f} "
+            f"{r['rows_us_per_row']:>12.2f} {r['speedup']:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,430 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Microbenchmark suite with stored baselines.
+
+Times the hot helpers (``room_to_dict``, ``chat_message_to_dict``,
+``utc_iso``, chat message encoding, the ``create_room`` / ``auth_register``
+field validation, ``sinceId`` resolution) and every ``api_bp`` route through
+the Flask test client, on a synthetic dataset (200 rooms, a 2000-message chat)
+in a temporary SQLite file. A route added to ``api_bp`` without a case
+here fails the run, so coverage keeps up with the API.
+
+Each case reports the median of ``--repeat`` timings per call; the number of calls
+per repeat is calibrated to take about ``--target-ms``. Results are compared
+with ``tests/bench/baselines.json`` and the run exits with status 1 when any
+case is slower than its baseline by more than ``--threshold`` (relative).
+Cases over the threshold are measured again (``--retries``) before they
+count, so a moment of background load does not fail the run.
+Baselines depend on the machine: record them with ``--save`` on the machine
+that runs the comparison (after an intentional change, too)::
+
+    python tests/bench/suite.py                # compare with baselines
+    python tests/bench/suite.py --save         # record new baselines
+    python tests/bench/suite.py -k chat --json # subset, machine-readable
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import itertools
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, NamedTuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from sqlalchemy import insert, select, update  # noqa: E402
+
+from app import create_app  # noqa: E402
+from app.api import _chat_anchor, _registration_fields, _room_fields  # noqa: E402
+from app.chat_cache import chat_cache  # noqa: E402
+from app.matchmaking import matchmaker  # noqa: E402
+from app.models import (  # noqa: E402
+    CHAT_MESSAGE_COLUMNS,
+    ROOM_LIST_COLUMNS,
+    ChatMessage,
+    Room,
+    User,
+    chat_message_to_dict,
+    db,
+    room_to_dict,
+    utc_iso,
+)
+from app.passwords import password_hasher  # noqa: E402
+from app.serialization import chat_item  # noqa: E402
+from app.tokens import issue_access_token, issue_refresh_token  # noqa: E402
+
+BASELINES = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+ROOMS = 200
+MESSAGES = 2000
+PASSWORD = "bench-password"
+
+
+class Case(NamedTuple):
+    name: str
+    fn: Callable
+    # Untimed per-call preparation; its result is passed to fn.
+    setup: Callable | None = None
+
+
+# ---------------------- Dataset ----------------------
+
+
+class Data:
+    """Ids and credentials of the seeded dataset."""
+
+    chat_room: int
+    post_room: int
+    user_id: str
+    email: str
+    token: str
+    refresh: str
+    newest_id: str
+    newest_seq: int
+    old_id: str
+
+
+def seed(app) -> Data:
+    now = datetime.now(timezone.utc)
+    data = Data()
+    db.session.execute(
+        insert(Room),
+        [
+            {
+                "name": f"Кімната {i}",
+                "mode": "quick" if i % 2 else "classic",
+                "max_players": 4,
+                "current_players": i % 4,
+                "access": "public",
+                "has_password": False,
+                "status": "waiting",
+                "ping_ms": 42,
+                "invite_code": f"CL-B{i:05d}",
+                "turn_duration_sec": 30,
+                "created_at": now - timedelta(seconds=i),
+                "updated_at": now,
+            }
+            for i in range(ROOMS)
+        ],
+    )
+    data.chat_room, data.post_room = db.session.scalars(select(Room.id).order_by(Room.id).limit(2)).all()
+    ids = [f"{i:08d}-0000-7000-8000-000000000000" for i in range(MESSAGES)]
+    db.session.execute(
+        insert(ChatMessage),
+        [
+            {
+                "id": ids[i],
+                "room_id": data.chat_room,
+                "seq": i + 1,
+                "author": "Гравець",
+                "text": f"Повідомлення номер {i}, трохи тексту для реалістичного розміру.",
+                "created_at": now + timedelta(microseconds=i),
+                "updated_at": now,
+            }
+            for i in range(MESSAGES)
+        ],
+    )
+    db.session.execute(update(Room).where(Room.id == data.chat_room).values(chat_seq=MESSAGES))
+    user = User(nickname="bench", email="bench@example.test", password_hash=password_hasher.hash(PASSWORD))
+    db.session.add(user)
+    db.session.commit()
+    secret = app.config["SECRET_KEY"]
+    data.user_id, data.email = user.id, user.email
+    data.token = issue_access_token(secret, user.id, user.nickname)
+    data.refresh = issue_refresh_token(secret, user.id)
+    data.newest_id, data.newest_seq, data.old_id = ids[-1], MESSAGES, ids[0]
+    return data
+
+
+# ---------------------- Cases ----------------------
+
+
+def ok(resp, *statuses):
+    """Fail loudly when a route answers with an unexpected status (a broken case times nothing useful)."""
+
+    if resp.status_code not in statuses:
+        raise AssertionError(f"{resp.request.method} {resp.request.path}: {resp.status_code} {resp.get_data()[:200]!r}")
+    return resp
+
+
+def helper_cases(data: Data) -> list[Case]:
+    """Run inside a request context (the helpers use db.session / current_app)."""
+
+    room_obj = db.session.get(Room, data.chat_room)
+    room_row = db.session.execute(select(*ROOM_LIST_COLUMNS).where(Room.id == data.chat_room)).one()
+    msg_row = db.session.execute(select(*CHAT_MESSAGE_COLUMNS).limit(1)).one()
+    aware = datetime.now(timezone.utc)
+    shifted = aware.astimezone(timezone(timedelta(hours=3)))
+    naive = datetime.now()
+    room_ok = {"name": "Лобі", "mode": "quick", "maxPlayers": 4, "access": "private", "password": "secret"}
+    room_bad = {"name": " ", "mode": "blitz", "maxPlayers": 3, "access": "private", "password": "1"}
+    signup = {"nickname": "Гравець", "email": "Player@Example.test ", "password": "secret123"}
+    # Warm the room's ring buffer, as the first history read does.
+    chat_cache.page(data.chat_room, None, False, 50)
+    return [
+        Case("room_to_dict[orm]", lambda: room_to_dict(room_obj)),
+        Case("room_to_dict[row]", lambda: room_to_dict(room_row)),
+        Case("chat_message_to_dict[row]", lambda: chat_message_to_dict(msg_row)),
+        Case("utc_iso[utc]", lambda: utc_iso(aware)),
+        Case("utc_iso[offset]", lambda: utc_iso(shifted)),
+        Case("utc_iso[naive]", lambda: utc_iso(naive)),
+        Case("chat_item[encode]", lambda: chat_item(msg_row)),
+        Case("validate_room[ok]", lambda: _room_fields(room_ok)),
+        Case("validate_room[errors]", lambda: _room_fields(room_bad)),
+        Case("validate_registration", lambda: _registration_fields(signup)),
+        Case("sinceId[ring]", lambda: _chat_anchor(data.chat_room, None, data.newest_id)),
+        Case("sinceId[db]", lambda: _chat_anchor(data.chat_room, None, data.old_id)),
+    ]
+
+
+def route_cases(app, client, data: Data) -> dict[str, Case]:
+    """One case per ``api_bp`` route, keyed ``"<METHOD> <endpoint>"``."""
+
+    auth = {"Authorization": f"Bearer {data.token}"}
+    counter = itertools.count()
+    chat = f"/api/chat/{data.chat_room}"
+
+    def new_room():
+        resp = ok(client.post("/rooms", json={"name": "Лава", "mode": "quick", "maxPlayers": 4}), 201)
+        return resp.get_json()["room"]["id"]
+
+    def new_ticket():
+        resp = ok(client.post("/matchmaking/queue", json={"mode": "classic", "maxPlayers": 4}), 202)
+        return resp.get_json()["ticketId"]
+
+    def stream(_):
+        resp = ok(client.get(f"{chat}/stream?afterSeq={data.newest_seq - 5}", buffered=False), 200)
+        chunks = iter(resp.response)
+        for _ in range(6):  # retry + five backlog events
+            next(chunks)
+        resp.close()
+
+    def unique(prefix: str) -> str:
+        return f"{prefix}{next(counter)}"
+
+    return {
+        "POST api.auth_login": Case("route POST /auth/login", lambda: ok(
+            client.post("/auth/login", json={"email": data.email, "password": PASSWORD}), 200)),
+        "POST api.auth_register": Case("route POST /auth/register", lambda: ok(client.post("/auth/register", json={
+            "nickname": unique("b"), "email": f"{unique('r')}@example.test", "password": PASSWORD}), 201)),
+        "POST api.auth_refresh": Case("route POST /auth/refresh", lambda: ok(
+            client.post("/auth/refresh", json={"refreshToken": data.refresh}), 200)),
+        "POST api.auth_reset": Case("route POST /auth/reset", lambda: ok(
+            client.post("/auth/reset", json={"email": data.email}), 200)),
+        "POST api.update_nickname": Case("route POST /profile/nickname", lambda: ok(
+            client.post("/profile/nickname", json={"nickname": unique("n")}, headers=auth), 200)),
+        "GET api.list_rooms": Case("route GET /rooms", lambda: ok(client.get("/rooms"), 200)),
+        "POST api.create_room": Case("route POST /rooms", lambda: ok(
+            client.post("/rooms", json={"name": "Лобі", "mode": "classic", "maxPlayers": 2}), 201)),
+        "POST api.join_room": Case("route POST /rooms/<id>/join", lambda room: ok(
+            client.post(f"/rooms/{room}/join", json={}), 200), new_room),
+        "POST api.matchmaking_enqueue": Case("route POST /matchmaking/queue", lambda: ok(
+            client.post("/matchmaking/queue", json={"mode": "quick", "maxPlayers": 4}), 202, 200)),
+        "GET api.matchmaking_status": Case("route GET /matchmaking/queue/<id>", lambda ticket: ok(
+            client.get(f"/matchmaking/queue/{ticket}"), 202, 200), new_ticket),
+        "DELETE api.matchmaking_cancel": Case("route DELETE /matchmaking/queue/<id>", lambda ticket: ok(
+            client.delete(f"/matchmaking/queue/{ticket}"), 200, 409), new_ticket),
+        "POST api.presence_heartbeat": Case("route POST /presence", lambda: ok(
+            client.post("/presence", json={"roomId": data.chat_room}), 200)),
+        "GET api.presence_counts": Case("route GET /presence", lambda: ok(
+            client.get(f"/presence?rooms={data.chat_room},{data.post_room}"), 200)),
+        "GET api.chat_list": Case("route GET /api/chat/<id>", lambda: ok(client.get(chat), 200)),
+        "GET api.chat_stream": Case("route GET /api/chat/<id>/stream", stream, lambda: None),
+        "POST api.chat_post": Case("route POST /api/chat/<id>", lambda: ok(
+            client.post(f"/api/chat/{data.post_room}", json={"text": "Привіт усім!"}), 201)),
+    }
+
+
+def extra_route_cases(client, data: Data) -> list[Case]:
+    """Route variants worth tracking besides the default request."""
+
+    chat = f"/api/chat/{data.chat_room}"
+    return [
+        Case("route GET /api/chat/<id>?limit=200", lambda: ok(client.get(f"{chat}?limit=200"), 200)),
+        Case("route GET /api/chat/<id>?sinceId", lambda: ok(client.get(f"{chat}?sinceId={data.newest_id}"), 200)),
+        Case("route GET /api/chat/<id>?afterSeq[db]", lambda: ok(client.get(f"{chat}?afterSeq=10"), 200)),
+        Case("route GET /rooms?limit=100", lambda: ok(client.get("/rooms?limit=100"), 200)),
+    ]
+
+
+def api_routes(app) -> list[str]:
+    keys = []
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint.startswith("api."):
+            keys += [f"{m} {rule.endpoint}" for m in sorted(rule.methods - {"HEAD", "OPTIONS"})]
+    return sorted(keys)
+
+
+# ---------------------- Timing ----------------------
+
+
+def measure(case: Case, repeat: int, target: float) -> float:
+    """Median over ``repeat`` runs of seconds per call, with the collector off (like timeit)."""
+
+    def run(number: int) -> float:
+        if case.setup is None:
+            start = time.perf_counter()
+            for _ in range(number):
+                case.fn()
+            return time.perf_counter() - start
+        total = 0.0
+        for _ in range(number):
+            arg = case.setup()
+            start = time.perf_counter()
+            case.fn(arg)
+            total += time.perf_counter() - start
+        return total
+
+    once = run(1)  # warm-up and calibration
+    number = max(1, min(100_000, math.ceil(target / max(once, 1e-7))))
+    gc.collect()
+    gc.disable()
+    try:
+        return statistics.median(run(number) for _ in range(repeat)) / number
+    finally:
+        gc.enable()
+
+
+def machine() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(terse=True),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], threshold: float):
+    rows, regressions = [], []
+    for name, us in results.items():
+        base = baseline.get(name)
+        ratio = us / base if base else None
+        status = "new" if base is None else "REGRESSION" if ratio > 1 + threshold else "ok"
+        if status == "REGRESSION":
+            regressions.append(name)
+        rows.append({"case": name, "us": round(us, 3), "baseline_us": base, "ratio": ratio and round(ratio, 3), "status": status})
+    return rows, regressions
+
+
+def settle(app) -> None:
+    """Let background database work finish before the file is removed."""
+
+    app.extensions["chat_writer"].flush()
+    with matchmaker._lock:
+        tickets = list(matchmaker._tickets.values())
+    for ticket in tickets:
+        if not matchmaker.cancel(ticket):
+            ticket.wait(5.0)  # taken into a batch that is being seated
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-k", dest="filter", default="", help="only cases whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--target-ms", type=float, default=50.0, help="time per repeat used to pick the call count")
+    parser.add_argument("--threshold", type=float, default=0.3, help="allowed slowdown vs. baseline (0.3 = +30%%)")
+    parser.add_argument("--retries", type=int, default=2, help="re-measure cases over the threshold this many times")
+    parser.add_argument("--baselines", default=BASELINES)
+    parser.add_argument("--save", action="store_true", help="write results as the new baselines")
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args(argv)
+
+    # A file, not sqlite:// (one connection shared by all threads): the chat
+    # writer and matchmaker use the database from their own threads.
+    fd, db_path = tempfile.mkstemp(prefix="citylegends-bench-", suffix=".db")
+    os.close(fd)
+    try:
+        return run(args, db_path)
+    finally:
+        os.remove(db_path)
+
+
+def run(args, db_path: str) -> int:
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}",
+        "TESTING": True,
+        "RATE_LIMIT_ENABLED": False,
+        "CHAT_WRITE_DURABILITY": "async",
+        # The baselines were recorded with request / SQL metrics on.
+        "METRICS_ENABLED": True,
+    })
+    with app.app_context():
+        data = seed(app)
+    client = app.test_client()
+
+    routes = route_cases(app, client, data)
+    missing = [key for key in api_routes(app) if key not in routes]
+    if missing:
+        print(f"no benchmark case for api route(s): {', '.join(missing)}", file=sys.stderr)
+        return 2
+
+    cases: dict[str, Case] = {}
+    results: dict[str, float] = {}
+    target = args.target_ms / 1000.0
+
+    with app.test_request_context():
+        for case in helper_cases(data):
+            if args.filter in case.name:
+                cases[case.name] = case
+                results[case.name] = measure(case, args.repeat, target) * 1e6
+        db.session.remove()
+    chat_cache.clear()
+    for case in [*routes.values(), *extra_route_cases(client, data)]:
+        if args.filter in case.name:
+            cases[case.name] = case
+            results[case.name] = measure(case, args.repeat, target) * 1e6
+            # Don't let the async chat writer compete with the next case.
+            app.extensions["chat_writer"].flush()
+
+    baseline: dict[str, float] = {}
+    if os.path.exists(args.baselines):
+        with open(args.baselines, encoding="utf-8") as fh:
+            stored = json.load(fh)
+        baseline = stored.get("results", {})
+        if not args.save and stored.get("machine") != machine():
+            print(f"note: baselines were recorded on {stored.get('machine')}", file=sys.stderr)
+    rows, regressions = compare(results, baseline, args.threshold)
+    for _ in range(0 if args.save else args.retries):
+        if not regressions:
+            break
+        with app.test_request_context():  # the helper cases need one
+            for name in regressions:
+                results[name] = min(results[name], measure(cases[name], args.repeat, target) * 1e6)
+            db.session.remove()
+        rows, regressions = compare(results, baseline, args.threshold)
+    settle(app)
+
+    if args.save:
+        merged = {**baseline, **{name: round(us, 3) for name, us in results.items()}}
+        with open(args.baselines, "w", encoding="utf-8") as fh:
+            json.dump({"machine": machine(), "results": dict(sorted(merged.items()))}, fh, indent=2, ensure_ascii=False)
+            fh.write("\n")
+        regressions = []
+
+    if args.json:
+        print(json.dumps({"machine": machine(), "threshold": args.threshold, "cases": rows}, indent=2, ensure_ascii=False))
+    else:
+        print(f"{'case':<42} {'us/call':>10} {'baseline':>10} {'ratio':>7}  status")
+        for r in rows:
+            base = f"{r['baseline_us']:.2f}" if r["baseline_us"] else "-"
+            ratio = f"{r['ratio']:.2f}" if r["ratio"] else "-"
+            print(f"{r['case']:<42} {r['us']:>10.2f} {base:>10} {ratio:>7}  {r['status']}")
+        if args.save:
+            print(f"baselines saved to {os.path.relpath(args.baselines)}")
+    if regressions:
+        print(f"{len(regressions)} case(s) regressed by more than {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
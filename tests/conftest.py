@@ -0,0 +1,67 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+"""Shared fixtures: an app on a fresh SQLite file per test."""
+
+from __future__ import annotations
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import create_app  # noqa: E402
+from app.models import Room, db  # noqa: E402
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """``make_app(**config)``: an app on its own migrated SQLite file."""
+
+    apps = []
+
+    def factory(**config):
+        app = create_app({
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'test.db'}",
+            "DB_SCHEMA_ON_START": "migrate",
+            "TESTING": True,
+            "RATE_LIMIT_ENABLED": False,
+            "CHAT_WRITE_DURABILITY": "sync",
+            **config,
+        })
+        apps.append(app)
+        return app
+
+    yield factory
+    for app in apps:
+        app.extensions["chat_writer"].flush()
+        with app.app_context():
+            db.engine.dispose()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def new_room(app):
+    """``new_room(**fields)`` -> id of a waiting public room."""
+
+    def factory(**fields):
+        with app.app_context():
+            room = Room(name="Тест", mode="quick", max_players=4, current_players=0, access="public",
+                        has_password=False, status="waiting", ping_ms=42, turn_duration_sec=30)
+            for key, value in fields.items():
+                setattr(room, key, value)
+            db.session.add(room)
+            db.session.commit()
+            return room.id
+
+    return factory
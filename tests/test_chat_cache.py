@@ -0,0 +1,43 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from app.chat_cache import chat_cache
+from app.models import ChatMessage, db
+
+
+def _write_elsewhere(app, room_id: int, text: str) -> None:
+    """A message stored by another worker: in the database, never announced here."""
+
+    now = datetime.now(timezone.utc)
+    with app.app_context():
+        db.session.add(ChatMessage(room_id=room_id, author="b", text=text, created_at=now, updated_at=now))
+        db.session.commit()
+
+
+def _texts(client, room_id: int) -> list[str]:
+    return [m["text"] for m in client.get(f"/api/chat/{room_id}").get_json()["messages"]]
+
+
+def test_single_worker_serves_recent_history_from_the_ring(app, client, new_room):
+    room_id = new_room()
+    client.post(f"/api/chat/{room_id}", json={"text": "один"})
+    assert chat_cache.enabled
+    assert _texts(client, room_id) == ["один"]
+
+    # A warm ring is not re-read from the database.
+    _write_elsewhere(app, room_id, "повз кеш")
+    assert _texts(client, room_id) == ["один"]
+
+
+def test_workers_without_a_shared_bus_read_the_database(make_app, new_room):
+    app = make_app(WEB_CONCURRENCY=2, EVENT_BUS="memory")
+    client = app.test_client()
+    room_id = new_room()
+    client.post(f"/api/chat/{room_id}", json={"text": "один"})
+    assert not chat_cache.enabled
+
+    _write_elsewhere(app, room_id, "з іншого процесу")
+    assert _texts(client, room_id) == ["один", "з іншого процесу"]
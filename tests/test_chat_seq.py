@@ -0,0 +1,112 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import sqlalchemy as sa
+
+from app.chat_seq import assign_seqs
+from app.chat_writer import ChatWriter
+from app.models import ChatMessage, Room, db
+
+
+def test_writers_in_two_processes_never_repeat(app, new_room):
+    room_id = new_room()
+    url = app.config["SQLALCHEMY_DATABASE_URI"]
+    # One engine each, like two API workers sharing the database.
+    engines = [sa.create_engine(url, connect_args={"timeout": 30}) for _ in range(2)]
+    got: list[list[int]] = [[], []]
+
+    def work(i: int) -> None:
+        for _ in range(10):
+            rows = [{"room_id": room_id} for _ in range(5)]
+            with engines[i].begin() as conn:
+                assign_seqs(conn, rows)
+            got[i].extend(row["seq"] for row in rows)
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for engine in engines:
+        engine.dispose()
+
+    assert sorted(got[0] + got[1]) == list(range(1, 101))
+    assert got[0] == sorted(got[0]) and got[1] == sorted(got[1])
+
+
+def test_rows_of_a_missing_room_are_left_out(app, new_room):
+    room_id = new_room()
+    rows = [{"room_id": room_id}, {"room_id": 12345}, {"room_id": room_id}]
+    with app.app_context():
+        updated = db.session.get(Room, room_id).updated_at
+        with db.engine.begin() as conn:
+            kept = assign_seqs(conn, rows)
+
+    assert [row["seq"] for row in kept] == [1, 2]
+    assert "seq" not in rows[1]
+    with app.app_context():
+        assert db.session.get(Room, room_id).updated_at == updated
+
+
+def test_async_messages_get_seq_when_written(make_app, new_room):
+    app = make_app(CHAT_WRITE_DURABILITY="async", CHAT_WRITE_FLUSH_MS=10_000)
+    room_id = new_room()
+    client = app.test_client()
+
+    posted = [client.post(f"/api/chat/{room_id}", json={"text": f"#{i}"}).get_json()["message"] for i in range(3)]
+    assert [m["seq"] for m in posted] == [None, None, None]
+    app.extensions["chat_writer"].flush()
+
+    # The ring buffer that served the acknowledgement learns the numbers too.
+    listed = client.get(f"/api/chat/{room_id}").get_json()["messages"]
+    assert [(m["id"], m["seq"]) for m in listed] == [(m["id"], i) for i, m in enumerate(posted, 1)]
+
+
+def test_posted_messages_are_numbered_per_room(app, client, new_room):
+    first, second = new_room(), new_room()
+    seqs = []
+    for room_id in (first, first, second, first):
+        resp = client.post(f"/api/chat/{room_id}", json={"text": "привіт"})
+        assert resp.status_code == 201
+        seqs.append(resp.get_json()["message"]["seq"])
+    assert seqs == [1, 2, 1, 3]
+
+    with app.app_context():
+        assert db.session.get(Room, first).chat_seq == 3
+        stored = db.session.scalars(sa.select(ChatMessage.seq).where(ChatMessage.room_id == first)).all()
+        assert sorted(stored) == [1, 2, 3]
+    assert client.post("/api/chat/99999", json={"text": "x"}).status_code == 404
+
+
+def test_after_seq_pages_by_seq_not_by_time(app, client, new_room):
+    room_id = new_room()
+    now = datetime.now(timezone.utc)
+    # Worker B's clock runs behind: its message is written (seq 3) after
+    # worker A's seq 2 but carries an earlier timestamp.
+    rows = [(1, now), (2, now + timedelta(seconds=5)), (3, now + timedelta(seconds=2))]
+    with app.app_context():
+        for seq, created_at in rows:
+            db.session.add(ChatMessage(id=f"m{seq}", room_id=room_id, seq=seq, author="a", text=str(seq),
+                                       created_at=created_at, updated_at=created_at))
+        db.session.commit()
+
+    page = client.get(f"/api/chat/{room_id}?afterSeq=2").get_json()
+    assert [m["seq"] for m in page["messages"]] == [3]
+    page = client.get(f"/api/chat/{room_id}?afterSeq=0&limit=2").get_json()
+    assert [m["seq"] for m in page["messages"]] == [1, 2]
+    assert page["hasMore"] is True
+    assert client.get(f"/api/chat/{room_id}?afterSeq=x").status_code == 400
+
+    stream = client.get(f"/api/chat/{room_id}/stream?afterSeq=2", buffered=False)
+    first = b""
+    for chunk in stream.response:
+        first += chunk
+        if b"event: message" in first:
+            break
+    stream.close()
+    assert b'"seq":3' in first
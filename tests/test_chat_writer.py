@@ -0,0 +1,127 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+from __future__ import annotations
+
+import time
+
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.exc import OperationalError
+
+from app.chat_writer import BATCH_ATTEMPTS, ChatWriter
+from app.models import ChatMessage, db
+
+
+@pytest.fixture
+def writer_app(make_app):
+    """``writer_app(durability)`` -> (app, fresh ChatWriter) with quick flushes and retries."""
+
+    def factory(durability: str):
+        app = make_app(
+            CHAT_WRITE_DURABILITY=durability,
+            CHAT_WRITE_FLUSH_MS=10,
+            CHAT_WRITE_RETRY_MAX_MS=200,
+            METRICS_ENABLED=True,
+        )
+        writer = ChatWriter()
+        writer.init_app(app)
+        return app, writer
+
+    return factory
+
+
+class _Outage:
+    """Makes the next ``times`` chat INSERTs (all of them if None) fail like a DB outage."""
+
+    def __init__(self, app, times: int | None):
+        self.app = app
+        self.times = times
+        self.failed = 0
+        with app.app_context():
+            event.listen(db.engine, "before_cursor_execute", self._before)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO chat_messages") and (self.times is None or self.failed < self.times):
+            self.failed += 1
+            raise OperationalError(statement, parameters, Exception("database is locked"))
+
+    def end(self) -> None:
+        with self.app.app_context():
+            event.remove(db.engine, "before_cursor_execute", self._before)
+
+
+def _stored(app) -> int:
+    with app.app_context():
+        return db.session.scalar(select(func.count()).select_from(ChatMessage))
+
+
+def _wait_written(writer: ChatWriter, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while writer.pending and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+
+def test_async_outage_keeps_rows_and_retries(writer_app, new_room):
+    app, writer = writer_app("async")
+    room_id = new_room()
+    outage = _Outage(app, times=2)
+
+    with app.app_context():
+        for i in range(3):
+            writer.submit(writer.new_message(room_id, "Гравець", f"line {i}"))
+    _wait_written(writer)
+
+    assert outage.failed == 2
+    assert writer.write_failures == 2
+    assert writer.pending == 0
+    assert _stored(app) == 3
+    assert "chat_write_failures_total 2" in app.test_client().get("/metrics").get_data(as_text=True)
+
+
+def test_flush_during_outage_leaves_rows_pending(writer_app, new_room):
+    app, writer = writer_app("async")
+    room_id = new_room()
+    outage = _Outage(app, times=None)
+
+    with app.app_context():
+        writer.submit(writer.new_message(room_id, "Гравець", "hello"))
+    writer.flush()
+
+    assert outage.failed >= 1
+    assert writer.pending == 1
+    assert _stored(app) == 0
+
+    # Back up: the writer thread's retry stores it.
+    outage.end()
+    _wait_written(writer)
+    assert _stored(app) == 1
+
+
+def test_batch_mode_reports_error_after_retries(writer_app, new_room):
+    app, writer = writer_app("batch")
+    room_id = new_room()
+    outage = _Outage(app, times=None)
+
+    with app.app_context():
+        with pytest.raises(OperationalError):
+            writer.submit(writer.new_message(room_id, "Гравець", "hello"))
+
+    assert outage.failed == BATCH_ATTEMPTS
+    assert writer.write_failures == BATCH_ATTEMPTS
+    assert writer.pending == 0
+    assert _stored(app) == 0
+
+
+def test_integrity_error_drops_only_the_bad_row(writer_app, new_room):
+    app, writer = writer_app("async")
+    room_id = new_room()
+
+    with app.app_context():
+        first = writer.new_message(room_id, "Гравець", "once")
+        writer.submit(first)
+        writer.submit(first)
+        writer.submit(writer.new_message(room_id, "Гравець", "twice"))
+    _wait_written(writer)
+
+    assert writer.write_failures == 0
+    assert _stored(app) == 2
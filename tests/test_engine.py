@@ -0,0 +1,246 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+from __future__ import annotations
+
+from array import array
+
+import pytest
+
+from app.game.cards import D_CEMETERY, D_CENTER, D_METRO, D_OUTSKIRTS, D_SCHOOL, GOOD_NEWS, PANIC, SCHOOLBOY
+from app.game.engine import (
+    IllegalAction,
+    apply_action,
+    attack,
+    attack_player,
+    contest_district,
+    end_turn,
+    legal_actions,
+    perform,
+    play_card,
+)
+from app.game.state import new_match
+
+FIREFIGHTER = 3  # 1 VP, 2 HP, 1 ATK
+GHOST = 13  # Legend: 1 VP, 3 HP, 2 ATK
+BRIDE = 20  # Legend: 1 VP, 4 HP, 2 ATK (classic only)
+
+
+class _Dice:
+    """Stands in for ``state.rng`` in district fights: fixed 2d6 results."""
+
+    def __init__(self, *rolls: int):
+        self.rolls = list(rolls)
+
+    def randint(self, a: int, b: int) -> int:
+        return self.rolls.pop(0)
+
+
+def _match(mode: str = "quick", seed: int = 1, districts=(D_SCHOOL, D_METRO, D_OUTSKIRTS, D_CENTER)):
+    state = new_match(mode, ["p_1", "p_2"], seed=seed)
+    state.districts = array("b", districts)
+    state.district_owner = array("b", [-1] * len(districts))
+    return state
+
+
+def test_new_match_is_seeded_and_seat_zero_starts():
+    state = new_match("quick", ["p_1", "p_2"], seed=5)
+    again = new_match("quick", ["p_1", "p_2"], seed=5)
+
+    assert [list(p.hand) for p in state.players] == [list(p.hand) for p in again.players]
+    assert list(state.districts) == list(again.districts)
+    assert [len(p.hand) for p in state.players] == [4, 4]
+    assert (state.current, state.round, state.players[0].actions, state.players[1].actions) == (0, 1, 2, 0)
+
+
+def test_turn_order_draws_and_rounds():
+    state = _match()
+
+    with pytest.raises(IllegalAction) as exc:
+        end_turn(state, 1)
+    assert exc.value.code == "not_your_turn"
+
+    end_turn(state, 0)
+    # First turn of seat 1: no draw yet, same round.
+    assert (state.current, state.round, state.turn_number) == (1, 1, 2)
+    assert len(state.players[1].hand) == 4
+    assert state.players[1].actions == 2
+
+    end_turn(state, 1)
+    assert (state.current, state.round) == (0, 2)
+    assert len(state.players[0].hand) == 4 + state.rules.draw_per_turn
+
+
+def test_each_action_costs_one_and_is_validated_first():
+    state = _match()
+    player = state.players[0]
+    player.hand = array("B", [SCHOOLBOY, SCHOOLBOY, FIREFIGHTER])
+
+    play_card(state, 0, 0)
+    play_card(state, 0, 0)
+
+    with pytest.raises(IllegalAction) as exc:
+        play_card(state, 0, 0)
+    assert exc.value.code == "no_actions_left"
+    assert list(player.hand) == [FIREFIGHTER]
+    assert list(player.board) == [SCHOOLBOY, SCHOOLBOY]
+
+
+def test_free_district_is_claimed_without_a_roll():
+    state = _match()
+    state.rng = _Dice()
+
+    assert contest_district(state, 0, 0)
+    assert state.district_owner[0] == 0
+
+    with pytest.raises(IllegalAction) as exc:
+        contest_district(state, 0, 0)
+    assert exc.value.code == "already_controlled"
+
+
+@pytest.mark.parametrize(("rolls", "won"), [((6, 6, 1, 1), True), ((3, 3, 3, 3), False)])
+def test_owned_district_is_an_opposed_roll_and_metro_costs_the_loser_a_card(rolls, won):
+    state = _match()
+    state.district_owner[1] = 1  # Метро
+    state.rng = _Dice(*rolls)
+    hands = [len(p.hand) for p in state.players]
+
+    assert contest_district(state, 0, 1) is won
+
+    # A tie defends the district.
+    assert state.district_owner[1] == (0 if won else 1)
+    loser = 1 if won else 0
+    assert len(state.players[loser].hand) == hands[loser] - 1
+    assert len(state.players[1 - loser].hand) == hands[1 - loser]
+
+
+def test_legends_add_to_the_district_roll():
+    state = _match()
+    state.district_owner[0] = 1
+    state.players[0].board_add(GHOST)
+    state.rng = _Dice(3, 3, 3, 3)
+
+    assert contest_district(state, 0, 0)
+
+
+def test_attack_damages_then_destroys():
+    state = _match()
+    me, them = state.players
+    me.board_add(FIREFIGHTER)
+    me.board_add(GHOST)
+    them.board_add(FIREFIGHTER)
+    them.board_add(GOOD_NEWS)
+
+    assert not attack(state, 0, 0, 1, 0)
+    assert them.board_hp[0] == 1
+    with pytest.raises(IllegalAction) as exc:
+        attack(state, 0, 0, 1, 0)
+    assert exc.value.code == "already_used"
+    with pytest.raises(IllegalAction) as exc:
+        attack(state, 0, 1, 1, 1)
+    assert exc.value.code == "invalid_target"
+
+    assert attack(state, 0, 1, 1, 0)
+    assert list(them.board) == [GOOD_NEWS]
+    assert list(them.discard) == [FIREFIGHTER]
+
+
+def test_direct_hit_needs_outskirts_and_ends_the_game_at_zero_hp():
+    state = _match()
+    state.players[0].board_add(GHOST)
+
+    with pytest.raises(IllegalAction) as exc:
+        attack_player(state, 0, 0, 1)
+    assert exc.value.code == "district_required"
+
+    state.district_owner[2] = 0  # Околиця
+    state.players[1].hp = 1
+    attack_player(state, 0, 0, 1)
+
+    assert not state.players[1].alive
+    assert (state.end_reason, state.winner) == ("hp", 0)
+    assert legal_actions(state, 0) == []
+
+
+def test_vp_counts_district_bonuses_and_panic_blocks_them():
+    state = _match("classic", districts=(D_SCHOOL, D_CEMETERY, D_METRO, D_CENTER, D_OUTSKIRTS, D_OUTSKIRTS))
+    me, them = state.players
+    for _ in range(4):
+        me.board_add(SCHOOLBOY)
+    me.board_add(BRIDE)
+
+    # People count, Legends do not off "Старе кладовище".
+    assert state.vp(0) == 4
+
+    state.district_owner[0] = 0
+    state.district_owner[1] = 0
+    # +3 for Schoolboys on "Шкільний квартал" (capped), +1 for the Legend.
+    assert state.vp(0) == 4 + 3 + 1
+
+    them.board_add(PANIC)
+    assert state.vp(0) == 4
+
+
+def test_reaching_the_vp_target_ends_the_game():
+    state = _match()
+    me = state.players[0]
+    me.vp_bank = state.rules.vp_target - 1
+    me.hand = array("B", [SCHOOLBOY])
+
+    play_card(state, 0, 0)
+
+    assert (state.end_reason, state.winner) == ("vp", 0)
+    with pytest.raises(IllegalAction) as exc:
+        end_turn(state, 0)
+    assert exc.value.code == "game_over"
+
+
+@pytest.mark.parametrize(("bank", "winner"), [((3, 1), 0), ((1, 3), 1), ((2, 2), -1)])
+def test_round_limit_ends_on_vp_or_a_draw(bank, winner):
+    state = _match()
+    for player, vp in zip(state.players, bank):
+        player.vp_bank = vp
+
+    while not state.finished:
+        end_turn(state, state.current)
+
+    assert state.end_reason == "rounds"
+    assert state.round == state.rules.round_limit + 1
+    assert state.winner == winner
+
+
+def test_legal_actions_are_all_accepted():
+    seed = 3
+    state = _match(seed=seed)
+    state.players[0].board_add(GHOST)
+    state.players[1].board_add(FIREFIGHTER)
+    state.district_owner[2] = 0  # Околиця
+
+    actions = legal_actions(state, 0)
+    kinds = {a[0] for a in actions}
+
+    assert kinds == {"end_turn", "play_card", "attack", "attack_player", "contest_district", "swap_district"}
+    assert ("contest_district", 2) not in actions
+    assert legal_actions(state, 1) == []
+    for action in actions:
+        fresh = _match(seed=seed)
+        fresh.players[0].board_add(GHOST)
+        fresh.players[1].board_add(FIREFIGHTER)
+        fresh.district_owner[2] = 0
+        perform(fresh, 0, *action)
+
+    state.players[0].actions = 0
+    assert legal_actions(state, 0) == [("end_turn",)]
+
+
+def test_apply_action_reports_the_vp_diff():
+    state = _match()
+    state.players[0].hand = array("B", [GOOD_NEWS])
+
+    move = apply_action(state, "p_1", {"kind": "play_card", "card": 0})
+
+    assert move.kind == "play_card"
+    assert move.diff["vp"] == {"p_1": 3}
+    assert move.diff["hand"] == {"p_1": {"delta": -1}}
+    with pytest.raises(IllegalAction) as exc:
+        apply_action(state, "p_1", {"kind": "attack", "attacker": 0, "targetPlayerId": "nobody", "target": 0})
+    assert exc.value.code == "invalid_target"
@@ -0,0 +1,84 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+from __future__ import annotations
+
+import pytest
+
+from app import events
+from app.events import EventBus, MemoryBackend, room_scope
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(events.time, "monotonic", clock)
+    return clock
+
+
+def test_handlers_see_local_flag_and_a_failing_handler_is_isolated():
+    bus = EventBus()
+    seen = []
+
+    @bus.on("chat")
+    def broken(event):
+        raise RuntimeError("boom")
+
+    @bus.on("chat")
+    def record(event):
+        seen.append(event)
+
+    bus.publish("chat", {"room": 1})
+    bus._deliver("chat", "another-worker", {"room": 2})
+
+    assert [(e.data["room"], e.local) for e in seen] == [(1, True), (2, False)]
+
+
+def test_presence_counts_expire(clock):
+    bus = EventBus()
+    bus.presence_ttl = 60
+    bus.heartbeat("a", room_id=1)
+    bus.heartbeat("b")
+
+    assert bus.online([1, 2]) == (2, {1: 1, 2: 0})
+    clock.now += 61
+    assert bus.online([1]) == (0, {1: 0})
+
+
+def test_touch_sweeps_scopes_that_are_never_read(clock):
+    backend = MemoryBackend()
+    for room_id in range(100):
+        backend.touch(["global", room_scope(room_id)], f"user{room_id}", 60)
+    assert len(backend._scopes) == 101
+
+    clock.now += 61
+    backend.touch(["global"], "late", 60)
+
+    assert backend._scopes == {"global": {"late": clock.now + 60}}
+
+
+def test_online_reads_zero_when_the_backend_fails():
+    class Broken(MemoryBackend):
+        def counts(self, scopes):
+            raise ConnectionError("redis is down")
+
+    bus = EventBus()
+    bus._backend = Broken()
+
+    assert bus.online([1, 2]) == (0, {1: 0, 2: 0})
+
+
+def test_presence_endpoints(client):
+    assert client.post("/presence", json={"roomId": 7}).status_code == 200
+
+    body = client.get("/presence?rooms=7,8").get_json()
+
+    assert body["online"] == 1
+    assert body["rooms"] == {"7": 1, "8": 0}
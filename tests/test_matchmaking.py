@@ -0,0 +1,82 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+from __future__ import annotations
+
+import pytest
+
+from app.matchmaking import MATCHED, QUEUED, Matchmaker
+from app.models import Room, SeatReservation, db
+
+
+@pytest.fixture
+def mm(app, monkeypatch):
+    """A private matchmaker whose batches only form on explicit ``tick()``."""
+
+    mm = Matchmaker()
+    mm.init_app(app)
+    monkeypatch.setattr(mm, "_ensure_scheduler", lambda: None)
+    return mm
+
+
+def test_tick_seats_full_batches(app, mm):
+    tickets = [mm.enqueue("quick", 2) for _ in range(5)]
+    assert mm.tick() == 2
+    assert [t.status for t in tickets] == [MATCHED] * 4 + [QUEUED]
+    assert tickets[0].room_id == tickets[1].room_id != tickets[2].room_id
+    assert {tickets[0].seat, tickets[1].seat} == {1, 2}
+    assert mm.queued_count("quick", 2) == 1
+    with app.app_context():
+        room = db.session.get(Room, tickets[0].room_id)
+        assert room.current_players == 2
+        assert db.session.query(SeatReservation).filter_by(room_id=room.id).count() == 2
+
+
+def test_failed_batch_is_requeued_and_the_others_still_start(app, mm, monkeypatch):
+    tickets = [mm.enqueue("quick", 2) for _ in range(6)]
+    start = mm._start_match
+    calls = []
+
+    def flaky(batch):
+        calls.append(batch)
+        if len(calls) == 1:
+            raise RuntimeError("database went away")
+        start(batch)
+
+    monkeypatch.setattr(mm, "_start_match", flaky)
+    assert mm.tick() == 2
+    assert len(calls) == 3
+    assert [t.status for t in tickets] == [QUEUED] * 2 + [MATCHED] * 4
+    # The failed pair is back at the front of its pool and starts next tick.
+    assert mm.queued_count("quick", 2) == 2
+    assert mm.tick() == 1
+    assert all(t.status == MATCHED for t in tickets)
+    with app.app_context():
+        assert db.session.query(Room).count() == 3
+
+
+def test_matched_room_is_private_and_full_from_the_start(app, client, mm):
+    tickets = [mm.enqueue("quick", 2) for _ in range(2)]
+    assert mm.tick() == 1
+
+    room_id = tickets[0].room_id
+    with app.app_context():
+        room = db.session.get(Room, room_id)
+        assert (room.access, room.current_players) == ("private", 2)
+    assert client.post(f"/rooms/{room_id}/join", json={}).status_code == 403
+
+
+def test_failed_commit_leaves_no_half_seated_room(app, mm, monkeypatch):
+    tickets = [mm.enqueue("quick", 2) for _ in range(2)]
+
+    def broken(room, player_ids, ttl_sec):
+        db.session.add(SeatReservation(room_id=room.id, seat=1, player_id="x", expires_at=None))
+        raise RuntimeError("seat insert failed")
+
+    monkeypatch.setattr("app.matchmaking.seat_new_room", broken)
+    assert mm.tick() == 0
+
+    assert [t.status for t in tickets] == [QUEUED, QUEUED]
+    assert tickets[0].room_id is None
+    with app.app_context():
+        assert db.session.query(Room).count() == 0
+        assert db.session.query(SeatReservation).count() == 0
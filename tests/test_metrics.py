@@ -0,0 +1,41 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+from __future__ import annotations
+
+import time
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.exc import OperationalError
+
+from app.metrics import metrics
+from app.models import db
+
+
+def test_metrics_are_off_by_default(client):
+    assert client.get("/metrics").status_code == 404
+
+
+def test_metrics_token_is_required_when_set(make_app):
+    client = make_app(METRICS_ENABLED=True, METRICS_TOKEN="s3cret").test_client()
+
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    resp = client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+    assert resp.status_code == 200
+    assert "# TYPE http_request_duration_seconds histogram" in resp.get_data(as_text=True)
+
+
+def test_failed_statement_does_not_skew_the_next_timing(make_app):
+    app = make_app(METRICS_ENABLED=True)
+    before = metrics.query_seconds._series.get(("primary",), [0])[-1]
+    with app.app_context():
+        with db.engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(sa.text("SELECT * FROM no_such_table"))
+            time.sleep(0.2)
+            conn.execute(sa.text("SELECT 1"))
+            assert not conn.info.get("metrics_start")
+
+    # Total SQL time stays well below the pause between the two statements.
+    assert metrics.query_seconds._series[("primary",)][-1] - before < 0.2
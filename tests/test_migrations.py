@@ -0,0 +1,46 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+from __future__ import annotations
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.exc import OperationalError
+
+from app.migrations import SchemaOutdated, current_version, head, upgrade
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    yield engine
+    engine.dispose()
+
+
+def test_upgrade_fresh_database_once(engine):
+    assert current_version(engine) == 0
+
+    applied = upgrade(engine, log=lambda line: None)
+
+    assert applied == list(range(1, head() + 1))
+    assert current_version(engine) == head()
+    assert upgrade(engine, log=lambda line: None) == []
+
+
+def test_unreachable_database_is_an_error(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'missing' / 'dir' / 'schema.db'}")
+
+    with pytest.raises(OperationalError):
+        current_version(engine)
+
+
+def test_broken_version_table_is_an_error(engine):
+    with engine.begin() as conn:
+        conn.execute(sa.text("CREATE TABLE schema_migrations (id INTEGER)"))
+
+    with pytest.raises(OperationalError):
+        current_version(engine)
+
+
+def test_check_mode_refuses_an_outdated_schema(make_app):
+    with pytest.raises(SchemaOutdated):
+        make_app(DB_SCHEMA_ON_START="check")
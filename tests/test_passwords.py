@@ -0,0 +1,38 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+from __future__ import annotations
+
+import pytest
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, generate_password_hash
+
+from app.passwords import PasswordHasher, normalize_method
+
+
+@pytest.mark.parametrize(
+    ("method", "stored"),
+    [
+        ("scrypt", "scrypt:32768:8:1"),
+        ("scrypt:16384:8:1", "scrypt:16384:8:1"),
+        ("pbkdf2", f"pbkdf2:sha256:{DEFAULT_PBKDF2_ITERATIONS}"),
+        ("pbkdf2:sha512", f"pbkdf2:sha512:{DEFAULT_PBKDF2_ITERATIONS}"),
+        ("pbkdf2:sha256:1000", "pbkdf2:sha256:1000"),
+    ],
+)
+def test_normalize_matches_what_werkzeug_stores(method, stored):
+    assert normalize_method(method) == stored
+    assert generate_password_hash("x", method=method).split("$", 1)[0] == stored
+
+
+def test_normalize_rejects_unknown_methods():
+    with pytest.raises(ValueError):
+        normalize_method("md5")
+
+
+@pytest.mark.parametrize("method", ["scrypt", "pbkdf2"])
+def test_bare_method_does_not_rehash_its_own_hashes(app, method):
+    app.config["PASSWORD_HASH_METHOD"] = method
+    hasher = PasswordHasher()
+    hasher.init_app(app)
+
+    assert not hasher.needs_rehash(generate_password_hash("secret", method=method))
+    assert hasher.needs_rehash(generate_password_hash("secret", method="pbkdf2:sha256:1000"))
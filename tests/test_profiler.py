@@ -0,0 +1,35 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+from __future__ import annotations
+
+import time
+
+from app.profiler import profiler
+
+
+def test_sampled_request_writes_a_folded_profile(make_app, tmp_path):
+    app = make_app(PROFILER_ENABLED=True, PROFILER_SAMPLE_RATE=1.0, PROFILER_INTERVAL_MS=1, PROFILER_DIR=str(tmp_path / "profiles"))
+
+    @app.get("/_slow")
+    def slow():
+        time.sleep(0.05)
+        return "ok"
+
+    response = app.test_client().get("/_slow")
+
+    name = response.headers["X-Profile-Id"]
+    lines = (tmp_path / "profiles" / name).read_text(encoding="utf-8").splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("slow" in line for line in lines)
+
+
+def test_stopped_run_is_no_longer_sampled(make_app, tmp_path):
+    app = make_app(PROFILER_ENABLED=True, PROFILER_SAMPLE_RATE=1.0, PROFILER_INTERVAL_MS=1, PROFILER_DIR=str(tmp_path / "profiles"))
+    with app.test_request_context("/"):
+        assert profiler._admit()
+        time.sleep(0.02)
+        run = profiler._stop()
+        frozen = dict(run.samples)
+        time.sleep(0.02)
+
+    assert run.samples and dict(run.samples) == frozen
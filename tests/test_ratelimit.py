@@ -0,0 +1,69 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+from __future__ import annotations
+
+import pytest
+
+from app.chat_writer import chat_writer
+from app.ratelimit import Limit, MemoryStorage, RateLimiter, parse_limit
+
+
+def test_parse_limit():
+    assert parse_limit("5/10") == Limit(5, 2.0)
+    assert parse_limit("0") is None
+    with pytest.raises(ValueError):
+        parse_limit("-1/5")
+
+
+def test_bucket_allows_burst_then_denies_with_wait():
+    storage = MemoryStorage(100)
+    bucket = [("chat_user:a", Limit(2, 1.0))]
+
+    assert storage.hit(bucket) == (-1, 0.0)
+    assert storage.hit(bucket) == (-1, 0.0)
+    index, wait = storage.hit(bucket)
+    assert index == 0
+    assert 0.9 < wait <= 1.0
+
+
+def test_denied_request_takes_no_token_from_other_buckets():
+    storage = MemoryStorage(100)
+    tight = ("chat_user:a", Limit(1, 10.0))
+    loose = ("chat_room:1", Limit(5, 1.0))
+    storage.hit([tight])
+
+    before = dict(storage._tats)
+    index, _ = storage.hit([loose, tight])
+
+    assert index == 1
+    assert storage._tats == before
+
+
+class _BrokenStorage:
+    def hit(self, buckets):
+        raise ConnectionError("redis is down")
+
+
+def test_storage_failure_allows_request():
+    limiter = RateLimiter()
+    limiter.enabled = True
+    limiter.limits = {"chat_user": Limit(1, 1.0)}
+    limiter._storage = _BrokenStorage()
+
+    assert limiter.hit(chat_user="a") is None
+
+
+def test_chat_post_is_limited_before_the_room_lookup(make_app, monkeypatch):
+    app = make_app(RATE_LIMIT_ENABLED=True, RATE_LIMIT_CHAT_USER="1/60")
+    lookups = []
+    monkeypatch.setattr(chat_writer, "room_exists", lambda room_id: lookups.append(room_id) or False)
+    client = app.test_client()
+
+    first = client.post("/api/chat/999", json={"text": "привіт"})
+    second = client.post("/api/chat/999", json={"text": "привіт"})
+
+    assert first.status_code == 404
+    assert second.status_code == 429
+    assert second.headers["Retry-After"] == "60"
+    assert second.get_json()["code"] == "rate_limited"
+    assert lookups == [999]
@@ -0,0 +1,217 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+from wsproto import ConnectionType, WSConnection
+from wsproto.events import AcceptConnection, CloseConnection, RejectConnection, Request, TextMessage
+
+from app.models import Room, SeatReservation, db
+from app.realtime import Admission, MatchGateway, MatchInfo
+from app.realtime.__main__ import build_gateway
+from app.seats import reserve_seat
+from app.tokens import issue_match_token
+
+
+class Client:
+    """Minimal WebSocket client collecting decoded events."""
+
+    def __init__(self):
+        self.events: list = []
+        self.closed = asyncio.Event()
+
+    async def connect(self, port: int, path: str) -> None:
+        self.reader, self.writer = await asyncio.open_connection("127.0.0.1", port)
+        self.ws = WSConnection(ConnectionType.CLIENT)
+        self.writer.write(self.ws.send(Request(host="localhost", target=path)))
+        self._task = asyncio.get_running_loop().create_task(self._pump())
+
+    async def _pump(self) -> None:
+        try:
+            while data := await self.reader.read(65536):
+                self.ws.receive_data(data)
+                for event in self.ws.events():
+                    if isinstance(event, TextMessage):
+                        self.events.append(json.loads(event.data))
+                    elif isinstance(event, AcceptConnection):
+                        self.events.append("accepted")
+                    elif isinstance(event, RejectConnection):
+                        self.events.append(("rejected", event.status_code))
+                        return
+                    elif isinstance(event, CloseConnection):
+                        self.events.append(("close", event.code))
+                        return
+        finally:
+            self.closed.set()
+
+    def send(self, message) -> None:
+        text = message if isinstance(message, str) else json.dumps(message)
+        self.writer.write(self.ws.send(TextMessage(text)))
+
+    def types(self) -> list:
+        return [e["type"] if isinstance(e, dict) else e for e in self.events]
+
+    def close(self) -> None:
+        self._task.cancel()
+        self.writer.close()
+
+
+async def _wait(predicate, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def _run_gateway(gateway: MatchGateway, scenario) -> None:
+    async def main():
+        server = await gateway.start("127.0.0.1", 0)
+        try:
+            await scenario(server.sockets[0].getsockname()[1])
+        finally:
+            gateway.shutdown()
+            server.close()
+
+    asyncio.run(main())
+
+
+def _payloads(client: Client, kind: str) -> list[dict]:
+    return [e["payload"] for e in client.events if isinstance(e, dict) and e["type"] == kind]
+
+
+def test_handshake_is_checked_before_a_match_is_joined():
+    gateway = MatchGateway(
+        lambda mid: MatchInfo(mid, "quick", 2, 30),
+        authenticate=lambda token, mid, pid: Admission(pid, None) if token == "good" else None,
+    )
+
+    async def scenario(port):
+        for path, status in (
+            ("/ws/other/1?token=good&playerId=a", 404),
+            ("/ws/match/1?token=good", 400),
+            ("/ws/match/1?token=bad&playerId=a", 401),
+        ):
+            client = Client()
+            await client.connect(port, path)
+            await client.closed.wait()
+            assert client.events == [("rejected", status)], path
+        assert gateway.rooms == {}
+
+    _run_gateway(gateway, scenario)
+
+
+def test_ping_and_bad_messages_get_answers():
+    gateway = MatchGateway(lambda mid: MatchInfo(mid, "quick", 2, 30))
+
+    async def scenario(port):
+        client = Client()
+        await client.connect(port, "/ws/match/1?token=t&playerId=a")
+        await _wait(lambda: "accepted" in client.events)
+        client.send({"type": "ping"})
+        client.send("{not json")
+        client.send({"type": "dance"})
+        await _wait(lambda: len(_payloads(client, "error")) == 2)
+
+        assert "pong" in client.types()
+        assert [p["code"] for p in _payloads(client, "error")] == ["invalid_json", "unknown_type"]
+        assert gateway.stats() == {"connections": 1, "matches": 1}
+        client.close()
+        await _wait(lambda: gateway.stats() == {"connections": 0, "matches": 0})
+
+    _run_gateway(gateway, scenario)
+
+
+def test_silent_socket_is_closed_after_the_heartbeat_timeout():
+    gateway = MatchGateway(lambda mid: MatchInfo(mid, "quick", 2, 30), heartbeat_timeout=1)
+
+    async def scenario(port):
+        client = Client()
+        await client.connect(port, "/ws/match/1?token=t&playerId=a")
+        await asyncio.wait_for(client.closed.wait(), timeout=4)
+        assert client.events[-1] == ("close", 1001)
+
+    _run_gateway(gateway, scenario)
+
+
+def test_turned_away_sockets_give_their_seat_back():
+    released = []
+    seats = {"a": 1, "b": 2, "c": 2}
+    gateway = MatchGateway(
+        lambda mid: MatchInfo(mid, "quick", 2, 30) if mid == "1" else None,
+        authenticate=lambda token, mid, pid: Admission(pid, seats[pid]),
+        on_disconnect=lambda mid, pid: released.append((mid, pid)),
+    )
+
+    async def scenario(port):
+        missing = Client()
+        await missing.connect(port, "/ws/match/9?token=t&playerId=a")
+        await missing.closed.wait()
+        assert missing.events == [("rejected", 404)]
+        await _wait(lambda: ("9", "a") in released)
+
+        b, c = Client(), Client()
+        await b.connect(port, "/ws/match/1?token=t&playerId=b")
+        await _wait(lambda: "1" in gateway.rooms and gateway.rooms["1"].players)
+        # Seat 2 is b's: c is turned away and its claim is released.
+        await c.connect(port, "/ws/match/1?token=t&playerId=c")
+        await c.closed.wait()
+        assert c.events[-2]["payload"] == {"code": "room_full"}
+        await _wait(lambda: ("1", "c") in released)
+        assert ("1", "b") not in released
+        b.close()
+
+    _run_gateway(gateway, scenario)
+
+
+def test_players_sit_in_their_reserved_seats():
+    gateway = MatchGateway(
+        lambda mid: MatchInfo(mid, "quick", 2, 30),
+        authenticate=lambda token, mid, pid: Admission(pid, {"first": 2, "second": 1}[pid]),
+    )
+
+    async def scenario(port):
+        first, second = Client(), Client()
+        await first.connect(port, "/ws/match/1?token=t&playerId=first")
+        await _wait(lambda: "1" in gateway.rooms and gateway.rooms["1"].players)
+        await second.connect(port, "/ws/match/1?token=t&playerId=second")
+        await _wait(lambda: "match_start" in first.types())
+        start = next(e for e in first.events if isinstance(e, dict) and e["type"] == "match_start")
+        assert [(p["id"], p["seat"]) for p in start["payload"]["players"]] == [("second", 1), ("first", 2)]
+        await _wait(lambda: "turn_start" in first.types())
+        turn = next(e for e in first.events if isinstance(e, dict) and e["type"] == "turn_start")
+        assert turn["payload"]["activePlayerId"] == "second"
+        first.close()
+        second.close()
+
+    _run_gateway(gateway, scenario)
+
+
+def test_claimed_seat_expires_again_when_the_match_is_gone(app, new_room):
+    room_id = new_room(max_players=2)
+    with app.app_context():
+        assert reserve_seat(room_id, "p1", 120) == 1
+    gateway = build_gateway(app)
+    gateway.room_loader = lambda mid: None  # the room vanished after the claim
+    released = []
+    release = gateway.on_disconnect
+    gateway.on_disconnect = lambda mid, pid: (release(mid, pid), released.append(pid))
+    token = issue_match_token(app.config["SECRET_KEY"], str(room_id), "p1", "Гравець")
+
+    def expires_at():
+        with app.app_context():
+            return db.session.get(SeatReservation, (room_id, 1)).expires_at
+
+    async def scenario(port):
+        client = Client()
+        await client.connect(port, f"/ws/match/{room_id}?token={token}&playerId=p1")
+        await client.closed.wait()
+        assert client.events == [("rejected", 404)]
+        await _wait(lambda: released == ["p1"])
+        # Claimed (NULL) while connecting, then back on the reconnect-grace clock.
+        assert expires_at() is not None
+
+    _run_gateway(gateway, scenario)
+    with app.app_context():
+        assert db.session.get(Room, room_id).current_players == 1
@@ -0,0 +1,13 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+from __future__ import annotations
+
+
+def test_join_reports_the_room_with_the_new_seat_taken(client, new_room):
+    room_id = new_room()
+
+    first = client.post(f"/rooms/{room_id}/join").get_json()
+    second = client.post(f"/rooms/{room_id}/join").get_json()
+
+    assert (first["seat"], first["room"]["currentPlayers"]) == (1, 1)
+    assert (second["seat"], second["room"]["currentPlayers"]) == (2, 2)
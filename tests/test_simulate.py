@@ -0,0 +1,28 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+from __future__ import annotations
+
+import numpy as np
+
+from app.game.simulate import COL_VP, END_REASONS, simulate, summarize
+
+
+def test_simulate_is_reproducible_and_summarized():
+    results = simulate("quick", 40, workers=1, seed=7, chunk=15)
+
+    assert results.shape == (40, COL_VP + 2)
+    assert np.array_equal(results, simulate("quick", 40, workers=1, seed=7, chunk=40))
+    stats = summarize(results, "quick")
+    assert abs(sum(stats["endReasons"].values()) - 1) < 1e-3
+
+
+def test_round_limit_games_are_a_finding():
+    rows = np.zeros((10, COL_VP + 2), dtype=np.int32)
+    rows[:, 1] = END_REASONS.index("rounds")
+    rows[:, 2] = 10
+    rows[:, COL_VP:] = (8, 5)
+
+    findings = summarize(rows, "quick")["findings"]
+
+    assert any("round limit" in f for f in findings)
+    assert any("seat 1" in f for f in findings)
@@ -0,0 +1,80 @@
+# SPDX-License-Identifier: LicenseRef-CityLegends-Proprietary-Software
+
+from __future__ import annotations
+
+import time
+
+from itsdangerous import timed
+
+from app.tokens import (
+    Claims,
+    issue_access_token,
+    issue_match_token,
+    issue_profile_token,
+    issue_refresh_token,
+    verify_access_token,
+    verify_match_token,
+    verify_profile_token,
+    verify_refresh_token,
+)
+
+SECRET = "test-secret"
+
+
+def _issued_ago(monkeypatch, seconds: float, issue, *args) -> str:
+    now = time.time()
+    with monkeypatch.context() as m:
+        m.setattr(timed.time, "time", lambda: now - seconds)
+        return issue(SECRET, *args)
+
+
+def _tamper(token: str) -> str:
+    head, sig = token.rsplit(".", 1)
+    return f"{head}.{'A' if sig[0] != 'A' else 'B'}{sig[1:]}"
+
+
+def test_access_and_refresh_round_trip():
+    access = issue_access_token(SECRET, "u1", "Нік")
+    refresh = issue_refresh_token(SECRET, "u1")
+
+    assert verify_access_token(SECRET, access, 60) == Claims("u1", "Нік")
+    assert verify_refresh_token(SECRET, refresh, 60) == "u1"
+
+
+def test_tokens_expire(monkeypatch):
+    access = _issued_ago(monkeypatch, 120, issue_access_token, "u1", "Нік")
+    refresh = _issued_ago(monkeypatch, 120, issue_refresh_token, "u1")
+
+    assert verify_access_token(SECRET, access, 60) is None
+    assert verify_refresh_token(SECRET, refresh, 60) is None
+    assert verify_access_token(SECRET, access, 600) == Claims("u1", "Нік")
+    assert verify_refresh_token(SECRET, refresh, 600) == "u1"
+
+
+def test_one_kind_is_not_accepted_as_another():
+    access = issue_access_token(SECRET, "u1", "Нік")
+    refresh = issue_refresh_token(SECRET, "u1")
+    match = issue_match_token(SECRET, "m1", "p_1", "Нік")
+
+    assert verify_access_token(SECRET, refresh, 60) is None
+    assert verify_refresh_token(SECRET, access, 60) is None
+    assert verify_match_token(SECRET, access, "m1", "p_1", 60) is None
+    assert verify_profile_token(SECRET, match, 60) is False
+
+
+def test_tampered_or_foreign_tokens_are_rejected():
+    access = issue_access_token(SECRET, "u1", "Нік")
+
+    assert verify_access_token(SECRET, _tamper(access), 60) is None
+    assert verify_access_token("other-secret", access, 60) is None
+    assert verify_access_token(SECRET, "not-a-token", 60) is None
+    assert verify_access_token(SECRET, None, 60) is None
+    assert verify_profile_token(SECRET, _tamper(issue_profile_token(SECRET)), 60) is False
+
+
+def test_match_token_is_bound_to_match_and_player():
+    token = issue_match_token(SECRET, "m1", "p_1", "Нік")
+
+    assert verify_match_token(SECRET, token, "m1", "p_1", 60) == "Нік"
+    assert verify_match_token(SECRET, token, "m2", "p_1", 60) is None
+    assert verify_match_token(SECRET, token, "m1", "p_2", 60) is None